@@ -0,0 +1,65 @@
+import argparse
+import json
+import sys
+
+# relative tolerances of the measurements that are compared
+TOLERANCES = {'time': 0.10, 'iterations': 0.0, 'nodes': 0.0, 'peak_memory_mb': 0.10}
+# absolute differences below these are taken as noise
+MIN_DIFFERENCES = {'time': 0.01, 'peak_memory_mb': 1.0}
+OBJ_TOL = 1e-6
+
+
+def compare(results, baseline, tolerances=None):
+    """
+    Compares the results of the benchmark with the baseline, and returns the regressions and
+    the improvements as lists of messages. A different status or objective value is a
+    regression, and an instance that is not in the baseline is skipped.
+    """
+    tolerances = dict(TOLERANCES, **(tolerances or {}))
+    regressions, improvements = [], []
+    for name, current in results['instances'].items():
+        base = baseline['instances'].get(name)
+        if base is None:
+            continue
+        if current['status'] != base['status']:
+            regressions.append('{0}: status {1} -> {2}'
+                               .format(name, base['status'], current['status']))
+            continue
+        if abs(current['obj_val'] - base['obj_val']) > OBJ_TOL * max(1.0, abs(base['obj_val'])):
+            regressions.append('{0}: obj_val {1} -> {2}'
+                               .format(name, base['obj_val'], current['obj_val']))
+        for key, tolerance in tolerances.items():
+            old, new = base[key], current[key]
+            if abs(new - old) < MIN_DIFFERENCES.get(key, 0.0):
+                continue
+            message = '{0}: {1} {2:.4g} -> {3:.4g} ({4:+.1%})'.format(
+                name, key, old, new, (new - old) / old if old else float('inf'))
+            if new > old * (1.0 + tolerance):
+                regressions.append(message)
+            elif new < old * (1.0 - tolerance):
+                improvements.append(message)
+    return regressions, improvements
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Flags regressions of benchmark results.')
+    parser.add_argument('results', help='json file of the results')
+    parser.add_argument('baseline', help='json file of the baseline results')
+    for key, tolerance in TOLERANCES.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=float, default=tolerance,
+                            dest=key, help='relative tolerance of ' + key)
+    args = parser.parse_args()
+    with open(args.results) as json_file:
+        results = json.load(json_file)
+    with open(args.baseline) as json_file:
+        baseline = json.load(json_file)
+    regressions, improvements = compare(results, baseline,
+                                        {key: getattr(args, key) for key in TOLERANCES})
+    for message in improvements:
+        print('improved   ' + message)
+    for message in regressions:
+        print('REGRESSED  ' + message)
+    print('{0} regressions and {1} improvements in {2} instances.'
+          .format(len(regressions), len(improvements),
+                  len(set(results['instances']) & set(baseline['instances']))))
+    sys.exit(1 if regressions else 0)
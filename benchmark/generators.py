@@ -0,0 +1,153 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from lp.entity import Sense, ObjectiveType, VarType
+from lp.model import Model
+
+
+def transportation(n_sources, n_sinks, seed=0):
+    """Ships the supplies of the sources to the demands of the sinks with the minimum cost."""
+    rng = np.random.default_rng(seed)
+    supply = rng.integers(20, 100, n_sources).astype(np.float64)
+    demand = rng.integers(10, 80, n_sinks).astype(np.float64)
+    demand *= 0.9 * supply.sum() / demand.sum()
+    model = Model('transportation_{0}x{1}'.format(n_sources, n_sinks))
+    model.add_vars(n_sources * n_sinks, obj=rng.integers(1, 20, n_sources * n_sinks),
+                   names=['x[%i,%i]' % (i, j) for i in range(n_sources) for j in range(n_sinks)])
+    # x[i,j] is the column i * n_sinks + j
+    cols = np.arange(n_sources * n_sinks)
+    rows = np.concatenate((cols // n_sinks, n_sources + cols % n_sinks))
+    A = coo_matrix((np.ones(2 * len(cols)), (rows, np.concatenate((cols, cols)))),
+                   shape=(n_sources + n_sinks, len(cols)))
+    model.add_constrs(A, np.repeat([Sense.LE, Sense.GE], [n_sources, n_sinks]),
+                      np.concatenate((supply, demand)))
+    model.set_objective(None, ObjectiveType.MIN)
+    return model
+
+
+def diet(n_foods, n_nutrients, seed=0):
+    """Chooses the cheapest amounts of foods that meet lower and upper limits of nutrients."""
+    rng = np.random.default_rng(seed)
+    content = rng.uniform(0.0, 20.0, (n_nutrients, n_foods))
+    content[rng.random((n_nutrients, n_foods)) < 0.3] = 0.0
+    # the limits are met by eating one unit of each food
+    total = content.sum(axis=1)
+    model = Model('diet_{0}x{1}'.format(n_foods, n_nutrients))
+    model.add_vars(n_foods, ub=rng.uniform(1.0, 5.0, n_foods), obj=rng.uniform(1.0, 10.0, n_foods),
+                   names=['x[%i]' % i for i in range(n_foods)])
+    model.add_constrs(np.vstack((content, content)),
+                      np.repeat([Sense.GE, Sense.LE], n_nutrients),
+                      np.concatenate((0.5 * total, 1.5 * total)))
+    model.set_objective(None, ObjectiveType.MIN)
+    return model
+
+
+def get_arcs(n_nodes, degree, rng):
+    """Returns the tails and heads of a random graph that contains the path 0, 1, ..., n - 1."""
+    tails = rng.integers(0, n_nodes, n_nodes * degree)
+    heads = rng.integers(0, n_nodes, n_nodes * degree)
+    is_arc = tails != heads
+    tails = np.concatenate((np.arange(n_nodes - 1), tails[is_arc]))
+    heads = np.concatenate((np.arange(1, n_nodes), heads[is_arc]))
+    return tails, heads
+
+
+def get_incidence_matrix(n_nodes, tails, heads):
+    """Returns the node arc incidence matrix with the outflow minus the inflow of the nodes."""
+    arcs = np.arange(len(tails))
+    return coo_matrix((np.concatenate((np.ones(len(arcs)), -np.ones(len(arcs)))),
+                       (np.concatenate((tails, heads)), np.concatenate((arcs, arcs)))),
+                      shape=(n_nodes, len(arcs)))
+
+
+def min_cost_flow(n_nodes, degree=3, seed=0):
+    """Sends the supply of the first node to the demands of the other nodes with the minimum cost."""
+    rng = np.random.default_rng(seed)
+    tails, heads = get_arcs(n_nodes, degree, rng)
+    demand = rng.integers(0, 10, n_nodes).astype(np.float64)
+    demand[0] = 0.0
+    b = -demand
+    b[0] = demand.sum()
+    # the arcs of the path can carry the whole supply
+    capacity = rng.integers(5, 50, len(tails)).astype(np.float64)
+    capacity[:n_nodes - 1] = b[0]
+    model = Model('min_cost_flow_{0}'.format(n_nodes))
+    model.add_vars(len(tails), ub=capacity, obj=rng.integers(1, 10, len(tails)),
+                   names=['x[%i,%i]' % arc for arc in zip(tails, heads)])
+    model.add_constrs(get_incidence_matrix(n_nodes, tails, heads), Sense.EQ, b)
+    model.set_objective(None, ObjectiveType.MIN)
+    return model
+
+
+def max_flow(n_nodes, degree=3, seed=0):
+    """Sends the maximum flow from the first to the last node through a return arc."""
+    rng = np.random.default_rng(seed)
+    tails, heads = get_arcs(n_nodes, degree, rng)
+    tails = np.append(tails, n_nodes - 1)
+    heads = np.append(heads, 0)
+    capacity = np.append(rng.integers(1, 20, len(tails) - 1).astype(np.float64), np.inf)
+    obj = np.zeros(len(tails))
+    obj[-1] = 1.0
+    model = Model('max_flow_{0}'.format(n_nodes))
+    model.add_vars(len(tails), ub=np.where(np.isinf(capacity), np.finfo(np.float64).max,
+                                           capacity),
+                   obj=obj, names=['x[%i,%i]' % arc for arc in zip(tails, heads)])
+    model.add_constrs(get_incidence_matrix(n_nodes, tails, heads), Sense.EQ, 0.0)
+    model.set_objective(None, ObjectiveType.MAX)
+    return model
+
+
+def set_cover(n_elements, n_sets, density=0.1, seed=0):
+    """Chooses the cheapest sets that cover all elements."""
+    rng = np.random.default_rng(seed)
+    covers = rng.random((n_elements, n_sets)) < density
+    # every element is in at least one set
+    covers[np.arange(n_elements), rng.integers(0, n_sets, n_elements)] = True
+    model = Model('set_cover_{0}x{1}'.format(n_elements, n_sets))
+    model.add_vars(n_sets, ub=1.0, obj=rng.integers(1, 10, n_sets), types=VarType.BINARY,
+                   names=['x[%i]' % j for j in range(n_sets)])
+    model.add_constrs(covers.astype(np.float64), Sense.GE, 1.0)
+    model.set_objective(None, ObjectiveType.MIN)
+    return model
+
+
+def knapsack(n_items, n_knapsacks=1, seed=0):
+    """Chooses the most valuable items whose weights fit in the capacities of the knapsacks."""
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(5, 50, (n_knapsacks, n_items)).astype(np.float64)
+    model = Model('knapsack_{0}x{1}'.format(n_items, n_knapsacks))
+    model.add_vars(n_items, ub=1.0, obj=rng.integers(5, 60, n_items), types=VarType.BINARY,
+                   names=['x[%i]' % j for j in range(n_items)])
+    model.add_constrs(weights, Sense.LE, np.floor(0.5 * weights.sum(axis=1)))
+    model.set_objective(None, ObjectiveType.MAX)
+    return model
+
+
+GENERATORS = {
+    'transportation': transportation,
+    'diet': diet,
+    'min_cost_flow': min_cost_flow,
+    'max_flow': max_flow,
+    'set_cover': set_cover,
+    'knapsack': knapsack,
+}
+
+# instances of the default suite as family and the size arguments scaled by the runner
+SUITE = [
+    ('transportation', (20, 30)),
+    ('transportation', (40, 50)),
+    ('diet', (100, 30)),
+    ('diet', (200, 60)),
+    ('min_cost_flow', (150,)),
+    ('min_cost_flow', (400,)),
+    ('max_flow', (150,)),
+    ('max_flow', (400,)),
+    ('set_cover', (60, 40)),
+    ('knapsack', (25, 1)),
+    ('knapsack', (20, 2)),
+]
+
+
+def generate(family, sizes, seed=0):
+    """Returns the model of a family with the size arguments."""
+    return GENERATORS[family](*sizes, seed=seed)
@@ -0,0 +1,109 @@
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import resource
+import time
+
+import numpy as np
+import scipy
+
+from benchmark.generators import GENERATORS, SUITE, generate
+from lp.entity import SolverParam
+
+
+def run_instance(family, sizes, seed, params):
+    """Builds and solves an instance in a fresh process, and returns its measurements."""
+    SolverParam.VERBOSE = False
+    for key, value in params.items():
+        setattr(SolverParam, key, value)
+    base_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    model = generate(family, sizes, seed)
+    build_time = time.perf_counter() - start_time
+    result = model.solve()
+    # the peak memory of the process above the interpreter, as ru_maxrss in kilobytes on Linux
+    peak_memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_memory) / 1024.0
+    return {'family': family,
+            'sizes': list(sizes),
+            'seed': seed,
+            'rows': model.n_rows,
+            'cols': model.n_cols,
+            'status': result.status,
+            'obj_val': result.obj_val,
+            'time': model.end_time - model.start_time,
+            'build_time': build_time,
+            'iterations': result.iterations,
+            'nodes': result.nodes,
+            'peak_memory_mb': round(peak_memory, 1),
+            'statistics': result.statistics}
+
+
+def get_suite(scale, families):
+    """Returns the family and scaled sizes of the instances of the default suite."""
+    suite = []
+    for family, sizes in SUITE:
+        if families and family not in families:
+            continue
+        suite.append((family, tuple(max(1, int(math.ceil(size * scale))) for size in sizes)))
+    return suite
+
+
+def run(suite, seed=0, repeat=1, params=None):
+    """
+    Solves each instance of the suite repeat times, each time in a new process so that the
+    peak memory is of that solve only, and keeps the fastest run.
+    """
+    params = params or {}
+    context = multiprocessing.get_context('spawn')
+    instances = {}
+    for family, sizes in suite:
+        runs = []
+        for _ in range(repeat):
+            with context.Pool(1) as pool:
+                runs.append(pool.apply(run_instance, (family, sizes, seed, params)))
+        name = '_'.join([family] + [str(size) for size in sizes])
+        instances[name] = min(runs, key=lambda r: r['time'])
+        print('{0:<28} {1:>10.4f} s {2:>7} iterations {3:>6} nodes {4:>8.1f} MB'
+              .format(name, instances[name]['time'], instances[name]['iterations'],
+                      instances[name]['nodes'], instances[name]['peak_memory_mb']))
+    return {'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'params': params,
+            'instances': instances}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs the benchmark suite of the solver.')
+    parser.add_argument('-o', '--output', default='bench_output.json',
+                        help='json file of the results')
+    parser.add_argument('-s', '--scale', type=float, default=1.0,
+                        help='factor of the instance sizes')
+    parser.add_argument('-f', '--families', nargs='*', choices=sorted(GENERATORS),
+                        help='families to run, all by default')
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='number of runs of each instance, of which the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pricing', choices=[p.name for p in SolverParam.Pricing][1:])
+    parser.add_argument('--algorithm', choices=[a.name for a in SolverParam.Algorithm][1:])
+    parser.add_argument('--no-presolve', action='store_true')
+    parser.add_argument('--statistics', action='store_true',
+                        help='record the timers and counters of the solver')
+    args = parser.parse_args()
+    solver_params = {}
+    if args.pricing:
+        solver_params['PRICING'] = SolverParam.Pricing[args.pricing]
+    if args.algorithm:
+        solver_params['ALGORITHM'] = SolverParam.Algorithm[args.algorithm]
+    if args.no_presolve:
+        solver_params['PRESOLVE'] = False
+    if args.statistics:
+        solver_params['STATISTICS'] = True
+    results = run(get_suite(args.scale, args.families), args.seed, args.repeat, solver_params)
+    with open(args.output, 'w') as json_file:
+        json.dump(results, json_file, indent=2)
@@ -20,8 +20,8 @@ try:
     # create model
     model = Model()
 
-    # create variables
-    x = [[model.add_var(name='x[%i,%i]' % (i, j)) for j in n] for i in n]
+    # create variables with capacities as upper bounds
+    x = [[model.add_var(ub=c[i][j], name='x[%i,%i]' % (i, j)) for j in n] for i in n]
 
     # flow constraints
     for i in n:
@@ -31,11 +31,6 @@ try:
             expr.add_term(-1.0, x[j][i])
         model.add_const(expr, Sense.EQ, 0)
 
-    # capacity constraints
-    for i in n:
-        for j in n:
-            model.add_const_var(x[i][j], Sense.LE, c[i][j])
-
     # create objective
     obj_expr = Expression()
     obj_expr.add_term(1.0, x[t][s])
@@ -1,4 +1,4 @@
-from lp.entity import Expression, Sense, ObjectiveType
+from lp.entity import Sense, ObjectiveType, quicksum
 from lp.model import Model
 
 
@@ -27,27 +27,16 @@ try:
     # create model
     model = Model()
 
-    # create variables
-    x = [[model.add_var(name='x[%i,%i]' % (i, j)) for j in n] for i in n]
+    # create variables with capacities as upper bounds
+    x = [[model.add_var(ub=u[i][j], name='x[%i,%i]' % (i, j)) for j in n] for i in n]
 
     # flow constraints
     for i in n:
-        expr = Expression()
-        for j in n:
-            expr.add_term(1.0, x[i][j])
-            expr.add_term(-1.0, x[j][i])
-        model.add_const(expr, Sense.EQ, b[i])
-
-    # capacity constraints
-    for i in n:
-        for j in n:
-            model.add_const_var(x[i][j], Sense.LE, u[i][j])
+        model.add_const(quicksum(x[i][j] for j in n) - quicksum(x[j][i] for j in n),
+                        Sense.EQ, b[i])
 
     # create objective
-    obj_expr = Expression()
-    for i in n:
-        for j in n:
-            obj_expr.add_term(c[i][j], x[i][j])
+    obj_expr = quicksum((c[i][j], x[i][j]) for i in n for j in n)
     model.set_objective(obj_expr, ObjectiveType.MIN)
 
     # solve model
@@ -0,0 +1,204 @@
+import numpy as np
+
+from lp.entity import AlgorithmStatus, BasisStatus, ObjectiveType, BatchResult, SolverParam, \
+    Result, UnknownModelError
+from lp.solver import SimplexSolver, DualSimplexSolver, InitialBasicSolutionGenerator
+
+
+class BatchSolver:
+    """
+    This solves the scenarios of a model that share its coefficient matrix and differ in their
+    right hand sides, costs, or both. The first scenario is solved from scratch, and every
+    following one is warm started from the last basis with the dual Simplex algorithm, which
+    removes the primal infeasibilities a new right hand side causes, while the cost shifts of
+    DualSimplexSolver and its primal iterations handle new costs.
+
+    After each optimal solve, the remaining scenarios are checked together against the same
+    basis: one FTRAN over their right hand sides gives their basic values, and one BTRAN over
+    their basic costs gives their reduced costs. Scenarios that are primal and dual feasible
+    for the basis are optimal as they are and take no pivots.
+
+    MIP scenarios are solved from scratch one by one with Branch & Bound.
+
+    Parameters
+    ==========
+    model       : Model class whose coefficient matrices are prepared
+    rhs         : numpy array of right hand sides with a row per scenario, in the orientation
+                  the constraints are added with, or None to keep the right hand sides
+    costs       : numpy array of objective coefficients of the variables with a row per
+                  scenario, or None to keep the costs
+
+    Properties
+    ==========
+    _b          : numpy array of right hand sides of the scenarios as stored in the model
+    _c          : numpy array of costs of the scenarios in minimization form
+    _sign       : double -1 for a maximization objective, else 1
+    _is_solved  : numpy array of bool whether or not a scenario is solved
+    result      : BatchResult class of the scenarios
+    """
+
+    # bound on the number of values of the matrices built to check scenarios together
+    CHUNK_SIZE = 1 << 22
+
+    def __init__(self, model, rhs=None, costs=None):
+        self._model = model
+        n_scenarios = self.get_n_scenarios(rhs, costs)
+        sign = -1.0 if model.obj.obj_type == ObjectiveType.MAX else 1.0
+        self._b = None
+        if rhs is not None:
+            self._b = np.array(rhs, dtype=np.float64).reshape(n_scenarios, model.n_rows)
+            self._b *= model.row_signs.values
+        self._c = None
+        if costs is not None:
+            self._c = sign * np.array(costs, dtype=np.float64).reshape(n_scenarios, model.n_cols)
+        self._sign = sign
+        self._is_solved = np.zeros(n_scenarios, dtype=bool)
+        self.result = BatchResult(
+            status=np.full(n_scenarios, AlgorithmStatus.NONE, dtype=np.int8),
+            obj_val=np.full(n_scenarios, np.nan),
+            x=np.zeros((n_scenarios, model.n_cols)),
+            y=None if model.is_mip else np.zeros((n_scenarios, model.n_rows)),
+            iterations=np.zeros(n_scenarios, dtype=np.int64))
+
+    def get_n_scenarios(self, rhs, costs):
+        model = self._model
+        n_scenarios = None
+        for values, size in ((rhs, model.n_rows), (costs, model.n_cols)):
+            if values is None:
+                continue
+            shape = np.shape(values)
+            if len(shape) == 1:
+                shape = (1,) + shape
+            if len(shape) != 2 or shape[1] != size or \
+                    (n_scenarios is not None and shape[0] != n_scenarios):
+                raise UnknownModelError('Scenarios do not match the model.')
+            n_scenarios = shape[0]
+        if n_scenarios is None:
+            raise UnknownModelError('No scenarios to solve.')
+        return n_scenarios
+
+    def solve(self):
+        if self._model.is_mip:
+            for s in range(len(self._is_solved)):
+                self.solve_mip(s)
+        else:
+            self.solve_lp()
+        return self.result
+
+    def solve_mip(self, s):
+        model = self._model
+        model.prepare_coefficient_matrices()
+        self.set_scenario(s)
+        model.result = Result()
+        model.run_solver()
+        self.record(s, model.result.status, model.result.iterations)
+
+    def solve_lp(self):
+        model = self._model
+        if model.has_crossed_bounds():
+            self.result.status[:] = AlgorithmStatus.INFEASIBLE
+            return
+        self.set_scenario(0)
+        InitialBasicSolutionGenerator(model).generate()
+        if model.SOLVER_PARAM.ALGORITHM == SolverParam.Algorithm.DUAL_SIMPLEX:
+            simplex_solver = DualSimplexSolver(model)
+        else:
+            simplex_solver = SimplexSolver(model)
+        simplex_solver.run()
+        self.record(0, simplex_solver.status, simplex_solver.n_iterations)
+        # artificial columns are kept at zero in the following solves
+        model.lb[model.get_artificial_cols()] = 0.0
+        model.ub[model.get_artificial_cols()] = 0.0
+        while not self._is_solved.all():
+            if simplex_solver.status == AlgorithmStatus.OPTIMAL:
+                self.record_optimal_scenarios(np.flatnonzero(~self._is_solved))
+                if self._is_solved.all():
+                    break
+            s = int(np.argmin(self._is_solved))
+            self.set_scenario(s)
+            model.x[model.basis] = model.factor.ftran(model.get_reduced_rhs())
+            simplex_solver = DualSimplexSolver(model)
+            simplex_solver.run()
+            self.record(s, simplex_solver.status, simplex_solver.n_iterations)
+
+    def set_scenario(self, s):
+        model = self._model
+        if self._b is not None:
+            model.b[:] = self._b[s]
+        if self._c is not None:
+            model.c[:model.n_cols] = self._c[s]
+
+    def record(self, s, status, n_iterations):
+        model = self._model
+        result = self.result
+        result.status[s] = status
+        result.iterations[s] = n_iterations
+        self._is_solved[s] = True
+        if status not in (AlgorithmStatus.OPTIMAL, AlgorithmStatus.FEASIBLE):
+            return
+        result.x[s] = model.x[:model.n_cols]
+        result.obj_val[s] = self.get_obj_val(model.c[:model.n_cols].dot(model.x[:model.n_cols]))
+        if result.y is not None and status == AlgorithmStatus.OPTIMAL:
+            model.update_duals()
+            result.y[s] = self._sign * model.row_signs.values * model.y
+
+    def get_obj_val(self, value):
+        expr = self._model.obj.expr
+        constant = expr.constant if expr is not None else 0.0
+        return constant + self._sign * value
+
+    def record_optimal_scenarios(self, scenarios):
+        """Records the scenarios that are optimal for the current basis without any pivots."""
+        model = self._model
+        n_total = model.A.shape[1]
+        chunk = max(1, self.CHUNK_SIZE // max(n_total, 1))
+        for start in range(0, len(scenarios), chunk):
+            self.record_optimal_chunk(scenarios[start:start + chunk])
+
+    def record_optimal_chunk(self, scenarios):
+        model = self._model
+        basis = model.basis
+        x_n = model.x.copy()
+        x_n[basis] = 0.0
+        k = len(scenarios)
+        # basic values of the scenarios
+        if self._b is not None:
+            x_b = model.factor.ftran_many((self._b[scenarios] - model.A.dot(x_n)).T)
+            tol = model.SOLVER_PARAM.FEASIBILITY_TOL
+            is_optimal = np.all((x_b >= model.lb[basis][:, None] - tol) &
+                                (x_b <= model.ub[basis][:, None] + tol), axis=0)
+        else:
+            x_b = np.repeat(model.x[basis][:, None], k, axis=1)
+            is_optimal = np.ones(k, dtype=bool)
+        # reduced costs of the scenarios
+        if self._c is not None:
+            c = np.zeros((model.A.shape[1], k))
+            c[:model.n_cols] = self._c[scenarios].T
+            y = model.factor.btran_many(c[basis])
+            d = c - model.A.T.dot(y)
+            is_optimal &= self.is_dual_feasible(d)
+        else:
+            y = np.repeat(model.factor.btran(model.c[basis])[:, None], k, axis=1)
+        result = self.result
+        for j in np.flatnonzero(is_optimal):
+            s = scenarios[j]
+            x = x_n[:model.n_cols].copy()
+            is_structural = basis < model.n_cols
+            x[basis[is_structural]] = x_b[is_structural, j]
+            costs = self._c[s] if self._c is not None else model.c[:model.n_cols]
+            result.status[s] = AlgorithmStatus.OPTIMAL
+            result.iterations[s] = 0
+            result.x[s] = x
+            result.obj_val[s] = self.get_obj_val(costs.dot(x))
+            result.y[s] = self._sign * model.row_signs.values * y[:, j]
+            self._is_solved[s] = True
+
+    def is_dual_feasible(self, d):
+        model = self._model
+        tol = model.SOLVER_PARAM.PIVOT_TOL
+        status = model.var_status[:, None]
+        is_infeasible = ((status == BasisStatus.AT_LOWER) & (d < -tol)) | \
+                        ((status == BasisStatus.AT_UPPER) & (d > tol)) | \
+                        ((status == BasisStatus.FREE) & (np.abs(d) > tol))
+        is_infeasible[model.lb == model.ub] = False
+        return ~np.any(is_infeasible, axis=0)
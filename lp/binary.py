@@ -0,0 +1,171 @@
+import json
+import struct
+
+import numpy as np
+
+from lp.entity import ObjectiveType, VarType, VarNameType, Variable, Constraint, Expression, \
+    Objective, UnknownModelError
+from lp.helper import GrowingArray, EntityList
+
+BINARY_MAGIC = b'LPSOLVER'
+# the version changes with the arrays of the format: 2 adds the row signs of the constraints,
+# and 3 writes the coefficients as a canonical CSC matrix whose column pointers are read back
+BINARY_VERSION = 3
+BINARY_ALIGNMENT = 64
+BINARY_ARRAYS = ('var_lb', 'var_ub', 'var_obj', 'var_types', 'rhs', 'senses', 'row_signs',
+                 'a_rows', 'a_cols', 'a_vals', 'a_indptr', 'name_ends', 'names')
+
+
+class BinaryWriter:
+    """
+    This writes a model to a binary file that can be memory-mapped back. The file starts with
+    a magic string, the length of a json header, and the header, which keeps the scalars of the
+    model and the dtype, shape and offset of each array. The arrays follow as raw little endian
+    data, each aligned to 64 bytes.
+
+    The coefficients are written in column major order with duplicates summed, so the row
+    indices, values and column pointers form the CSC matrix of the constraints, and the column
+    indices are kept next to them so that they can be mapped into the column store. The
+    variable names are kept as one utf-8 string with the end offset of each name.
+
+    Parameters
+    ==========
+    model       : Model class to write
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    def write(self, path):
+        model = self._model
+        arrays = self.get_arrays()
+        header = {'version': BINARY_VERSION,
+                  'name': model.name,
+                  'obj_type': int(model.obj.obj_type) if model.obj is not None
+                  else int(ObjectiveType.MIN),
+                  'constant': model.obj.expr.constant
+                  if model.obj is not None and model.obj.expr is not None else 0.0,
+                  'n_rows': model.n_rows,
+                  'n_cols': model.n_cols,
+                  'arrays': {}}
+        offset = 0
+        for key in BINARY_ARRAYS:
+            header['arrays'][key] = {'dtype': arrays[key].dtype.str,
+                                     'shape': len(arrays[key]),
+                                     'offset': offset}
+            offset = get_aligned(offset + arrays[key].nbytes)
+        encoded = json.dumps(header).encode('utf-8')
+        data_start = get_aligned(len(BINARY_MAGIC) + 8 + len(encoded))
+        with open(path, 'wb') as file:
+            file.write(BINARY_MAGIC)
+            file.write(struct.pack('<Q', len(encoded)))
+            file.write(encoded)
+            for key in BINARY_ARRAYS:
+                file.seek(data_start + header['arrays'][key]['offset'])
+                file.write(arrays[key].tobytes())
+            file.truncate(data_start + offset)
+
+    def get_arrays(self):
+        model = self._model
+        A = model.get_coefficient_matrix()
+        A.sum_duplicates()
+        indptr = A.indptr.astype(np.int64)
+        cols = np.repeat(np.arange(model.n_cols, dtype=np.int64), np.diff(indptr))
+        names = [var.name.encode('utf-8') for var in model.vars]
+        name_ends = np.cumsum(np.fromiter((len(name) for name in names), dtype=np.int64,
+                                          count=len(names)))
+        arrays = {'var_lb': model.var_lb.values,
+                  'var_ub': model.var_ub.values,
+                  'var_obj': model.var_obj.values,
+                  'var_types': model.var_types.values,
+                  'rhs': model.rhs.values,
+                  'senses': model.senses.values,
+                  'row_signs': model.row_signs.values,
+                  'a_rows': A.indices.astype(np.int64),
+                  'a_cols': cols,
+                  'a_vals': A.data,
+                  'a_indptr': indptr,
+                  'name_ends': name_ends,
+                  'names': np.frombuffer(b''.join(names), dtype=np.uint8)}
+        return {key: array.astype(array.dtype.newbyteorder('<'), copy=False)
+                for key, array in arrays.items()}
+
+
+class BinaryReader:
+    """
+    This reads a model from a binary file written by BinaryWriter. With mmap, the arrays are
+    mapped copy-on-write from the file straight into the column store of the model, so loading
+    takes no copy, the pages are read on demand and shared by the processes that map the same
+    file, and a change to the model is never written back to the file. The column pointers are
+    kept on the model, so the CSC matrix of the constraints is built from the mapped arrays
+    with no sorting until the column store changes. The variable and constraint handles are
+    created on first access.
+
+    Parameters
+    ==========
+    model       : Model class to read into, which has no variables or constraints yet
+    mmap        : bool whether or not the arrays are memory-mapped instead of read into memory
+    """
+
+    def __init__(self, model, mmap=True):
+        self._model = model
+        self._mmap = mmap
+
+    def read(self, path):
+        model = self._model
+        header, data_start = self.read_header(path)
+        arrays = {}
+        for key in BINARY_ARRAYS:
+            spec = header['arrays'][key]
+            arrays[key] = self.read_array(path, np.dtype(spec['dtype']), spec['shape'],
+                                          data_start + spec['offset'])
+        n_rows, n_cols = header['n_rows'], header['n_cols']
+        model.name = header['name']
+        model.obj = Objective(Expression(header['constant']), ObjectiveType(header['obj_type']))
+        model.var_lb = GrowingArray.wrap(arrays['var_lb'])
+        model.var_ub = GrowingArray.wrap(arrays['var_ub'])
+        model.var_obj = GrowingArray.wrap(arrays['var_obj'])
+        model.var_types = GrowingArray.wrap(arrays['var_types'])
+        model.rhs = GrowingArray.wrap(arrays['rhs'])
+        model.senses = GrowingArray.wrap(arrays['senses'])
+        model.row_signs = GrowingArray.wrap(arrays['row_signs'])
+        model._a_rows = GrowingArray.wrap(arrays['a_rows'])
+        model._a_cols = GrowingArray.wrap(arrays['a_cols'])
+        model._a_vals = GrowingArray.wrap(arrays['a_vals'])
+        model._a_indptr = arrays['a_indptr']
+        types = arrays['var_types']
+        model.is_mip = bool(np.any((types == VarType.BINARY) | (types == VarType.INTEGER)))
+        name_ends, names = arrays['name_ends'], arrays['names']
+
+        def create_var(j):
+            start = name_ends[j - 1] if j > 0 else 0
+            name = names[start:name_ends[j]].tobytes().decode('utf-8')
+            return Variable(model, j, name, VarNameType.PRIMAL)
+
+        model.vars = EntityList(create_var, n_cols)
+        model.consts = EntityList(lambda i: Constraint(model, i), n_rows)
+        model.n_rows = n_rows
+        model.n_cols = n_cols
+
+    def read_header(self, path):
+        with open(path, 'rb') as file:
+            if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise UnknownModelError('Unknown binary model file: {0}'.format(path))
+            length, = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(length).decode('utf-8'))
+        if header['version'] != BINARY_VERSION:
+            raise UnknownModelError('Unknown binary model version: {0}'.format(header['version']))
+        return header, get_aligned(len(BINARY_MAGIC) + 8 + length)
+
+    def read_array(self, path, dtype, shape, offset):
+        if shape == 0:
+            return np.empty(0, dtype=dtype)
+        if self._mmap:
+            return np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=(shape,))
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            return np.fromfile(file, dtype=dtype, count=shape)
+
+
+def get_aligned(offset):
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
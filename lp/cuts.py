@@ -0,0 +1,295 @@
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+
+from lp.entity import BasisStatus, Sense
+
+
+class GomorySeparator:
+    """
+    This separates Gomory mixed-integer cuts from the rows of the optimal tableau whose basic
+    column is integer with a fractional value. With the nonbasic columns shifted to be zero at
+    their bound, the row of basic column i reads x_i + sum(a_j x_j) = x_i*, and rounding its
+    coefficients against the fraction f_0 of x_i* gives a cut sum(g_j x_j) >= 1 that the LP
+    solution violates, where g_j is min(f_j / f_0, (1 - f_j) / (1 - f_0)) for the fraction f_j
+    of an integer column, and a_j / f_0 or -a_j / (1 - f_0) for a continuous one. The slack and
+    surplus columns in the cut are replaced by their rows, so cuts are on the variables only.
+
+    Rows of B^-1 A are computed for all source rows at once with BTRAN over a block of unit
+    vectors. Cuts from nearly integral values or with a large ratio of their largest to smallest
+    coefficient are left out, since they are numerically unsafe.
+
+    Parameters
+    ==========
+    model       : Model class with an optimal basis and its factorization
+    int_cols    : numpy array of column indices of integer and binary variables
+
+    Properties
+    ==========
+    _is_int     : numpy array of whether or not each variable is integer
+    """
+
+    # bound on the number of cuts separated in a round
+    MAX_CUTS = 50
+    # smallest fraction of the basic value of a source row
+    MIN_FRACTION = 0.01
+    # largest ratio of the largest to the smallest coefficient of a cut
+    MAX_DYNAMISM = 1e6
+    # coefficients below this ratio to the largest one are relaxed away with a bound
+    ZERO_TOL = 1e-9
+
+    def __init__(self, model, int_cols):
+        self._model = model
+        self._is_int = np.zeros(model.n_cols, dtype=bool)
+        self._is_int[int_cols] = True
+
+    def separate(self):
+        """Returns the matrix and right hand sides of the cuts, as <= rows on the variables."""
+        model = self._model
+        n = model.n_cols
+        basis = model.basis
+        values = model.x[basis]
+        fraction = values - np.floor(values)
+        is_int_basic = np.zeros(len(basis), dtype=bool)
+        is_int_basic[basis < n] = self._is_int[basis[basis < n]]
+        positions = np.flatnonzero(is_int_basic & (fraction >= self.MIN_FRACTION) &
+                                   (fraction <= 1.0 - self.MIN_FRACTION))
+        positions = positions[np.argsort(np.abs(fraction[positions] - 0.5),
+                                         kind='stable')][:self.MAX_CUTS]
+        if len(positions) == 0:
+            return csr_matrix((0, n)), np.zeros(0)
+        E = np.zeros((len(basis), len(positions)))
+        E[positions, np.arange(len(positions))] = 1.0
+        tableau = model.A.T.dot(model.factor.btran_many(E)).T
+        # nonbasic columns are shifted to their bound and negated at the upper one
+        status = model.var_status
+        at_upper = status == BasisStatus.AT_UPPER
+        bound = np.where(at_upper, model.ub,
+                         np.where(status == BasisStatus.FREE, 0.0, model.lb))
+        direction = np.where(at_upper, -1.0, 1.0)
+        is_fixed = (status == BasisStatus.BASIC) | (model.lb == model.ub)
+        tableau[:, is_fixed] = 0.0
+        is_free = np.any(tableau[:, status == BasisStatus.FREE] != 0.0, axis=1)
+        a = tableau * direction
+        f_0 = fraction[positions][:, None]
+        f = a - np.floor(a)
+        is_int = np.zeros(model.A.shape[1], dtype=bool)
+        is_int[:n] = self._is_int
+        g = np.where(is_int, np.minimum(f / f_0, (1.0 - f) / (1.0 - f_0)),
+                     np.where(a >= 0.0, a / f_0, -a / (1.0 - f_0)))
+        g[:, is_fixed] = 0.0
+        # the cut sum(g_j d_j (x_j - bound_j)) >= 1, with each logical column as its row
+        coeffs = g * direction
+        rhs = 1.0 + coeffs[:, ~is_fixed].dot(bound[~is_fixed])
+        w = model.A[:, n:].dot(coeffs[:, n:].T).T
+        coeffs = coeffs[:, :n] - model.A[:, :n].T.dot(w.T).T
+        rhs -= w.dot(model.b)
+        return self.get_safe_cuts(-coeffs[~is_free], -rhs[~is_free])
+
+    def get_safe_cuts(self, coeffs, rhs):
+        """Returns the <= cuts with their tiny coefficients relaxed away, or left out if unsafe."""
+        model = self._model
+        n = model.n_cols
+        lb = model.lb[:n]
+        ub = model.ub[:n]
+        x = model.x[:n]
+        rows = []
+        kept_rhs = []
+        for alpha, beta in zip(coeffs, rhs):
+            largest = np.abs(alpha).max(initial=0.0)
+            if largest == 0.0:
+                continue
+            alpha = alpha / largest
+            beta = beta / largest
+            tiny = np.flatnonzero((alpha != 0.0) & (np.abs(alpha) < self.ZERO_TOL))
+            # a positive term is at least its value at the lower bound, a negative one at the upper
+            relaxed = np.where(alpha[tiny] > 0.0, alpha[tiny] * lb[tiny], alpha[tiny] * ub[tiny])
+            tiny = tiny[np.isfinite(relaxed)]
+            beta -= relaxed[np.isfinite(relaxed)].sum()
+            alpha[tiny] = 0.0
+            magnitude = np.abs(alpha[alpha != 0.0])
+            if magnitude.max() > self.MAX_DYNAMISM * magnitude.min() or \
+                    not np.isfinite(beta) or alpha.dot(x) <= beta:
+                continue
+            rows.append(csr_matrix(alpha))
+            kept_rhs.append(beta)
+        if not rows:
+            return csr_matrix((0, n)), np.zeros(0)
+        return vstack(rows, format='csr'), np.array(kept_rhs)
+
+
+class KnapsackCoverSeparator:
+    """
+    This separates cover cuts from the rows that are knapsacks over binary variables. A row
+    a x <= b, or a >= or equality row in this form, is relaxed to its binary columns by moving
+    the other columns to the bound that makes their term smallest, and its binary columns with
+    negative coefficients are complemented, so that it becomes sum(w_j y_j) <= beta with positive
+    weights. A cover C is a set of columns whose weights exceed beta, so at most |C| - 1 of them
+    can be one. The cover is picked greedily by the ratio of 1 - y_j to w_j in the LP solution,
+    and extended with every column at least as heavy as the heaviest in the cover.
+
+    Parameters
+    ==========
+    model       : Model class
+    int_cols    : numpy array of column indices of integer and binary variables
+
+    Properties
+    ==========
+    _knapsacks  : list of (columns, weights, complemented, capacity) tuples of the knapsack rows
+    """
+
+    # smallest violation of a cover cut by the LP solution
+    VIOLATION_TOL = 1e-6
+
+    def __init__(self, model, int_cols):
+        self._model = model
+        self._knapsacks = []
+        n = model.n_cols
+        A = model.A[:, :n].tocsr()
+        lb = model.lb[:n]
+        ub = model.ub[:n]
+        is_binary = np.zeros(n, dtype=bool)
+        is_binary[int_cols] = (lb[int_cols] == 0.0) & (ub[int_cols] == 1.0)
+        senses = model.senses.values
+        for i in range(len(senses)):
+            start, end = A.indptr[i], A.indptr[i + 1]
+            cols = A.indices[start:end]
+            for sign in (1.0, -1.0):
+                if senses[i] == (Sense.GE if sign > 0 else Sense.LE):
+                    continue
+                self.add_knapsack(cols, sign * A.data[start:end], sign * model.b[i],
+                                  is_binary[cols], lb[cols], ub[cols])
+
+    def add_knapsack(self, cols, a, beta, is_binary, lb, ub):
+        """Adds the knapsack relaxation of the row a x <= beta, if it has one with a cover."""
+        smallest = np.where(a > 0.0, a * lb, a * ub)[~is_binary]
+        if not np.all(np.isfinite(smallest)):
+            return
+        beta -= smallest.sum()
+        is_complemented = a < 0.0
+        beta -= a[is_binary & is_complemented].sum()
+        is_item = is_binary & (a != 0.0)
+        weights = np.abs(a[is_item])
+        if len(weights) < 2 or beta < 0.0 or weights.sum() <= beta * (1.0 + 1e-9) + 1e-9:
+            return
+        self._knapsacks.append((cols[is_item], weights, is_complemented[is_item], beta))
+
+    def separate(self):
+        """Returns the matrix and right hand sides of the cuts, as <= rows on the variables."""
+        model = self._model
+        x = model.x
+        tol = model.SOLVER_PARAM.INTEGRALITY_TOL
+        rows = []
+        cols = []
+        vals = []
+        rhs = []
+        for knapsack_cols, weights, is_complemented, beta in self._knapsacks:
+            y = np.where(is_complemented, 1.0 - x[knapsack_cols], x[knapsack_cols])
+            if np.all(np.abs(y - np.round(y)) <= tol):
+                continue
+            order = np.argsort((1.0 - y) / weights, kind='stable')
+            # the cover takes columns until its weight exceeds beta safely
+            k = np.searchsorted(np.cumsum(weights[order]), beta * (1.0 + 1e-9) + 1e-9,
+                                side='right')
+            if k >= len(order):
+                continue
+            cover = order[:k + 1]
+            if y[cover].sum() <= k + self.VIOLATION_TOL:
+                continue
+            is_extended = weights >= weights[cover].max()
+            is_extended[cover] = True
+            items = np.flatnonzero(is_extended)
+            rows.extend(np.full(len(items), len(rhs)))
+            cols.extend(knapsack_cols[items])
+            vals.extend(np.where(is_complemented[items], -1.0, 1.0))
+            rhs.append(k - np.count_nonzero(is_complemented[items]))
+        return csr_matrix((vals, (rows, cols)), shape=(len(rhs), model.n_cols)), \
+            np.array(rhs, dtype=np.float64)
+
+
+class CutPool:
+    """
+    This keeps the cuts added to the model. A separated cut enters the model only if its
+    efficacy, the distance of the LP solution to its hyperplane, is large enough, and it is not
+    nearly parallel to a cut in the pool or a more efficacious one added with it. Cuts are
+    appended to the model with their slack column basic, so the dual Simplex algorithm
+    continues from the current basis. A cut ages by one every round its slack column stays
+    basic, and is removed from the model once its age reaches the limit.
+
+    Parameters
+    ==========
+    model       : Model class
+
+    Properties
+    ==========
+    _consts     : list of Constraint classes of the cuts in the model
+    _ages       : numpy array of the number of rounds each cut has been inactive
+    _rows       : scipy csr matrix of the cuts scaled to unit norm
+    """
+
+    # smallest distance of the LP solution to the hyperplane of a cut
+    MIN_EFFICACY = 1e-4
+    # largest cosine of the angle between two cuts
+    MAX_PARALLELISM = 0.98
+    # number of inactive rounds after which a cut is removed
+    MAX_AGE = 3
+
+    def __init__(self, model):
+        self._model = model
+        self._consts = []
+        self._ages = np.zeros(0, dtype=np.int64)
+        self._rows = csr_matrix((0, model.n_cols))
+
+    def __len__(self):
+        return len(self._consts)
+
+    def add(self, A, rhs):
+        """Adds the efficacious cuts that are not parallel to others, and returns their number."""
+        model = self._model
+        norms = np.sqrt(np.asarray(A.multiply(A).sum(axis=1)).ravel())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficacy = (A.dot(model.x[:model.n_cols]) - rhs) / norms
+        candidates = np.flatnonzero(efficacy > self.MIN_EFFICACY)
+        candidates = candidates[np.argsort(-efficacy[candidates], kind='stable')]
+        if len(candidates) == 0:
+            return 0
+        rows = csr_matrix(A[candidates].multiply(1.0 / norms[candidates][:, None]))
+        pool_cosines = rows.dot(self._rows.T).toarray().max(axis=1, initial=-1.0)
+        cosines = rows.dot(rows.T).toarray()
+        selected = []
+        for k in np.flatnonzero(pool_cosines <= self.MAX_PARALLELISM):
+            if np.all(cosines[k, selected] <= self.MAX_PARALLELISM):
+                selected.append(k)
+        if not selected:
+            return 0
+        first = model.n_rows
+        cuts = A[candidates[selected]]
+        # cuts on the scaled columns are kept on the variables in the constraints
+        if model.scaling is not None:
+            cuts = csr_matrix(cuts.multiply(1.0 / model.scaling.col_scale))
+        self._consts.extend(model.add_constrs(cuts, Sense.LE, rhs[candidates[selected]]))
+        model.append_rows(first)
+        self._ages = np.concatenate((self._ages, np.zeros(len(selected), dtype=np.int64)))
+        self._rows = vstack((self._rows, rows[selected]), format='csr')
+        return len(selected)
+
+    def age(self):
+        """Ages the cuts whose slack column is basic, and resets the age of the others."""
+        is_basic = self._model.get_basic_rows()[[const.index for const in self._consts]]
+        self._ages = np.where(is_basic, self._ages + 1, 0)
+
+    def purge(self, max_age):
+        """Removes the cuts whose age reached max_age from the model."""
+        is_old = self._ages >= max_age
+        if not np.any(is_old):
+            return
+        self._model.remove_basic_rows([const for const, old in zip(self._consts, is_old) if old])
+        self._consts = [const for const, old in zip(self._consts, is_old) if not old]
+        self._ages = self._ages[~is_old]
+        self._rows = self._rows[np.flatnonzero(~is_old)]
+
+    def clear(self):
+        """Removes all cuts from the constraints of the model, leaving the prepared matrices."""
+        self._model.remove_constrs(self._consts)
+        self._consts = []
+        self._ages = np.zeros(0, dtype=np.int64)
+        self._rows = csr_matrix((0, self._model.n_cols))
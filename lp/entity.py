@@ -1,4 +1,5 @@
 import enum
+import numbers
 import sys
 
 
@@ -13,35 +14,249 @@ class ProblemInstance:
 
 
 class Variable:
-    def __init__(self, lb, ub, name,
-                 var_type, var_name_type):
-        self.lb = lb
-        self.ub = ub
+    """
+    This is a handle of a column of the model. Its bounds, type, and cost are kept in the column
+    store of the model, so that variables added in bulk share the same storage.
+
+    Parameters
+    ==========
+    model           : Model class the variable belongs to
+    index           : int column index of the variable in the model
+    name            : str name of the variable
+    var_name_type   : VarNameType of the variable
+    """
+    __slots__ = ('_model', 'index', 'name', 'var_name_type')
+
+    def __init__(self, model, index, name='',
+                 var_name_type=None):
+        self._model = model
+        self.index = index
         self.name = name
-        self.var_type = var_type
         self.var_name_type = var_name_type
-        self.value = 0.0
-        self.coeff_c = 0.0
-        self.coeffs_a = {}
-        self.in_basis = False
+
+    @property
+    def lb(self):
+        return self._model.var_lb.values[self.index].item()
+
+    @lb.setter
+    def lb(self, value):
+        self._model.var_lb.values[self.index] = value
+
+    @property
+    def ub(self):
+        return self._model.var_ub.values[self.index].item()
+
+    @ub.setter
+    def ub(self, value):
+        self._model.var_ub.values[self.index] = value
+
+    @property
+    def var_type(self):
+        return VarType(self._model.var_types.values[self.index])
+
+    @property
+    def coeff_c(self):
+        return self._model.var_obj.values[self.index].item()
+
+    @coeff_c.setter
+    def coeff_c(self, value):
+        self._model.var_obj.values[self.index] = value
+
+    @property
+    def value(self):
+        return self._model.get_value(self)
+
+    @property
+    def reduced_cost(self):
+        return self._model.get_reduced_cost(self)
+
+    # numpy scalars defer to the reflected operators below
+    __array_ufunc__ = None
+
+    def to_expression(self):
+        expr = Expression()
+        expr.add_term(1.0, self)
+        return expr
+
+    def __add__(self, other):
+        return self.to_expression() + other
+
+    def __radd__(self, other):
+        return self.to_expression() + other
+
+    def __sub__(self, other):
+        return self.to_expression() - other
+
+    def __rsub__(self, other):
+        return other - self.to_expression()
+
+    def __mul__(self, other):
+        return self.to_expression() * other
+
+    def __rmul__(self, other):
+        return self.to_expression() * other
+
+    def __neg__(self):
+        return self.to_expression() * -1.0
 
 
 class Expression:
-    def __init__(self):
-        self.vars = []
-        self.vals = []
+    """
+    This is a linear expression of variables plus a constant. The coefficients are kept in a dict
+    keyed by variable, so that terms of the same variable are combined as they are added.
+
+    Expressions support +, - and multiplication by a scalar with variables, other expressions,
+    and numbers. The in-place operators += and -= extend the expression itself, which keeps
+    building an expression term by term linear; quicksum does the same for a sequence.
+
+    Parameters
+    ==========
+    constant    : double constant term of the expression
+
+    Properties
+    ==========
+    terms       : dict of coefficients of the variables
+    vars        : list of variables of the expression
+    vals        : list of coefficients of the variables
+    """
+    __slots__ = ('terms', 'constant')
+
+    # numpy scalars defer to the reflected operators below
+    __array_ufunc__ = None
+
+    def __init__(self, constant=0.0):
+        self.terms = {}
+        self.constant = constant
+
+    def __len__(self):
+        return len(self.terms)
+
+    @property
+    def vars(self):
+        return list(self.terms)
+
+    @property
+    def vals(self):
+        return list(self.terms.values())
 
     def add_term(self, coeff, var):
-        self.vars.append(var)
-        self.vals.append(coeff)
+        terms = self.terms
+        terms[var] = terms.get(var, 0.0) + coeff
+
+    def add_terms(self, coeffs, variables):
+        terms = self.terms
+        for coeff, var in zip(coeffs, variables):
+            terms[var] = terms.get(var, 0.0) + coeff
+
+    def add(self, other, scale=1.0):
+        """Adds scale times a variable, an expression, or a number to the expression in place."""
+        if isinstance(other, Expression):
+            terms = self.terms
+            for var, coeff in other.terms.items():
+                terms[var] = terms.get(var, 0.0) + scale * coeff
+            self.constant += scale * other.constant
+        elif isinstance(other, Variable):
+            self.add_term(scale, other)
+        elif isinstance(other, numbers.Real):
+            self.constant += scale * other
+        else:
+            raise TypeError('Unsupported operand for an expression: {0}'.format(type(other).__name__))
+        return self
+
+    def copy(self):
+        expr = Expression(self.constant)
+        expr.terms = self.terms.copy()
+        return expr
+
+    def __add__(self, other):
+        if not isinstance(other, LINEAR_TYPES):
+            return NotImplemented
+        return self.copy().add(other)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __iadd__(self, other):
+        if not isinstance(other, LINEAR_TYPES):
+            return NotImplemented
+        return self.add(other)
+
+    def __sub__(self, other):
+        if not isinstance(other, LINEAR_TYPES):
+            return NotImplemented
+        return self.copy().add(other, -1.0)
+
+    def __rsub__(self, other):
+        if not isinstance(other, LINEAR_TYPES):
+            return NotImplemented
+        return (self * -1.0).add(other)
+
+    def __isub__(self, other):
+        if not isinstance(other, LINEAR_TYPES):
+            return NotImplemented
+        return self.add(other, -1.0)
+
+    def __mul__(self, other):
+        if not isinstance(other, numbers.Real):
+            return NotImplemented
+        expr = Expression(self.constant * other)
+        expr.terms = {var: coeff * other for var, coeff in self.terms.items()}
+        return expr
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __neg__(self):
+        return self * -1.0
+
+
+LINEAR_TYPES = (Expression, Variable, numbers.Real)
+
+
+def quicksum(terms):
+    """Returns the sum of variables, expressions, numbers, or (coefficient, variable) pairs."""
+    expr = Expression()
+    for term in terms:
+        if isinstance(term, tuple):
+            expr.add_term(term[0], term[1])
+        else:
+            expr.add(term)
+    return expr
 
 
 class Constraint:
-    def __init__(self, expr=None,
-                 sense=None, rhs=0):
+    """
+    This is a handle of a row of the model. Its sense and right hand side are kept in the row
+    store of the model, and its dual value is read from the solution of the model.
+
+    Parameters
+    ==========
+    model       : Model class the constraint belongs to
+    index       : int row index of the constraint in the model
+    expr        : Expression of the constraint if it is added from an expression
+    """
+    __slots__ = ('_model', 'index', 'expr')
+
+    def __init__(self, model, index, expr=None):
+        self._model = model
+        self.index = index
         self.expr = expr
-        self.sense = sense
-        self.rhs = rhs
+
+    @property
+    def sense(self):
+        return Sense(self._model.senses.values[self.index])
+
+    @property
+    def rhs(self):
+        return self._model.rhs.values[self.index].item()
+
+    @property
+    def dual(self):
+        return self._model.get_dual(self)
+
+    @property
+    def slack(self):
+        return self._model.get_slack(self)
 
 
 class Objective:
@@ -52,17 +267,117 @@ class Objective:
 
 
 class Result:
+    """
+    This keeps the result of a solve. Values of the constraints and variables are listed in the
+    order they are added; ranges are [lower, upper] pairs.
+
+    Properties
+    ==========
+    duals           : list of duals of the constraints if the LP problem is optimal, else None
+    reduced_costs   : list of reduced costs of the variables if the LP problem is optimal,
+                      else None
+    slacks          : list of right hand side minus activity of the constraints if a solution
+                      is found, else None
+    rhs_ranges      : list of right hand side ranges of the constraints over which the duals
+                      stay the same, if SolverParam.SENSITIVITY and the LP problem is optimal
+    cost_ranges     : list of cost ranges of the variables over which the solution stays
+                      optimal, if SolverParam.SENSITIVITY and the LP problem is optimal
+    """
     def __init__(self, status='NONE',
-                 obj_val=0, solution=None):
+                 obj_val=0, solution=None, iterations=0,
+                 nodes=0, mip_gap=0.0, presolve=None, statistics=None,
+                 duals=None, reduced_costs=None, slacks=None,
+                 rhs_ranges=None, cost_ranges=None):
         self.status = status
         self.obj_val = obj_val
         self.solution = solution
+        self.iterations = iterations
+        self.nodes = nodes
+        self.mip_gap = mip_gap
+        self.presolve = presolve
+        self.statistics = statistics
+        self.duals = duals
+        self.reduced_costs = reduced_costs
+        self.slacks = slacks
+        self.rhs_ranges = rhs_ranges
+        self.cost_ranges = cost_ranges
+
+
+class BatchResult:
+    """
+    This keeps the results of the scenarios of a batch solve, stacked in scenario order.
+
+    Properties
+    ==========
+    status          : numpy array of AlgorithmStatus of the scenarios
+    obj_val         : numpy array of objective values of the scenarios
+    x               : numpy array of values of the variables with a row per scenario
+    y               : numpy array of duals of the constraints with a row per scenario, as given
+                      by Model.get_duals, or None for a MIP problem
+    iterations      : numpy array of Simplex iterations of the scenarios
+    statistics      : dict of timers and counters if SolverParam.STATISTICS, else None
+    """
+    def __init__(self, status=None, obj_val=None, x=None, y=None,
+                 iterations=None, statistics=None):
+        self.status = status
+        self.obj_val = obj_val
+        self.x = x
+        self.y = y
+        self.iterations = iterations
+        self.statistics = statistics
+
+
+class IterationEvent:
+    """
+    This is passed to the callback of Model.solve after every Simplex iteration.
+
+    Properties
+    ==========
+    algorithm       : SolverParam.Algorithm of the iteration
+    phase           : int 1 while the primal or network Simplex algorithm minimizes the
+                      artificials, else 2
+    iteration       : int number of the iteration in the current LP solve
+    obj_val         : double objective value in minimization form of the model being solved,
+                      which is the reduced model if presolve is on
+    infeasibility   : double sum of the primal infeasibilities
+    entering_var    : int column index of the entering variable
+    leaving_var     : int column index of the leaving variable, or -1 if the entering variable
+                      flips between its bounds
+    step            : double step length of the entering variable
+    is_degenerate   : bool whether or not the step length is zero
+    """
+    __slots__ = ('algorithm', 'phase', 'iteration', 'obj_val', 'infeasibility',
+                 'entering_var', 'leaving_var', 'step', 'is_degenerate')
+
+    def __init__(self, algorithm, phase, iteration, obj_val, infeasibility,
+                 entering_var, leaving_var, step, is_degenerate):
+        self.algorithm = algorithm
+        self.phase = phase
+        self.iteration = iteration
+        self.obj_val = obj_val
+        self.infeasibility = infeasibility
+        self.entering_var = entering_var
+        self.leaving_var = leaving_var
+        self.step = step
+        self.is_degenerate = is_degenerate
 
 
 class Node:
-    def __init__(self, model,
-                 is_pruned=False):
-        self.model = model
+    __slots__ = ('parent', 'col', 'lb', 'ub', 'value', 'warm_start',
+                 'lp_bound', 'estimate', 'depth', 'is_pruned')
+
+    def __init__(self, parent=None, col=-1, lb=0.0, ub=0.0, value=0.0,
+                 warm_start=None, lp_bound=-sys.float_info.max,
+                 estimate=-sys.float_info.max, is_pruned=False):
+        self.parent = parent
+        self.col = col
+        self.lb = lb
+        self.ub = ub
+        self.value = value
+        self.warm_start = warm_start
+        self.lp_bound = lp_bound
+        self.estimate = estimate
+        self.depth = 0 if parent is None else parent.depth + 1
         self.is_pruned = is_pruned
 
 
@@ -72,10 +387,46 @@ class SolverParam:
         NONE = 0
         DFS = 1
         BFS = 2
+        BEST_BOUND = 3
+        BEST_ESTIMATE = 4
+        HYBRID = 5
+
+    class Pricing(enum.IntEnum):
+        NONE = 0
+        DANTZIG = 1
+        PARTIAL = 2
+        DEVEX = 3
+        STEEPEST_EDGE = 4
+
+    class Algorithm(enum.IntEnum):
+        NONE = 0
+        PRIMAL_SIMPLEX = 1
+        DUAL_SIMPLEX = 2
+        NETWORK_SIMPLEX = 3
+        INTERIOR_POINT = 4
 
     MIP_GAP = 0.0
     TIME_LIMIT = sys.float_info.max
     BRANCHING_ALGORITHM = BranchingAlgorithm.DFS
+    PRICING = Pricing.DANTZIG
+    ALGORITHM = Algorithm.PRIMAL_SIMPLEX
+    REFACTOR_FREQUENCY = 100
+    PIVOT_TOL = 1e-9
+    FEASIBILITY_TOL = 1e-7
+    DRIVE_OUT_TOL = 1e-7
+    INTEGRALITY_TOL = 1e-6
+    INTERIOR_POINT_TOL = 1e-8
+    THREADS = 1
+    DETERMINISTIC = True
+    PRESOLVE = True
+    NETWORK = True
+    CROSSOVER = True
+    CUTS = True
+    HEURISTICS = True
+    SCALING = True
+    STATISTICS = False
+    SENSITIVITY = False
+    VERBOSE = True
 
 
 class Sense(enum.IntEnum):
@@ -106,12 +457,21 @@ class VarNameType(enum.IntEnum):
     ARTIFICIAL = 4
 
 
+class BasisStatus(enum.IntEnum):
+    NONE = 0
+    BASIC = 1
+    AT_LOWER = 2
+    AT_UPPER = 3
+    FREE = 4
+
+
 class AlgorithmStatus(enum.IntEnum):
     NONE = 0
     OPTIMAL = 1
     FEASIBLE = 2
     INFEASIBLE = 3
     UNBOUNDED = 4
+    CUTOFF = 5
 
 
 class UnknownVariableError(Exception):
@@ -0,0 +1,129 @@
+import numpy as np
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+
+class BasisFactorization:
+    """
+    This keeps a sparse LU factorization of the basis matrix and updates it after each pivot.
+
+    The basis B_0 of the last refactorization is factored as P_r B_0 P_c = L U. Every
+    following pivot appends a sparse eta column, so that B_k = B_0 E_1 ... E_k, and the
+    factors are rebuilt from scratch once the eta file reaches the refactorization frequency.
+
+    A row added to the model with its own logical column basic borders the basis as
+    [[B_k, 0], [r, s]]. Since this equals [[B_0, 0], [r E^-1, s]] times the eta columns, the
+    row is kept as a border of B_0 after passing it through the eta file, and the bordered
+    B_0 is solved by block substitution.
+
+    Parameters
+    ==========
+    refactor_frequency : int number of rank-one updates allowed before the basis is refactored
+
+    Properties
+    ==========
+    _lu                : SuperLU object of the last refactored basis
+    _etas              : list of (pivot row, nonzero indices, nonzero values, pivot value) tuples
+    _borders           : list of (row, diagonal value) tuples of the rows added to B_0
+    n_updates          : int number of updates since the last refactorization
+    n_factorizations   : int number of refactorizations done so far
+    """
+
+    def __init__(self, refactor_frequency=100):
+        self.refactor_frequency = refactor_frequency
+        self._lu = None
+        self._etas = []
+        self._borders = []
+        self.n_updates = 0
+        self.n_factorizations = 0
+
+    @property
+    def needs_refactor(self):
+        return self.n_updates >= self.refactor_frequency
+
+    def factorize(self, B):
+        if B.shape[0] > 0:
+            self._lu = splu(csc_matrix(B, dtype=np.float64),
+                            permc_spec='COLAMD')
+        self._etas = []
+        self._borders = []
+        self.n_updates = 0
+        self.n_factorizations += 1
+
+    def ftran(self, a):
+        """Solves B x = a for x."""
+        x = np.array(a, dtype=np.float64).ravel()
+        if len(x) == 0:
+            return x.copy()
+        x = self.solve_bordered(x)
+        for p, idx, vals, pivot in self._etas:
+            x_p = x[p] / pivot
+            if x_p != 0.0:
+                x[idx] -= x_p * vals
+            x[p] = x_p
+        return x
+
+    def btran(self, a):
+        """Solves B^T y = a for y."""
+        y = np.array(a, dtype=np.float64).ravel()
+        if len(y) == 0:
+            return y
+        for p, idx, vals, pivot in reversed(self._etas):
+            y[p] = (y[p] - vals.dot(y[idx])) / pivot
+        return self.solve_bordered_transposed(y)
+
+    def ftran_many(self, a):
+        """Solves B X = A for X, where the columns of A are right hand sides."""
+        x = np.array(a, dtype=np.float64).reshape(len(a), -1)
+        if x.shape[0] == 0 or x.shape[1] == 0:
+            return x
+        x = self.solve_bordered(x)
+        for p, idx, vals, pivot in self._etas:
+            x_p = x[p] / pivot
+            x[idx] -= np.outer(vals, x_p)
+            x[p] = x_p
+        return x
+
+    def btran_many(self, a):
+        """Solves B^T Y = A for Y, where the columns of A are right hand sides."""
+        y = np.array(a, dtype=np.float64).reshape(len(a), -1)
+        if y.shape[0] == 0 or y.shape[1] == 0:
+            return y
+        for p, idx, vals, pivot in reversed(self._etas):
+            y[p] = (y[p] - vals.dot(y[idx])) / pivot
+        return self.solve_bordered_transposed(y)
+
+    def update(self, p, alpha):
+        """Replaces the basic column at position p, where alpha = B^-1 a_q of the entering column."""
+        idx = np.flatnonzero(alpha)
+        idx = idx[idx != p]
+        self._etas.append((p, idx, alpha[idx].copy(), alpha[p]))
+        self.n_updates += 1
+
+    def add_row(self, r, s):
+        """Borders the basis with the row r over its positions and the diagonal value s."""
+        r = np.array(r, dtype=np.float64)
+        for p, idx, vals, pivot in reversed(self._etas):
+            r[p] = (r[p] - vals.dot(r[idx])) / pivot
+        self._borders.append((r, s))
+
+    def solve_bordered(self, x):
+        """Solves the bordered B_0 x = a in place of a by forward substitution over the borders."""
+        m = len(x) - len(self._borders)
+        if m > 0:
+            x[:m] = self._lu.solve(x[:m])
+        for r, s in self._borders:
+            x[m] = (x[m] - r.dot(x[:m])) / s
+            m += 1
+        return x
+
+    def solve_bordered_transposed(self, y):
+        """Solves the bordered B_0^T y = a in place of a by back substitution over the borders."""
+        m = len(y)
+        for r, s in reversed(self._borders):
+            m -= 1
+            y[m] /= s
+            y[:m] -= np.multiply.outer(r, y[m])
+        if m > 0:
+            y[:m] = self._lu.solve(y[:m], trans='T')
+        return y
@@ -1,19 +1,35 @@
+import gzip
+
 import numpy as np
 
 from lp.entity import Sense
 
 
-def get_c_b(basis):
-    coeffs = []
-    for var in basis:
-        coeffs.append(var.coeff_c)
-    return np.asarray(coeffs, dtype=np.float32).reshape((1, len(coeffs)))
+def get_column(A, j):
+    column = np.zeros(A.shape[0])
+    start, end = A.indptr[j], A.indptr[j + 1]
+    column[A.indices[start:end]] = A.data[start:end]
+    return column
+
+
+def open_file(path, mode='rt'):
+    """Opens a text file, which is gzipped if it is read with a gzip header or written as .gz."""
+    if 'r' in mode:
+        with open(path, 'rb') as file:
+            is_gzip = file.read(2) == b'\x1f\x8b'
+    else:
+        is_gzip = str(path).endswith('.gz')
+    if is_gzip:
+        return gzip.open(path, mode)
+    return open(path, mode)
 
 
-def get_first_or_default(var):
-    if not var:
-        return None
-    return var[0]
+def get_file_format(path):
+    """Returns the lowercase extension of a path, skipping a final .gz."""
+    name = str(path).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return name.rsplit('.', 1)[-1] if '.' in name else ''
 
 
 def set_reverse_sense(sense):
@@ -24,3 +40,109 @@ def set_reverse_sense(sense):
     else:
         return Sense.EQ
 
+
+class GrowingArray:
+    """
+    This keeps a numpy array whose capacity doubles whenever it is full, so that values can be
+    appended one at a time or in bulk in amortized constant time per value.
+
+    Parameters
+    ==========
+    dtype       : numpy dtype of the values
+
+    Properties
+    ==========
+    values      : numpy array view of the values appended so far
+    """
+
+    def __init__(self, dtype=np.float64):
+        self._data = np.empty(16, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def wrap(cls, values):
+        """Wraps a numpy array, such as a memory map, as a full growing array without a copy."""
+        array = cls(values.dtype)
+        array._data = values
+        array._size = len(values)
+        return array
+
+    @property
+    def values(self):
+        return self._data[:self._size]
+
+    def reserve(self, capacity):
+        if capacity > len(self._data):
+            data = np.empty(max(capacity, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def append(self, value):
+        self.reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype).ravel()
+        self.reserve(self._size + len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def compress(self, mask):
+        """Keeps the values where mask is True in place, in their order."""
+        values = self.values[mask]
+        self._data[:len(values)] = values
+        self._size = len(values)
+
+
+class EntityList:
+    """
+    This keeps the variables or constraints of a model as a list whose handles are created on
+    first access, so that a model loaded with many entities does not build all of them up front.
+    Handles are cached, so an index always gives the same object.
+
+    Parameters
+    ==========
+    create      : function that returns the handle of an index
+    size        : int number of entities
+    """
+
+    def __init__(self, create, size=0):
+        self._create = create
+        self._items = [None] * size
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._create(index % len(self._items))
+        return item
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def append(self, item):
+        self._items.append(item)
+
+    def extend(self, items):
+        self._items.extend(items)
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+
+def remove_handle(handles, index):
+    """Removes the handle at index from a list or EntityList and shifts the handles after it."""
+    del handles[index]
+    items = handles._items if isinstance(handles, EntityList) else handles
+    for handle in items[index:]:
+        if handle is not None:
+            handle.index -= 1
@@ -0,0 +1,226 @@
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Sense
+
+
+class PrimalHeuristic:
+    """
+    This is the base of the primal heuristics of the MIP solver, which look for an integer
+    feasible solution from the optimal LP of a node. A heuristic runs at the root and then at
+    every FREQUENCY-th node, or only at the root if FREQUENCY is 0. A heuristic that changes
+    the LP restores the bounds, costs, and basis of the node before it returns.
+
+    Parameters
+    ==========
+    solver      : MIPSolver class which reoptimizes the LP of the node
+    model       : Model class with an optimal LP at the node
+    int_cols    : numpy array of column indices of integer and binary variables
+    lb          : numpy array of lower bounds of the columns at the root
+    ub          : numpy array of upper bounds of the columns at the root
+
+    Properties
+    ==========
+    _A             : scipy csr matrix of the rows of the LP over the variables
+    n_iterations   : int number of Simplex iterations of the last run
+    """
+
+    FREQUENCY = 1
+
+    def __init__(self, solver, model, int_cols, lb, ub):
+        self._solver = solver
+        self._model = model
+        self._int_cols = int_cols
+        self._lb = lb[:model.n_cols]
+        self._ub = ub[:model.n_cols]
+        self._A = model.A[:, :model.n_cols].tocsr()
+        self.n_iterations = 0
+
+    def is_due(self, n_nodes):
+        return n_nodes == 0 or (self.FREQUENCY > 0 and n_nodes % self.FREQUENCY == 0)
+
+    def run(self, cutoff):
+        """Returns the column values and objective of a solution below cutoff, or None."""
+        raise NotImplementedError
+
+    def get_solution(self, x, c, cutoff):
+        """Returns the values and objective of x if it is integer feasible and below cutoff."""
+        model = self._model
+        n = model.n_cols
+        tol = model.SOLVER_PARAM.FEASIBILITY_TOL
+        values = x[self._int_cols]
+        if np.any(np.abs(values - np.round(values)) > model.SOLVER_PARAM.INTEGRALITY_TOL) or \
+                np.any(x[:n] < self._lb - tol) or np.any(x[:n] > self._ub + tol):
+            return None
+        residual = self._A.dot(x[:n]) - model.b
+        senses = model.senses.values
+        violation = np.where(senses == Sense.LE, residual,
+                             np.where(senses == Sense.GE, -residual, np.abs(residual)))
+        if np.any(violation > tol * (1.0 + np.abs(model.b))):
+            return None
+        obj_val = c.dot(x)
+        if obj_val >= cutoff:
+            return None
+        return x.copy(), obj_val
+
+    def save_lp(self):
+        model = self._model
+        return (model.lb.copy(), model.ub.copy(), model.c, model.x.copy(),
+                model.var_status.copy(), model.basis.copy(), model.obj.value)
+
+    def restore_lp(self, state):
+        model = self._model
+        lb, ub, model.c, model.x, model.var_status, model.basis, model.obj.value = state
+        model.lb[:] = lb
+        model.ub[:] = ub
+        model.factor.factorize(model.get_basis_matrix())
+
+
+class RoundingHeuristic(PrimalHeuristic):
+    """
+    This rounds the fractional integer columns of the LP solution. A column is rounded down if
+    no row locks it in that direction, that is, no row can be violated by decreasing it, and up
+    if no row locks it upwards; either way the rounded solution stays feasible. The other
+    columns are rounded to the nearest integer, and the solution is checked.
+
+    Properties
+    ==========
+    _down_locks : numpy array of the number of rows that a decrease of each variable can violate
+    _up_locks   : numpy array of the number of rows that an increase of each variable can violate
+    """
+
+    FREQUENCY = 1
+
+    def __init__(self, solver, model, int_cols, lb, ub):
+        super().__init__(solver, model, int_cols, lb, ub)
+        A = self._A.tocoo()
+        senses = model.senses.values[A.row]
+        is_up = ((senses == Sense.LE) & (A.data > 0.0)) | \
+                ((senses == Sense.GE) & (A.data < 0.0)) | (senses == Sense.EQ)
+        is_down = ((senses == Sense.LE) & (A.data < 0.0)) | \
+                  ((senses == Sense.GE) & (A.data > 0.0)) | (senses == Sense.EQ)
+        self._up_locks = np.bincount(A.col[is_up], minlength=model.n_cols)
+        self._down_locks = np.bincount(A.col[is_down], minlength=model.n_cols)
+
+    def run(self, cutoff):
+        model = self._model
+        self.n_iterations = 0
+        x = model.x.copy()
+        cols = self._int_cols
+        values = x[cols]
+        x[cols] = np.where(self._down_locks[cols] == 0, np.floor(values),
+                           np.where(self._up_locks[cols] == 0, np.ceil(values),
+                                    np.round(values)))
+        return self.get_solution(x, model.c, cutoff)
+
+
+class DivingHeuristic(PrimalHeuristic):
+    """
+    This dives from the LP solution of a node by fixing the least fractional integer column to
+    its nearest integer, through its lower or upper bound, and reoptimizing with the dual
+    Simplex algorithm warm started from the current basis. If the LP becomes infeasible or
+    reaches the cutoff, the column is rounded the other way once; the dive stops when both fail,
+    when the LP solution is integer, or when its iteration budget is spent.
+    """
+
+    FREQUENCY = 10
+    # bound on the number of Simplex iterations of a dive
+    MAX_ITERATIONS = 1000
+
+    def run(self, cutoff):
+        model = self._model
+        self.n_iterations = 0
+        state = self.save_lp()
+        tol = model.SOLVER_PARAM.INTEGRALITY_TOL
+        solution = None
+        while self.n_iterations <= self.MAX_ITERATIONS:
+            values = model.x[self._int_cols]
+            distance = np.abs(values - np.round(values))
+            if np.all(distance <= tol):
+                solution = self.get_solution(model.x, model.c, cutoff)
+                break
+            k = np.flatnonzero(distance > tol)[np.argmin(distance[distance > tol])]
+            col = self._int_cols[k]
+            value = values[k]
+            lb, ub = model.lb[col], model.ub[col]
+            status = AlgorithmStatus.NONE
+            for is_up in (value - np.floor(value) >= 0.5, value - np.floor(value) < 0.5):
+                model.lb[col] = np.ceil(value) if is_up else lb
+                model.ub[col] = ub if is_up else np.floor(value)
+                simplex_solver = self._solver.reoptimize(cutoff)
+                self.n_iterations += simplex_solver.n_iterations
+                status = simplex_solver.status
+                if status == AlgorithmStatus.OPTIMAL:
+                    break
+            if status != AlgorithmStatus.OPTIMAL:
+                break
+        self.restore_lp(state)
+        return solution
+
+
+class FeasibilityPump(PrimalHeuristic):
+    """
+    This alternates between rounding the integer columns of an LP solution and solving the LP
+    that minimizes the distance to the rounding, until both meet. The distance to a column
+    rounded to its lower bound is its value above it, and to one rounded to its upper bound its
+    value below it; a general integer column rounded between its bounds is pulled towards the
+    rounding in the direction of its LP value. The original objective is mixed into the
+    distance with a weight that decays every round, and a rounding seen before is perturbed by
+    flipping its columns farthest from the LP values. The distance LPs start from the current
+    basis, which stays primal feasible since only the costs change.
+
+    The pump looks for a first incumbent, so it does nothing once one is found.
+    """
+
+    FREQUENCY = 0
+    MAX_ROUNDS = 20
+    # number of columns flipped when a rounding repeats
+    N_FLIPS = 10
+    # decay of the weight of the original objective
+    DECAY = 0.9
+
+    def run(self, cutoff):
+        model = self._model
+        self.n_iterations = 0
+        if np.isfinite(cutoff):
+            return None
+        state = self.save_lp()
+        c = model.c
+        c_norm = max(np.linalg.norm(c), 1.0)
+        lb = model.lb[self._int_cols]
+        ub = model.ub[self._int_cols]
+        tol = model.SOLVER_PARAM.INTEGRALITY_TOL
+        weight = 1.0
+        seen = set()
+        solution = None
+        for _ in range(self.MAX_ROUNDS):
+            values = model.x[self._int_cols]
+            rounding = np.clip(np.round(values), lb, ub)
+            distance = np.abs(values - rounding)
+            if np.all(distance <= tol):
+                solution = self.get_solution(model.x, c, cutoff)
+                break
+            if rounding.tobytes() in seen:
+                flips = np.argsort(-distance, kind='stable')[:self.N_FLIPS]
+                flips = flips[distance[flips] > tol]
+                rounding[flips] = np.clip(np.where(rounding[flips] > values[flips],
+                                                   rounding[flips] - 1.0,
+                                                   rounding[flips] + 1.0), lb[flips], ub[flips])
+            seen.add(rounding.tobytes())
+            direction = np.where(rounding <= lb, 1.0, np.where(
+                rounding >= ub, -1.0, np.where(values > rounding, 1.0, -1.0)))
+            pump_c = np.zeros(len(c))
+            pump_c[self._int_cols] = direction / np.linalg.norm(direction)
+            model.c = (1.0 - weight) * pump_c + weight * c / c_norm
+            weight *= self.DECAY
+            simplex_solver = self._solver.reoptimize(is_dual=False)
+            self.n_iterations += simplex_solver.n_iterations
+            model.c = c
+            if simplex_solver.status != AlgorithmStatus.OPTIMAL:
+                break
+        self.restore_lp(state)
+        return solution
+
+
+def create_heuristics(solver, model, int_cols, lb, ub):
+    return [heuristic(solver, model, int_cols, lb, ub)
+            for heuristic in (RoundingHeuristic, FeasibilityPump, DivingHeuristic)]
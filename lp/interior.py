@@ -0,0 +1,330 @@
+import numpy as np
+from scipy.sparse import csc_matrix, diags, identity
+from scipy.sparse.linalg import splu
+
+from lp.entity import AlgorithmStatus, BasisStatus, IterationEvent, Sense, SolverParam
+from lp.factorization import BasisFactorization
+
+
+class InteriorPointSolver:
+    """
+    This solves the LP relaxation of a model with Mehrotra's predictor-corrector primal-dual
+    interior point method. Columns are written as t >= 0 from their finite bound, with an upper
+    bound t <= u if they have both; fixed columns are left out, and free columns are split into
+    two. Every iteration factorizes the normal equations A D A^T of the sparse coefficient
+    matrix, and solves them twice, for the affine scaling direction and for the centered one.
+
+    The solution of the method is in the interior of the optimal face, so the crossover builds a
+    basis from it: starting from the slack, surplus, and artificial columns of the rows, the
+    columns farthest from their bounds replace the rows they pivot on best, and the others are
+    moved to their nearest bound. The Simplex algorithm continues from that basis.
+
+    Parameters
+    ==========
+    model           : Model class whose coefficient matrices are prepared
+
+    Properties
+    ==========
+    n_iterations    : int number of interior point iterations
+    status          : AlgorithmStatus.OPTIMAL if the method converged, else NONE
+    _cols           : numpy array of the model column of every column of the method
+    _signs          : numpy array of 1 for the columns above their lower bound, -1 below their
+                      upper bound
+    _offset         : numpy array of the values of the model columns where t is zero
+    _upper          : numpy array of the columns of the method with an upper bound
+    """
+
+    MAX_ITERATIONS = 200
+    STEP_FACTOR = 0.9995
+
+    def __init__(self, model):
+        self._model = model
+        self._statistics = model.statistics
+        self._callback = model.callback
+        self.n_iterations = 0
+        self.status = AlgorithmStatus.NONE
+        lb = model.lb
+        ub = model.ub
+        has_lb = np.isfinite(lb)
+        has_ub = np.isfinite(ub)
+        is_fixed = has_lb & (lb == ub)
+        is_free = ~has_lb & ~has_ub
+        lower_cols = np.flatnonzero(has_lb & ~is_fixed)
+        upper_cols = np.flatnonzero(~has_lb & has_ub)
+        free_cols = np.flatnonzero(is_free)
+        self._cols = np.concatenate((lower_cols, upper_cols, free_cols, free_cols))
+        self._signs = np.concatenate((np.ones(len(lower_cols)), -np.ones(len(upper_cols)),
+                                      np.ones(len(free_cols)), -np.ones(len(free_cols))))
+        self._offset = np.where(has_lb, lb, np.where(has_ub, ub, 0.0))
+        self._upper = np.flatnonzero(np.isfinite(ub[lower_cols]))
+        self._u = (ub - lb)[lower_cols[self._upper]]
+        self._A = csc_matrix(model.A[:, self._cols].dot(diags(self._signs)))
+        self._b = model.b - model.A.dot(self._offset)
+        self._c = model.c[self._cols] * self._signs
+        self._obj_constant = model.c.dot(self._offset)
+        self._t = None
+        self._w = None
+        self._y = None
+        self._z = None
+        self._v = None
+        if self._statistics is not None:
+            self.factorize = self._statistics.timed(self.factorize, 'factorization')
+            self.solve_newton = self._statistics.timed(self.solve_newton, 'ftran')
+
+    def run(self):
+        tol = self._model.SOLVER_PARAM.INTERIOR_POINT_TOL
+        A = self._A
+        b = self._b
+        c = self._c
+        u = self._u
+        upper = self._upper
+        if not self.set_starting_point():
+            return
+        t, w, y, z, v = self._t, self._w, self._y, self._z, self._v
+        n_pairs = max(len(t) + len(w), 1)
+        b_norm = 1.0 + np.abs(b).max(initial=0.0)
+        c_norm = 1.0 + np.abs(c).max(initial=0.0)
+        u_norm = 1.0 + np.abs(u).max(initial=0.0)
+        while self.n_iterations < self.MAX_ITERATIONS:
+            r_b = b - A.dot(t)
+            r_u = u - t[upper] - w
+            r_c = c - A.T.dot(y) - z
+            r_c[upper] += v
+            primal_obj = c.dot(t)
+            dual_obj = b.dot(y) - u.dot(v)
+            if np.abs(r_b).max(initial=0.0) <= tol * b_norm and \
+                    np.abs(r_u).max(initial=0.0) <= tol * u_norm and \
+                    np.abs(r_c).max(initial=0.0) <= tol * c_norm and \
+                    abs(primal_obj - dual_obj) <= tol * (1.0 + abs(primal_obj)):
+                self.status = AlgorithmStatus.OPTIMAL
+                break
+            mu = (t.dot(z) + w.dot(v)) / n_pairs
+            # the iterates diverge, or become complementary without being feasible, if the
+            # model is infeasible or unbounded
+            if max(np.abs(t).max(initial=0.0), np.abs(y).max(initial=0.0)) > 1.0 / tol ** 2 or \
+                    mu <= tol ** 2 * (1.0 + abs(primal_obj)):
+                break
+            with np.errstate(divide='ignore', over='ignore'):
+                d = z / t
+                d[upper] += v / w
+                d = 1.0 / d
+            if not np.all(np.isfinite(d)) or not self.factorize(d):
+                break
+            # affine scaling direction
+            dt, dw, dy, dz, dv = self.solve_newton(d, r_b, r_u, r_c, -t * z, -w * v)
+            alpha_p = min(1.0, self.get_step_length((t, w), (dt, dw)))
+            alpha_d = min(1.0, self.get_step_length((z, v), (dz, dv)))
+            mu_affine = ((t + alpha_p * dt).dot(z + alpha_d * dz) +
+                         (w + alpha_p * dw).dot(v + alpha_d * dv)) / n_pairs
+            sigma = (mu_affine / mu) ** 3 if mu > 0.0 else 0.0
+            # centered direction with the second order correction
+            dt, dw, dy, dz, dv = self.solve_newton(d, r_b, r_u, r_c,
+                                                   sigma * mu - t * z - dt * dz,
+                                                   sigma * mu - w * v - dw * dv)
+            alpha_p = min(1.0, self.STEP_FACTOR * self.get_step_length((t, w), (dt, dw)))
+            alpha_d = min(1.0, self.STEP_FACTOR * self.get_step_length((z, v), (dz, dv)))
+            if max(alpha_p, alpha_d) < tol:
+                break
+            t += alpha_p * dt
+            w += alpha_p * dw
+            y += alpha_d * dy
+            z += alpha_d * dz
+            v += alpha_d * dv
+            self.n_iterations += 1
+            if self._statistics is not None or self._callback is not None:
+                self.record_iteration(r_b, r_u, alpha_p)
+
+    def set_starting_point(self):
+        """Sets the starting point of Mehrotra from the least squares solutions of the rows, or
+        returns False if the rows are dependent."""
+        A = self._A
+        u = self._u
+        upper = self._upper
+        if not self.factorize(np.ones(A.shape[1])):
+            return False
+        t = A.T.dot(self.solve_normal(self._b))
+        y = self.solve_normal(A.dot(self._c))
+        z = self._c - A.T.dot(y)
+        t += max(-1.5 * t.min(initial=0.0), 0.0)
+        z += max(-1.5 * z.min(initial=0.0), 0.0)
+        tz = t.dot(z)
+        t, z = (np.maximum(t + 0.5 * tz / max(z.sum(), 1.0), 1.0),
+                np.maximum(z + 0.5 * tz / max(t.sum(), 1.0), 1.0))
+        # the columns with an upper bound start between their bounds
+        t[upper] = np.clip(t[upper], 0.1 * u, 0.9 * u)
+        self._t = t
+        self._w = u - t[upper]
+        self._y = y
+        self._z = z
+        self._v = z[upper].copy()
+        return True
+
+    def factorize(self, d):
+        """Factorizes the normal equations A D A^T with a small regularization, or returns False
+        if they are too ill conditioned."""
+        A = self._A
+        M = csc_matrix(A.dot(diags(d)).dot(A.T))
+        regularization = 0.0
+        for step in range(6):
+            try:
+                self._lu = splu(M + regularization * identity(M.shape[0], format='csc'),
+                                permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                                options=dict(SymmetricMode=True)) if M.shape[0] > 0 else None
+                if self._statistics is not None:
+                    self._statistics.counters['factorizations'] += 1
+                return True
+            except RuntimeError:
+                regularization = 1e-12 * 100.0 ** step * (1.0 + M.diagonal().max(initial=0.0))
+        return False
+
+    def solve_normal(self, rhs):
+        return self._lu.solve(rhs) if self._lu is not None else rhs.copy()
+
+    def solve_newton(self, d, r_b, r_u, r_c, r_tz, r_wv):
+        """Returns the Newton direction for the residuals of the rows and complementarity."""
+        A = self._A
+        t, w, z, v = self._t, self._w, self._z, self._v
+        upper = self._upper
+        r = r_c - r_tz / t
+        r[upper] += (r_wv - v * r_u) / w
+        dy = self.solve_normal(r_b + A.dot(d * r))
+        dt = d * (A.T.dot(dy) - r)
+        dw = r_u - dt[upper]
+        dz = (r_tz - z * dt) / t
+        dv = (r_wv - v * dw) / w
+        return dt, dw, dy, dz, dv
+
+    @staticmethod
+    def get_step_length(values, deltas):
+        """Returns the longest step along the deltas that keeps the values nonnegative."""
+        step = np.inf
+        for value, delta in zip(values, deltas):
+            is_decreasing = delta < 0.0
+            if np.any(is_decreasing):
+                step = min(step, np.min(-value[is_decreasing] / delta[is_decreasing]))
+        return step
+
+    def record_iteration(self, r_b, r_u, step):
+        if self._statistics is not None:
+            self._statistics.counters['iterations'] += 1
+        if self._callback is not None:
+            self._callback(IterationEvent(SolverParam.Algorithm.INTERIOR_POINT, 2,
+                                          self.n_iterations,
+                                          float(self._c.dot(self._t) + self._obj_constant),
+                                          float(np.abs(r_b).sum() + np.abs(r_u).sum()),
+                                          -1, -1, float(step), False))
+
+    def get_values(self):
+        """Returns the values of the model columns at the current iterate."""
+        x = self._offset.copy()
+        np.add.at(x, self._cols, self._signs * self._t)
+        return x
+
+    def get_status(self):
+        """Returns the basis status the iterate indicates for the model columns, and a score of
+        how far they are from their bounds."""
+        model = self._model
+        n_total = model.A.shape[1]
+        t, z = self._t, self._z
+        # a column is at its bound if its distance to it is smaller than its dual
+        score = t / z
+        score[self._upper] = np.minimum(score[self._upper], self._w / self._v)
+        to_lower = t <= z
+        to_upper = np.zeros(len(t), dtype=bool)
+        to_upper[self._upper] = (self._w <= self._v) & ~to_lower[self._upper]
+        status = np.where(to_lower, BasisStatus.AT_LOWER,
+                          np.where(to_upper, BasisStatus.AT_UPPER, BasisStatus.BASIC))
+        # columns below their upper bound, and the negative parts of free columns, are reversed
+        status = np.where(self._signs < 0.0,
+                          np.where(status == BasisStatus.AT_LOWER, BasisStatus.AT_UPPER,
+                                   status), status)
+        var_status = np.where(np.isfinite(model.lb), BasisStatus.AT_LOWER,
+                              BasisStatus.AT_UPPER).astype(np.int8)
+        col_score = np.full(n_total, -np.inf)
+        n_single = len(self._cols) - 2 * np.count_nonzero(~np.isfinite(model.lb) &
+                                                          ~np.isfinite(model.ub))
+        var_status[self._cols[:n_single]] = status[:n_single]
+        col_score[self._cols[:n_single]] = score[:n_single]
+        # a free column is basic if either of its parts is
+        n_free = (len(self._cols) - n_single) // 2
+        free_cols = self._cols[n_single:n_single + n_free]
+        free_score = np.maximum(score[n_single:n_single + n_free], score[n_single + n_free:])
+        var_status[free_cols] = np.where(free_score > 1.0, BasisStatus.BASIC, BasisStatus.FREE)
+        col_score[free_cols] = free_score
+        col_score[var_status != BasisStatus.BASIC] = -np.inf
+        return var_status, col_score
+
+    def set_solution(self):
+        """Sets the values and duals of the model from the interior point solution."""
+        model = self._model
+        model.x = self.get_values()
+        model.var_status, _ = self.get_status()
+        model.y = self._y.copy()
+        model.obj.value = model.c.dot(model.x)
+        result = model.result
+        result.status = self.status
+        result.iterations += self.n_iterations
+        result.nodes += 1
+        if self._statistics is not None:
+            self._statistics.counters['nodes'] += 1
+        result.mip_gap = 0.0
+        model.prepare_result()
+
+    def crossover(self):
+        """
+        Sets the basis status of the model columns for a basis built from the interior point
+        solution, adding an artificial column fixed at zero for every equality row.
+        """
+        model = self._model
+        var_status, score = self.get_status()
+        model.result.iterations += self.n_iterations
+        # every row starts with its slack, surplus, or artificial column
+        senses = model.senses.values
+        eq_rows = np.flatnonzero(senses == Sense.EQ)
+        model.var_status = var_status
+        artificial_cols = model.add_artificial_cols(eq_rows, np.ones(len(eq_rows)))
+        model.ub[artificial_cols] = 0.0
+        basis = np.empty(model.n_rows, dtype=np.int64)
+        basis[model.get_slack_rows()] = model.get_slack_cols()
+        basis[model.get_surplus_rows()] = model.get_surplus_cols()
+        basis[eq_rows] = artificial_cols
+        is_open = np.ones(model.n_rows, dtype=bool)
+        is_logical = np.zeros(model.A.shape[1], dtype=bool)
+        is_logical[model.n_cols:] = True
+        factor = BasisFactorization(model.SOLVER_PARAM.REFACTOR_FREQUENCY)
+        if self._statistics is not None:
+            self._statistics.instrument_factor(factor)
+        factor.factorize(model.A[:, basis])
+        tol = model.SOLVER_PARAM.DRIVE_OUT_TOL
+        candidates = np.flatnonzero(np.isfinite(score))
+        for j in candidates[np.argsort(-score[candidates], kind='stable')]:
+            if not is_open.any():
+                break
+            if is_logical[j]:
+                # the logical column of its row stays basic
+                is_open[model.A.indices[model.A.indptr[j]]] = False
+                continue
+            alpha = factor.ftran(model.A[:, j].toarray().ravel())
+            k = int(np.argmax(np.where(is_open, np.abs(alpha), 0.0)))
+            if abs(alpha[k]) <= tol:
+                continue
+            basis[k] = j
+            is_open[k] = False
+            if factor.needs_refactor:
+                factor.factorize(model.A[:, basis])
+            else:
+                factor.update(k, alpha)
+        is_basic = np.zeros(model.A.shape[1], dtype=bool)
+        is_basic[basis] = True
+        x = self.get_values()
+        x = np.concatenate((x, np.zeros(model.A.shape[1] - len(x))))
+        # the columns left out of the basis go to their nearest bound
+        to_upper = np.isfinite(model.ub) & (~np.isfinite(model.lb) |
+                                             (model.ub - x < x - model.lb))
+        nonbasic_status = np.where(to_upper, BasisStatus.AT_UPPER, np.where(
+            np.isfinite(model.lb), BasisStatus.AT_LOWER, BasisStatus.FREE))
+        model.var_status = np.where(is_basic, BasisStatus.BASIC, np.where(
+            model.var_status == BasisStatus.BASIC, nonbasic_status,
+            model.var_status)).astype(np.int8)
+        if self._statistics is not None:
+            self._statistics.counters['factorizations'] += factor.n_factorizations
@@ -0,0 +1,340 @@
+import re
+
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from lp.entity import Sense, ObjectiveType, VarType, Expression, UnknownModelError
+from lp.helper import GrowingArray, open_file
+
+LP_SECTIONS = {'minimize': 'MIN', 'minimum': 'MIN', 'min': 'MIN',
+               'maximize': 'MAX', 'maximum': 'MAX', 'max': 'MAX',
+               'subject to': 'ST', 'such that': 'ST', 'st': 'ST', 's.t.': 'ST', 'st.': 'ST',
+               'bounds': 'BOUNDS', 'bound': 'BOUNDS',
+               'general': 'GENERALS', 'generals': 'GENERALS', 'gen': 'GENERALS',
+               'integer': 'GENERALS', 'integers': 'GENERALS',
+               'binary': 'BINARIES', 'binaries': 'BINARIES', 'bin': 'BINARIES',
+               'end': 'END'}
+LP_SENSES = {'<=': Sense.LE, '=<': Sense.LE, '<': Sense.LE,
+             '>=': Sense.GE, '=>': Sense.GE, '>': Sense.GE, '=': Sense.EQ}
+LP_TOKEN = re.compile(r'\s*(?:(<=|>=|=<|=>|<|>|=)|([+-])|(:)|'
+                      r'(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([^\s+\-<>=:]+))')
+LP_NAME = re.compile(r'^[A-Za-z_!"#$%&()/,.;?@`\'{}|~\[\]][^\s+\-<>=:\\*^]*$')
+LP_INFINITY = {'inf', 'infinity'}
+
+
+def get_tokens(line):
+    """Returns the (kind, text) tokens of a line, where kind is one of sense, sign, colon, number, name."""
+    tokens = []
+    for match in LP_TOKEN.finditer(line):
+        kind = match.lastindex
+        if kind is None:
+            break
+        text = match.group(kind)
+        if kind == 5 and text.lower() in LP_INFINITY:
+            tokens.append(('number', 'inf'))
+        else:
+            tokens.append((('sense', 'sign', 'colon', 'number', 'name')[kind - 1], text))
+    return tokens
+
+
+class LPReader:
+    """
+    This reads a model from a CPLEX LP file. The file is parsed line by line, and a constraint
+    may continue over several lines until its right hand side is read. The coefficients are
+    collected in growing arrays that are written into the column store of the model in bulk.
+    Gzipped files are detected from their header.
+
+    Objective, constraints, bounds, general, and binary sections are supported, and section
+    keywords are expected on a line of their own. Terms of the same variable in a row are
+    combined, and a constant on the left hand side is moved to the right hand side.
+
+    Parameters
+    ==========
+    model       : Model class to read into, which has no variables or constraints yet
+
+    Properties
+    ==========
+    _cols       : dict of column indices by column name
+    _pending    : list of tokens of the objective or the constraint being read
+    """
+
+    def __init__(self, model):
+        self._model = model
+        self._cols = {}
+        self._pending = []
+        self._names = []
+        self._lb = GrowingArray()
+        self._ub = GrowingArray()
+        self._obj = GrowingArray()
+        self._types = GrowingArray(np.int8)
+        self._senses = GrowingArray(np.int8)
+        self._rhs = GrowingArray()
+        self._a_rows = GrowingArray(np.int64)
+        self._a_cols = GrowingArray(np.int64)
+        self._a_vals = GrowingArray()
+        self._obj_type = ObjectiveType.MIN
+        self._obj_constant = 0.0
+
+    def read(self, path):
+        section = None
+        with open_file(path, 'rt') as file:
+            for line in file:
+                line = line.split('\\', 1)[0]
+                keyword = ' '.join(line.split()).lower()
+                if keyword in LP_SECTIONS:
+                    if section in ('MIN', 'MAX'):
+                        self.read_objective()
+                    section = LP_SECTIONS[keyword]
+                    if section in ('MIN', 'MAX'):
+                        self._obj_type = ObjectiveType[section]
+                    elif section == 'END':
+                        break
+                    continue
+                tokens = get_tokens(line)
+                if not tokens:
+                    continue
+                if section in ('MIN', 'MAX'):
+                    self._pending.extend(tokens)
+                elif section == 'ST':
+                    for token in tokens:
+                        self._pending.append(token)
+                        if self.is_constraint_complete():
+                            self.read_constraint()
+                elif section == 'BOUNDS':
+                    self.read_bound(tokens)
+                elif section in ('GENERALS', 'BINARIES'):
+                    self.read_types(tokens, section)
+                else:
+                    raise UnknownModelError('Unknown LP section.')
+        if section in ('MIN', 'MAX'):
+            self.read_objective()
+        if self._pending:
+            raise UnknownModelError('Incomplete constraint in LP file.')
+        self.add_to_model()
+        return self._model
+
+    def get_col(self, name):
+        j = self._cols.get(name)
+        if j is None:
+            j = len(self._names)
+            self._cols[name] = j
+            self._names.append(name)
+            self._lb.append(0.0)
+            self._ub.append(np.inf)
+            self._obj.append(0.0)
+            self._types.append(VarType.CONTINUOUS)
+        return j
+
+    def get_terms(self, tokens):
+        """Returns the dict of coefficients by column and the constant of a linear expression."""
+        terms = {}
+        constant = 0.0
+        sign, coeff = 1.0, None
+        for kind, text in tokens:
+            if kind == 'sign':
+                if coeff is not None:
+                    constant += sign * coeff
+                    sign, coeff = 1.0, None
+                if text == '-':
+                    sign = -sign
+            elif kind == 'number':
+                coeff = float(text) if coeff is None else coeff * float(text)
+            elif kind == 'name':
+                j = self.get_col(text)
+                terms[j] = terms.get(j, 0.0) + sign * (1.0 if coeff is None else coeff)
+                sign, coeff = 1.0, None
+            else:
+                raise UnknownModelError('Unexpected token in LP file: {0}'.format(text))
+        if coeff is not None:
+            constant += sign * coeff
+        return terms, constant
+
+    def strip_label(self, tokens):
+        if len(tokens) > 1 and tokens[0][0] == 'name' and tokens[1][0] == 'colon':
+            return tokens[2:]
+        return tokens
+
+    def read_objective(self):
+        terms, constant = self.get_terms(self.strip_label(self._pending))
+        for j, coeff in terms.items():
+            self._obj.values[j] += coeff
+        self._obj_constant += constant
+        self._pending = []
+
+    def is_constraint_complete(self):
+        pending = self._pending
+        if pending[-1][0] != 'number':
+            return False
+        for k in range(len(pending) - 2, -1, -1):
+            if pending[k][0] == 'sense':
+                return True
+            if pending[k][0] != 'sign':
+                return False
+        return False
+
+    def read_constraint(self):
+        tokens = self.strip_label(self._pending)
+        k = max(k for k, token in enumerate(tokens) if token[0] == 'sense')
+        terms, constant = self.get_terms(tokens[:k])
+        _, value = self.get_terms(tokens[k + 1:])
+        i = len(self._senses)
+        self._senses.append(LP_SENSES[tokens[k][1]])
+        self._rhs.append(value - constant)
+        self._a_rows.extend(np.full(len(terms), i))
+        self._a_cols.extend(list(terms.keys()))
+        self._a_vals.extend(list(terms.values()))
+        self._pending = []
+
+    def read_bound(self, tokens):
+        if len(tokens) == 2 and tokens[1][0] == 'name' and tokens[1][1].lower() == 'free':
+            j = self.get_col(tokens[0][1])
+            self._lb.values[j], self._ub.values[j] = -np.inf, np.inf
+            return
+        # the bound is split into numbers, senses, and the variable name
+        parts = []
+        sign = 1.0
+        for kind, text in tokens:
+            if kind == 'sign':
+                sign = -sign if text == '-' else sign
+            elif kind == 'number':
+                parts.append(('number', sign * float(text)))
+                sign = 1.0
+            else:
+                parts.append((kind, text))
+        names = [k for k, part in enumerate(parts) if part[0] == 'name']
+        if len(names) != 1:
+            raise UnknownModelError('Invalid bound in LP file.')
+        k = names[0]
+        j = self.get_col(parts[k][1])
+        # a bound left of the variable is read with the reverse sense
+        if k >= 2:
+            self.set_bound(j, LP_SENSES[parts[k - 1][1]], parts[k - 2][1], True)
+        if k + 2 < len(parts):
+            self.set_bound(j, LP_SENSES[parts[k + 1][1]], parts[k + 2][1], False)
+
+    def set_bound(self, j, sense, value, is_left):
+        if sense == Sense.EQ:
+            self._lb.values[j] = self._ub.values[j] = value
+        elif (sense == Sense.LE) != is_left:
+            self._ub.values[j] = value
+        else:
+            self._lb.values[j] = value
+
+    def read_types(self, tokens, section):
+        for kind, text in tokens:
+            j = self.get_col(text)
+            if section == 'BINARIES':
+                self._types.values[j] = VarType.BINARY
+                self._lb.values[j], self._ub.values[j] = 0.0, 1.0
+            else:
+                self._types.values[j] = VarType.INTEGER
+
+    def add_to_model(self):
+        model = self._model
+        n_rows = len(self._senses)
+        # the objective is set first so that the costs of the variables are kept
+        model.set_objective(Expression(self._obj_constant), self._obj_type)
+        model.add_vars(len(self._names), self._lb.values, self._ub.values, self._obj.values,
+                       self._types.values, self._names)
+        model.add_constrs(coo_matrix((self._a_vals.values, (self._a_rows.values, self._a_cols.values)),
+                                     shape=(n_rows, len(self._names))),
+                          self._senses.values, self._rhs.values)
+
+
+class LPWriter:
+    """
+    This writes a model to a CPLEX LP file, row by row from the column store, and gzips it if the
+    path ends with .gz. Rows are named c0, c1, ... and the objective obj. If any variable name
+    is not a valid LP name, variables are named x0, x1, ... instead.
+
+    Parameters
+    ==========
+    model       : Model class to write
+    """
+
+    TERMS_PER_LINE = 8
+
+    def __init__(self, model):
+        self._model = model
+
+    def write(self, path):
+        model = self._model
+        A = model.get_coefficient_matrix().tocsr()
+        names = [var.name for var in model.vars]
+        if not all(LP_NAME.match(name) and name.lower() not in LP_INFINITY | {'free'}
+                   for name in names):
+            names = ['x' + str(j) for j in range(model.n_cols)]
+        obj_type = model.obj.obj_type if model.obj is not None else ObjectiveType.MIN
+        constant = model.obj.expr.constant if model.obj is not None and \
+            model.obj.expr is not None else 0.0
+        costs = model.var_obj.values
+        with open_file(path, 'wt') as file:
+            file.write('\\ Problem name: {0}\n'.format(model.name))
+            file.write('Maximize\n' if obj_type == ObjectiveType.MAX else 'Minimize\n')
+            cols = np.flatnonzero(costs)
+            file.write(' obj:' + self.format_terms(names, cols, costs[cols]))
+            if constant != 0.0:
+                file.write(' ' + self.format_coeff(constant))
+            file.write('\nSubject To\n')
+            sense_names = {Sense.LE: '<=', Sense.GE: '>=', Sense.EQ: '='}
+            senses = model.senses.values.tolist()
+            rhs = model.rhs.values.tolist()
+            for i in range(model.n_rows):
+                start, end = A.indptr[i], A.indptr[i + 1]
+                terms = self.format_terms(names, A.indices[start:end], A.data[start:end])
+                if start == end:
+                    terms = ' 0 ' + names[0] if names else ' 0'
+                file.write(' c{0}:{1} {2} {3}\n'.format(i, terms, sense_names[senses[i]],
+                                                        repr(rhs[i])))
+            file.write('Bounds\n')
+            is_unused = (costs == 0.0) & (np.diff(A.tocsc().indptr) == 0)
+            for j in range(model.n_cols):
+                bound = self.format_bound(j, names[j])
+                # a column without any coefficient is declared by its default lower bound
+                if not bound and is_unused[j]:
+                    bound = '{0} >= 0'.format(names[j])
+                if bound:
+                    file.write(' ' + bound + '\n')
+            types = model.var_types.values
+            for section, var_type in (('Generals', VarType.INTEGER), ('Binaries', VarType.BINARY)):
+                cols = np.flatnonzero(types == var_type)
+                if len(cols) > 0:
+                    file.write(section + '\n')
+                    for k in range(0, len(cols), self.TERMS_PER_LINE):
+                        file.write(' ' + ' '.join(names[j] for j in cols[k:k + self.TERMS_PER_LINE])
+                                   + '\n')
+            file.write('End\n')
+
+    def format_coeff(self, coeff):
+        if coeff < 0.0:
+            return '- ' + repr(-float(coeff))
+        return '+ ' + repr(float(coeff))
+
+    def format_terms(self, names, cols, coeffs):
+        lines = []
+        for k in range(0, len(cols), self.TERMS_PER_LINE):
+            terms = [self.format_coeff(coeff) + ' ' + names[j]
+                     for j, coeff in zip(cols[k:k + self.TERMS_PER_LINE].tolist(),
+                                         coeffs[k:k + self.TERMS_PER_LINE].tolist())]
+            lines.append(' ' + ' '.join(terms))
+        return '\n  '.join(lines)
+
+    def format_bound(self, j, name):
+        model = self._model
+        lb, ub = float(model.var_lb.values[j]), float(model.var_ub.values[j])
+        has_lb = lb > -1e300
+        has_ub = ub < 1e300
+        if model.var_types.values[j] == VarType.BINARY and lb == 0.0 and ub == 1.0:
+            return ''
+        if has_lb and has_ub and lb == ub:
+            return '{0} = {1}'.format(name, repr(lb))
+        if not has_lb and not has_ub:
+            return '{0} free'.format(name)
+        if not has_lb:
+            return '-inf <= {0} <= {1}'.format(name, repr(ub))
+        if not has_ub:
+            return '{0} >= {1}'.format(name, repr(lb)) if lb != 0.0 else ''
+        # a negative upper bound alone may be read as a column unbounded below
+        if lb == 0.0 and ub >= 0.0:
+            return '{0} <= {1}'.format(name, repr(ub))
+        return '{0} <= {1} <= {2}'.format(repr(lb), name, repr(ub))
@@ -1,20 +1,44 @@
-import math
 import sys
 import time
 
 import numpy as np
+from scipy.sparse import coo_matrix, csc_matrix, hstack, vstack
 
-from lp.entity import VarNameType, Sense, ObjectiveType, \
+from lp.entity import AlgorithmStatus, BasisStatus, VarNameType, Sense, ObjectiveType, \
     Result, Variable, Constraint, Objective, \
     VarType, UnknownVariableError, UnknownModelError, SolverParam, Expression
-from lp.helper import get_first_or_default, set_reverse_sense
+from lp.batch import BatchSolver
+from lp.binary import BinaryReader, BinaryWriter
+from lp.factorization import BasisFactorization
+from lp.helper import set_reverse_sense, get_file_format, remove_handle, GrowingArray
+from lp.interior import InteriorPointSolver
+from lp.lpfile import LPReader, LPWriter
+from lp.mps import MPSReader, MPSWriter
+from lp.network import create_network_solver
+from lp.presolve import Presolver
+from lp.scaling import Scaling
+from lp.sensitivity import SensitivityAnalysis
 from lp.solver import MIPSolver, InitialBasicSolutionGenerator
+from lp.statistics import Statistics
 
 
 class Model:
     """
     The model contains variables, constraints, and objective of the problem.
 
+    An LP model keeps the basis of its last solve. After its right hand sides, costs, or bounds
+    are set, or constraints and variables are added or removed, the next solve starts from that
+    basis without presolve: the primal Simplex algorithm continues if the basis is still primal
+    feasible, and the dual Simplex algorithm otherwise.
+
+    Unless SolverParam.SCALING is False, the rows and columns of the prepared matrices are
+    scaled before the Simplex or interior point algorithms run, and the values, duals, and
+    objective of the solution are unscaled before its result is prepared.
+
+    A model whose constraints, after negating some of them, are the flow balances of a network
+    is solved by the network Simplex algorithm if SolverParam.NETWORK, which is also used for MIP
+    models whose integer columns have integral bounds and right hand sides.
+
     Parameters
     ===========
     name            : str defines the name of the model
@@ -27,17 +51,36 @@ class Model:
     result          : Result class contains the values of variables in the solution if exists
     is_mip          : bool whether or not the problem is MIP
     is_terminated   : bool whether or not the solution is completed
-    A               : dict of coefficient matrix A
+    algorithm       : SolverParam.Algorithm that solved the model in its last solve, or NONE if
+                      presolve did
+    A               : scipy csc matrix of coefficient matrix A; columns of the variables come first,
+                      followed by slack and surplus columns, and the artificial columns added
+                      for the initial basis
     b               : numpy array of b vector
-    basis           : list of variables in the basis
-    B_inv           : numpy array of basis matrix inverse
-    rhs             : list of right hand side values
+    c               : numpy array of cost vector c
+    lb              : numpy array of lower bounds of the columns
+    ub              : numpy array of upper bounds of the columns
+    x               : numpy array of column values
+    y               : numpy array of dual values of the constraints if the LP problem is optimal
+    basis           : numpy array of column indices in the basis
+    var_status      : numpy array of BasisStatus of the columns
+    factor          : BasisFactorization class of the basis matrix
+    scaling         : Scaling class of the prepared matrices while they are scaled, else None
+    var_lb          : GrowingArray of lower bounds of the variables
+    var_ub          : GrowingArray of upper bounds of the variables
+    var_obj         : GrowingArray of objective coefficients of the variables
+    var_types       : GrowingArray of VarType of the variables
+    rhs             : GrowingArray of right hand side values of the constraints
+    senses          : GrowingArray of Sense of the constraints
+    row_signs       : GrowingArray of -1 for the constraints negated to make their right hand
+                      side nonnegative, else 1
     n_rows          : int number of constraints
     n_cols          : int number of variables
     n_slack         : int number of slack variables
     n_surplus       : int number of surplus variables
     n_artificial    : int number of artificial variables
-    BIG_M           : double used to model artificial variables in the model
+    statistics      : Statistics class of the solve if SolverParam.STATISTICS, else None
+    callback        : function called with an IterationEvent after every Simplex iteration
     solution_time   : double total solution time in seconds
     """
 
@@ -51,37 +94,328 @@ class Model:
         self.result = Result()
         self.is_mip = False
         self.is_terminated = False
-        self.A = {}
+        self.algorithm = SolverParam.Algorithm.NONE
+        self.A = None
         self.b = None
-        self.basis = []
-        self.B_inv = None
-        self.rhs = []
+        self.c = None
+        self.lb = None
+        self.ub = None
+        self.x = None
+        self.y = None
+        self.basis = None
+        self.var_status = None
+        self.factor = None
+        self.scaling = None
+        self.var_lb = GrowingArray()
+        self.var_ub = GrowingArray()
+        self.var_obj = GrowingArray()
+        self.var_types = GrowingArray(np.int8)
+        self.rhs = GrowingArray()
+        self.senses = GrowingArray(np.int8)
+        self.row_signs = GrowingArray(np.int8)
         self.n_rows = 0
         self.n_cols = 0
         self.n_slack = 0
         self.n_surplus = 0
         self.n_artificial = 0
-        self.BIG_M = math.pow(10, 6)
         self.start_time = 0
         self.end_time = 0
+        self._a_rows = GrowingArray(np.int64)
+        self._a_cols = GrowingArray(np.int64)
+        self._a_vals = GrowingArray()
+        # column pointers of the column store while its terms are in column order, as loaded
+        self._a_indptr = None
+        self._slack_rows = None
+        self._surplus_rows = None
+        self.statistics = None
+        self.callback = None
+        self._has_basis = False
+        self._n_cols_solved = 0
+        self._row_map = None
+        # reduced costs and slacks of all variables and constraints, built on first use
+        self._reduced_costs = None
+        self._slacks = None
 
     @property
     def __str__(self):
         return self.name
 
-    def solve(self):
+    def solve(self, callback=None):
+        """Solves the model and returns its Result, calling callback after every iteration."""
+        self.start_time = time.perf_counter()
+        self.callback = callback
+        self.statistics = Statistics() if self.SOLVER_PARAM.STATISTICS else None
+        self.result = Result()
+        self.algorithm = SolverParam.Algorithm.NONE
+        if not self.resolve():
+            self.basis = None
+            self.prepare_coefficient_matrices()
+            if self.SOLVER_PARAM.PRESOLVE:
+                presolver = Presolver(self)
+                if self.statistics is not None:
+                    presolver.presolve = self.statistics.timed(presolver.presolve, 'presolve')
+                    presolver.postsolve = self.statistics.timed(presolver.postsolve, 'presolve')
+                reduced = presolver.presolve()
+                if reduced is not None:
+                    reduced.start_time = self.start_time
+                    reduced.statistics = self.statistics
+                    reduced.callback = callback
+                    reduced.run_solver()
+                    self.algorithm = reduced.algorithm
+                presolver.postsolve(reduced)
+            else:
+                self.run_solver()
+        self.keep_basis()
+        self.clear_solution_vectors()
+        self.prepare_sensitivity()
+        self.end_time = time.perf_counter()
+        solution_time = self.end_time - self.start_time
+        if self.statistics is not None:
+            self.statistics.timers['total'] = solution_time
+            self.result.statistics = self.statistics.to_dict()
+        if self.SOLVER_PARAM.VERBOSE:
+            if self.algorithm == SolverParam.Algorithm.NONE:
+                method = 'presolve'
+            elif self.algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                                    SolverParam.Algorithm.DUAL_SIMPLEX):
+                method = '{0} and {1} pricing'.format(self.algorithm.name,
+                                                      self.SOLVER_PARAM.PRICING.name)
+            else:
+                method = self.algorithm.name
+            print('Algorithm completed in {0} seconds and {1} iterations with {2}.'
+                  .format(round(solution_time, 4), self.result.iterations, method))
+        return self.result
+
+    def solve_batch(self, rhs=None, costs=None, callback=None):
+        """
+        Solves the model for each row of rhs, costs, or both, warm starting every scenario from
+        the basis of the previous one, and returns a BatchResult. Presolve is not used, since
+        the reductions depend on the right hand sides and costs.
+        """
         self.start_time = time.perf_counter()
+        self.callback = callback
+        self.statistics = Statistics() if self.SOLVER_PARAM.STATISTICS else None
         self.prepare_coefficient_matrices()
+        result = BatchSolver(self, rhs, costs).solve()
+        self.keep_basis()
+        self.clear_solution_vectors()
+        self.end_time = time.perf_counter()
+        solution_time = self.end_time - self.start_time
+        if self.statistics is not None:
+            self.statistics.timers['total'] = solution_time
+            result.statistics = self.statistics.to_dict()
+        if self.SOLVER_PARAM.VERBOSE:
+            print('Batch of {0} scenarios completed in {1} seconds and {2} iterations.'
+                  .format(len(result.status), round(solution_time, 4),
+                          int(result.iterations.sum())))
+        return result
+
+    def run_solver(self):
+        if self.has_crossed_bounds():
+            self.result.status = AlgorithmStatus.INFEASIBLE
+            return
+        network_solver = create_network_solver(self) if self.SOLVER_PARAM.NETWORK else None
+        if network_solver is not None:
+            self.algorithm = SolverParam.Algorithm.NETWORK_SIMPLEX
+            network_solver.run()
+            return
+        self.scale()
+        if self.SOLVER_PARAM.ALGORITHM == SolverParam.Algorithm.INTERIOR_POINT:
+            interior_point_solver = InteriorPointSolver(self)
+            interior_point_solver.run()
+            if interior_point_solver.status == AlgorithmStatus.OPTIMAL:
+                if not self.SOLVER_PARAM.CROSSOVER and not self.is_mip:
+                    self.algorithm = SolverParam.Algorithm.INTERIOR_POINT
+                    interior_point_solver.set_solution()
+                    return
+                interior_point_solver.crossover()
+                if self.solve_from_basis():
+                    # the Simplex iterations of the crossover are part of the interior point run
+                    self.algorithm = SolverParam.Algorithm.INTERIOR_POINT
+                    return
+            # the Simplex algorithm starts over if there is no basis
+            self.result = Result()
+            self.prepare_coefficient_matrices()
+            self.scale()
+        if self.SOLVER_PARAM.ALGORITHM == SolverParam.Algorithm.DUAL_SIMPLEX:
+            self.algorithm = SolverParam.Algorithm.DUAL_SIMPLEX
+        else:
+            self.algorithm = SolverParam.Algorithm.PRIMAL_SIMPLEX
         ibsg = InitialBasicSolutionGenerator(self)
         mip_solver = MIPSolver(self)
         if ibsg.generate():
             mip_solver.run()
+            if self.statistics is not None:
+                self.statistics.counters['factorizations'] += self.factor.n_factorizations
         else:
             raise UnknownModelError('Unknown model error.')
-        self.end_time = time.perf_counter()
-        solution_time = self.end_time - self.start_time
-        print('Algorithm completed in {0} seconds.'
-              .format(round(solution_time, 4)))
+
+    def resolve(self):
+        """Solves the LP model from the basis of its last solve, or returns False if it has none."""
+        if self.is_mip or not self._has_basis:
+            return False
+        if self._row_map is not None or self.n_cols != self._n_cols_solved:
+            self.restore_basis()
+        else:
+            self.update_coefficient_vectors()
+        # artificial columns are kept at zero
+        self.lb[self.get_artificial_cols()] = 0.0
+        self.ub[self.get_artificial_cols()] = 0.0
+        if self.has_crossed_bounds():
+            self.result.status = AlgorithmStatus.INFEASIBLE
+            return True
+        self.scale()
+        return self.solve_from_basis()
+
+    def has_crossed_bounds(self):
+        """Returns whether or not a prepared column has its lower bound above its upper bound."""
+        return bool(np.any(self.lb > self.ub + self.SOLVER_PARAM.FEASIBILITY_TOL))
+
+    def scale(self):
+        """Scales the prepared matrices if SolverParam.SCALING, and clears the duals."""
+        self.y = None
+        if self.SOLVER_PARAM.SCALING:
+            self.scaling = Scaling(self)
+            self.scaling.scale()
+
+    def solve_from_basis(self):
+        """
+        Solves the model from the basis status of its columns with the primal Simplex algorithm
+        if the basis is primal feasible, and the dual Simplex algorithm otherwise, or returns
+        False if the basic columns are not a basis.
+        """
+        self.set_nonbasic_values()
+        self.basis = np.flatnonzero(self.var_status == BasisStatus.BASIC)
+        if len(self.basis) != self.n_rows:
+            return False
+        self.factor = BasisFactorization(self.SOLVER_PARAM.REFACTOR_FREQUENCY)
+        if self.statistics is not None:
+            self.statistics.instrument_factor(self.factor)
+        try:
+            self.factor.factorize(self.get_basis_matrix())
+        except RuntimeError:
+            return False
+        x_b = self.factor.ftran(self.get_reduced_rhs())
+        self.x[self.basis] = x_b
+        tol = self.SOLVER_PARAM.FEASIBILITY_TOL
+        if np.all((x_b >= self.lb[self.basis] - tol) & (x_b <= self.ub[self.basis] + tol)):
+            algorithm = SolverParam.Algorithm.PRIMAL_SIMPLEX
+        else:
+            algorithm = SolverParam.Algorithm.DUAL_SIMPLEX
+        self.algorithm = algorithm
+        MIPSolver(self, algorithm).run()
+        if self.statistics is not None:
+            self.statistics.counters['factorizations'] += self.factor.n_factorizations
+        return True
+
+    def keep_basis(self):
+        self._has_basis = not self.is_mip and self.basis is not None
+        self._n_cols_solved = self.n_cols
+        self._row_map = None
+
+    def restore_basis(self):
+        """
+        Prepares the coefficient matrices after constraints are added or removed, or variables
+        are added, and maps the basis status of the last solve to their columns. A basic column
+        leaves the basis for each removed row, chosen so that the remaining basis is nonsingular;
+        added rows start with a basic slack, surplus, or artificial column.
+        """
+        n_solved = self._n_cols_solved
+        row_map = self.get_row_map().values
+        # rows of the slack, surplus, and artificial columns of the last solve
+        logical_rows = np.concatenate((self._slack_rows, self._surplus_rows,
+                                       self.A.indices[self.A.indptr[self.get_artificial_cols()]]))
+        status = self.var_status[:n_solved].copy()
+        is_row_basic = np.zeros(len(self.basis), dtype=bool)
+        is_row_basic[logical_rows[self.var_status[n_solved:] == BasisStatus.BASIC]] = True
+        removed_rows = np.setdiff1d(np.arange(len(self.basis)), row_map[row_map >= 0])
+        for k in self.get_leaving_positions(removed_rows):
+            j = self.basis[k]
+            if j < n_solved:
+                status[j] = BasisStatus.NONE
+            else:
+                is_row_basic[logical_rows[j - n_solved]] = False
+        is_kept = row_map >= 0
+        is_basic = np.ones(self.n_rows, dtype=bool)
+        is_basic[is_kept] = is_row_basic[row_map[is_kept]]
+        self.prepare_coefficient_matrices()
+        self.var_status = np.full(self.A.shape[1], BasisStatus.NONE, dtype=np.int8)
+        self.var_status[:n_solved] = status
+        self.var_status[self.get_slack_cols()[is_basic[self._slack_rows]]] = BasisStatus.BASIC
+        self.var_status[self.get_surplus_cols()[is_basic[self._surplus_rows]]] = \
+            BasisStatus.BASIC
+        rows = np.flatnonzero(is_basic & (self.senses.values == Sense.EQ))
+        artificial_cols = self.add_artificial_cols(rows, np.ones(len(rows)))
+        self.var_status[artificial_cols] = BasisStatus.BASIC
+
+    def get_leaving_positions(self, rows):
+        """
+        Returns a basis position for each of the rows, such that the basis stays nonsingular when
+        the columns at these positions and the rows are removed. These are the pivots of Gaussian
+        elimination with partial pivoting on the rows of B^-1 of the last solve.
+        """
+        if len(rows) == 0:
+            return []
+        E = np.zeros((len(self.basis), len(rows)))
+        E[rows, np.arange(len(rows))] = 1.0
+        M = self.factor.ftran_many(E)
+        positions = []
+        for k in range(len(rows)):
+            column = np.abs(M[:, k])
+            column[positions] = 0.0
+            p = int(np.argmax(column))
+            positions.append(p)
+            M[:, k + 1:] -= np.outer(M[:, k] / M[p, k], M[p, k + 1:])
+        return positions
+
+    def set_nonbasic_values(self):
+        """Moves the nonbasic columns to the bound of their status, or to a finite one if needed."""
+        status = self.var_status
+        has_lb = np.isfinite(self.lb)
+        has_ub = np.isfinite(self.ub)
+        is_valid = (status == BasisStatus.BASIC) | \
+                   ((status == BasisStatus.AT_LOWER) & has_lb) | \
+                   ((status == BasisStatus.AT_UPPER) & has_ub) | \
+                   ((status == BasisStatus.FREE) & ~has_lb & ~has_ub)
+        self.var_status = np.where(is_valid, status, np.where(
+            has_lb, BasisStatus.AT_LOWER, np.where(has_ub, BasisStatus.AT_UPPER,
+                                                   BasisStatus.FREE))).astype(np.int8)
+        self.x = np.where(self.var_status == BasisStatus.AT_LOWER, self.lb,
+                          np.where(self.var_status == BasisStatus.AT_UPPER, self.ub, 0.0))
+
+    @classmethod
+    def read(cls, path, fixed=False):
+        """Reads a model from an MPS or LP file, which may be gzipped, by its extension."""
+        model = cls()
+        file_format = get_file_format(path)
+        if file_format == 'mps':
+            MPSReader(model, fixed).read(path)
+        elif file_format == 'lp':
+            LPReader(model).read(path)
+        else:
+            raise UnknownModelError('Unknown file format: {0}'.format(path))
+        return model
+
+    def write(self, path, fixed=False):
+        """Writes the model to an MPS or LP file by its extension, gzipped if it ends with .gz."""
+        file_format = get_file_format(path)
+        if file_format == 'mps':
+            MPSWriter(self, fixed).write(path)
+        elif file_format == 'lp':
+            LPWriter(self).write(path)
+        else:
+            raise UnknownModelError('Unknown file format: {0}'.format(path))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Loads a model saved in the binary format, memory-mapping its arrays if mmap."""
+        model = cls()
+        BinaryReader(model, mmap).read(path)
+        return model
+
+    def save(self, path):
+        """Saves the model in the binary format, which can be loaded with no parsing."""
+        BinaryWriter(self).write(path)
 
     def add_var(self, lb=0, ub=sys.float_info.max, name='',
                 var_type=VarType.CONTINUOUS,
@@ -89,32 +423,181 @@ class Model:
         if var_type == VarType.BINARY or \
                 var_type == VarType.INTEGER:
             self.is_mip = True
-        var = Variable(lb, ub, name, var_type, var_name_type)
+        self.var_lb.append(lb)
+        self.var_ub.append(ub)
+        self.var_obj.append(0.0)
+        self.var_types.append(var_type)
+        var = Variable(self, self.n_cols, name, var_name_type)
         self.vars.append(var)
         self.n_cols += 1
+        self._a_indptr = None
+        self.clear_solution_vectors()
         return var
 
+    def add_vars(self, n, lb=0.0, ub=sys.float_info.max, obj=0.0,
+                 types=VarType.CONTINUOUS, names=None):
+        """Adds n variables whose attributes are scalars or arrays of length n, and returns them."""
+        types = np.broadcast_to(np.asarray(types, dtype=np.int8), n)
+        if np.any((types == VarType.BINARY) | (types == VarType.INTEGER)):
+            self.is_mip = True
+        self.var_lb.extend(np.broadcast_to(np.asarray(lb, dtype=np.float64), n))
+        self.var_ub.extend(np.broadcast_to(np.asarray(ub, dtype=np.float64), n))
+        self.var_obj.extend(np.broadcast_to(np.asarray(obj, dtype=np.float64), n))
+        self.var_types.extend(types)
+        first = self.n_cols
+        if names is None:
+            names = ['x' + str(j) for j in range(first, first + n)]
+        new_vars = [Variable(self, first + k, name, VarNameType.PRIMAL)
+                    for k, name in enumerate(names)]
+        self.vars.extend(new_vars)
+        self.n_cols += n
+        self._a_indptr = None
+        self.clear_solution_vectors()
+        return new_vars
+
     def add_const(self, expr, sense, rhs):
         const_num = self.n_rows
+        n_terms = len(expr.terms)
+        cols = np.fromiter((var.index for var in expr.terms), dtype=np.int64, count=n_terms)
+        vals = np.fromiter(expr.terms.values(), dtype=np.float64, count=n_terms)
+        rhs -= expr.constant
         # normalize rhs
+        row_sign = 1
         if rhs < 0.0:
             rhs *= -1
-            for v in range(len(expr.vals)):
-                expr.vals[v] *= -1.0
+            vals *= -1.0
             sense = set_reverse_sense(sense)
+            row_sign = -1
         # construct vector b
         self.rhs.append(rhs)
-        # set variables coeffs_a
-        for val, var in zip(expr.vals, expr.vars):
-            var.coeffs_a[const_num] = val
-        # add slack, surplus, artificial vars
-        self.add_extra_vars(sense, const_num)
+        self.senses.append(sense)
+        self.row_signs.append(row_sign)
+        if self._has_basis:
+            self.get_row_map().append(-1)
+        # store the nonzero terms in the column store
+        is_nonzero = vals != 0.0
+        self._a_rows.extend(np.full(np.count_nonzero(is_nonzero), const_num))
+        self._a_cols.extend(cols[is_nonzero])
+        self._a_vals.extend(vals[is_nonzero])
+        self._a_indptr = None
         # add constraint
-        const = Constraint(expr, sense, rhs)
+        const = Constraint(self, const_num, expr)
         self.consts.append(const)
         self.n_rows += 1
+        self.clear_solution_vectors()
         return const
 
+    def add_constrs(self, A, senses, rhs):
+        """Adds the rows of the sparse or dense matrix A, whose columns are the first variables."""
+        A = coo_matrix(A)
+        m = A.shape[0]
+        if A.shape[1] > self.n_cols:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        senses = np.array(np.broadcast_to(np.asarray(senses, dtype=np.int8), m))
+        rhs = np.array(np.broadcast_to(np.asarray(rhs, dtype=np.float64), m))
+        # normalize rhs
+        is_negative = rhs < 0.0
+        rhs[is_negative] *= -1.0
+        senses[is_negative] = np.where(senses[is_negative] == Sense.LE, Sense.GE,
+                                       np.where(senses[is_negative] == Sense.GE,
+                                                Sense.LE, Sense.EQ))
+        self.rhs.extend(rhs)
+        self.senses.extend(senses)
+        self.row_signs.extend(np.where(is_negative, -1, 1))
+        if self._has_basis:
+            self.get_row_map().extend(np.full(m, -1))
+        # store the terms in the column store
+        self._a_rows.extend(A.row + self.n_rows)
+        self._a_cols.extend(A.col)
+        self._a_vals.extend(np.where(is_negative[A.row], -A.data, A.data))
+        self._a_indptr = None
+        new_consts = [Constraint(self, i) for i in range(self.n_rows, self.n_rows + m)]
+        self.consts.extend(new_consts)
+        self.n_rows += m
+        self.clear_solution_vectors()
+        return new_consts
+
+    def remove_const(self, const):
+        i = const.index
+        if i >= self.n_rows or self.consts[i] is not const:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        is_kept = self._a_rows.values != i
+        for array in (self._a_rows, self._a_cols, self._a_vals):
+            array.compress(is_kept)
+        rows = self._a_rows.values
+        rows[rows > i] -= 1
+        self._a_indptr = None
+        is_kept = np.arange(self.n_rows) != i
+        for array in (self.rhs, self.senses, self.row_signs):
+            array.compress(is_kept)
+        if self._has_basis:
+            self.get_row_map().compress(is_kept)
+        if self.y is not None and len(self.y) == self.n_rows:
+            self.y = self.y[is_kept]
+        remove_handle(self.consts, i)
+        self.n_rows -= 1
+        self.clear_solution_vectors()
+
+    def remove_constrs(self, consts):
+        """Removes the constraints, like remove_const for each of them."""
+        indices = np.fromiter((const.index for const in consts), dtype=np.int64,
+                              count=len(consts))
+        if any(i >= self.n_rows or self.consts[i] is not const
+               for i, const in zip(indices, consts)):
+            raise UnknownModelError('Unknown constraint to the solver.')
+        is_kept = np.ones(self.n_rows, dtype=bool)
+        is_kept[indices] = False
+        new_rows = np.cumsum(is_kept) - 1
+        is_term_kept = is_kept[self._a_rows.values]
+        for array in (self._a_rows, self._a_cols, self._a_vals):
+            array.compress(is_term_kept)
+        rows = self._a_rows.values
+        rows[:] = new_rows[rows]
+        self._a_indptr = None
+        for array in (self.rhs, self.senses, self.row_signs):
+            array.compress(is_kept)
+        if self._has_basis:
+            self.get_row_map().compress(is_kept)
+        if self.y is not None and len(self.y) == self.n_rows:
+            self.y = self.y[is_kept]
+        for i in np.sort(indices)[::-1]:
+            remove_handle(self.consts, i)
+        self.n_rows -= len(indices)
+        self.clear_solution_vectors()
+
+    def clear_solution_vectors(self):
+        """Clears the reduced costs and slacks, which are built again from the solution on use."""
+        self._reduced_costs = None
+        self._slacks = None
+
+    def get_row_map(self):
+        """Returns the row of the last solve of each constraint, or -1 for the ones added since."""
+        if self._row_map is None:
+            self._row_map = GrowingArray.wrap(np.arange(self.n_rows))
+        return self._row_map
+
+    def set_rhs(self, const, rhs):
+        """Sets the right hand side of a constraint, in the orientation it is added with."""
+        if const.index >= self.n_rows or self.consts[const.index] is not const:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        self.rhs.values[const.index] = rhs * self.row_signs.values[const.index]
+        self._slacks = None
+
+    def set_obj_coeff(self, var, coeff):
+        if var.index >= self.n_cols or self.vars[var.index] is not var:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        self.var_obj.values[var.index] = coeff
+        self._reduced_costs = None
+
+    def set_bounds(self, var, lb=None, ub=None):
+        """Sets the bounds of a variable, keeping the ones that are None."""
+        if var.index >= self.n_cols or self.vars[var.index] is not var:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        if lb is not None:
+            self.var_lb.values[var.index] = lb
+        if ub is not None:
+            self.var_ub.values[var.index] = ub
+
     def add_const_var(self, var, sense, rhs):
         expr = Expression()
         expr.add_term(1.0, var)
@@ -122,70 +605,356 @@ class Model:
 
     def set_objective(self, expr, obj_type):
         self.obj = Objective(expr, obj_type)
-        for e in range(len(self.obj.expr.vars)):
-            if obj_type == ObjectiveType.MIN:
-                self.obj.expr.vars[e].coeff_c = self.obj.expr.vals[e]
-            elif obj_type == ObjectiveType.MAX:
-                self.obj.expr.vals[e] *= -1.0
-                self.obj.expr.vars[e].coeff_c = self.obj.expr.vals[e]
-
-    def add_extra_vars(self, sense, const_num):
-        if sense == Sense.LE:
-            self.add_slack_var(const_num)
-        elif sense == Sense.GE:
-            self.add_surplus_var(const_num)
-            self.add_artificial_var(const_num)
-        elif sense == Sense.EQ:
-            self.add_artificial_var(const_num)
-
-    def add_slack_var(self, c):
-        slack = self.add_var(0, sys.float_info.max,
-                             's' + str(self.n_slack))
-        slack.var_name_type = VarNameType.SLACK
-        slack.coeff_c = 0.0
-        slack.coeffs_a[c] = 1.0
-        slack.in_basis = True
-        self.basis.append(slack)
-        self.n_slack += 1
-
-    def add_surplus_var(self, c):
-        surplus = self.add_var(0, sys.float_info.max,
-                               'e' + str(self.n_surplus))
-        surplus.var_name_type = VarNameType.SURPLUS
-        surplus.coeff_c = 0.0
-        surplus.coeffs_a[c] = -1.0
-        self.n_surplus += 1
-
-    def add_artificial_var(self, c):
-        artificial = self.add_var(0, sys.float_info.max,
-                                  'a' + str(self.n_surplus))
-        artificial.var_name_type = VarNameType.ARTIFICIAL
-        artificial.coeff_c = self.BIG_M
-        artificial.coeffs_a[c] = 1.0
-        artificial.in_basis = True
-        self.basis.append(artificial)
-        self.n_artificial += 1
+        self._reduced_costs = None
+        if expr is not None:
+            n_terms = len(expr.terms)
+            costs = self.var_obj.values
+            costs[:] = 0.0
+            costs[np.fromiter((var.index for var in expr.terms), dtype=np.int64,
+                              count=n_terms)] = \
+                np.fromiter(expr.terms.values(), dtype=np.float64, count=n_terms)
+
+    def get_coefficient_matrix(self):
+        """Returns the scipy csc matrix of the coefficients of the variables in the constraints."""
+        if self._a_indptr is not None:
+            return csc_matrix((self._a_vals.values, self._a_rows.values, self._a_indptr),
+                              shape=(self.n_rows, self.n_cols))
+        return csc_matrix((self._a_vals.values, (self._a_rows.values, self._a_cols.values)),
+                          shape=(self.n_rows, self.n_cols))
 
     def prepare_coefficient_matrices(self):
-        self.b = np.asarray(self.rhs, dtype=np.float32)
-        self.b = self.b.reshape((self.b.shape[0], 1))
-        # prepare coeffs_a
-        for v in range(self.n_cols):
-            matrix = np.zeros((self.n_rows, 1), dtype=np.float32)
-            for key, value in self.vars[v].coeffs_a.items():
-                matrix[key] = value
-            self.A[self.vars[v]] = matrix
+        senses = self.senses.values
+        # slack and surplus columns follow the variable columns
+        self._slack_rows = np.flatnonzero(senses == Sense.LE)
+        self._surplus_rows = np.flatnonzero(senses == Sense.GE)
+        self.n_slack = len(self._slack_rows)
+        self.n_surplus = len(self._surplus_rows)
+        self.n_artificial = 0
+        n_total = self.n_cols + self.n_slack + self.n_surplus
+        A = self.get_coefficient_matrix()
+        # every logical column has a single entry
+        indptr = np.concatenate((A.indptr, A.indptr[-1] + np.arange(1, n_total - self.n_cols + 1)))
+        rows = np.concatenate((A.indices, self._slack_rows, self._surplus_rows))
+        vals = np.concatenate((A.data, np.ones(self.n_slack), -np.ones(self.n_surplus)))
+        self.A = csc_matrix((vals, rows, indptr), shape=(self.n_rows, n_total))
+        self.scaling = None
+        self.c = np.zeros(n_total)
+        self.lb = np.zeros(n_total)
+        self.ub = np.full(n_total, np.inf)
+        self.update_coefficient_vectors()
+        self.x = np.zeros(n_total)
+
+    def update_coefficient_vectors(self):
+        """Copies the right hand sides, costs, and bounds of the stores to the prepared vectors."""
+        if self.obj is None:
+            self.obj = Objective(None, ObjectiveType.MIN)
+        self.b = self.rhs.values.copy()
+        n = self.n_cols
+        # costs are kept in minimization form
+        self.c[:n] = self.var_obj.values
+        if self.obj.obj_type == ObjectiveType.MAX:
+            self.c[:n] *= -1.0
+        # bounds of sys.float_info.max magnitude are treated as infinite
+        lb = self.lb[:n]
+        ub = self.ub[:n]
+        lb[:] = self.var_lb.values
+        ub[:] = self.var_ub.values
+        lb[lb <= -sys.float_info.max] = -np.inf
+        ub[ub >= sys.float_info.max] = np.inf
+
+    def add_artificial_cols(self, rows, signs):
+        n_total = self.A.shape[1]
+        n_new = len(rows)
+        artificial = csc_matrix((signs, (rows, np.arange(n_new))),
+                                shape=(self.n_rows, n_new))
+        self.A = hstack((self.A, artificial), format='csc')
+        self.c = np.concatenate((self.c, np.zeros(n_new)))
+        self.lb = np.concatenate((self.lb, np.zeros(n_new)))
+        self.ub = np.concatenate((self.ub, np.full(n_new, np.inf)))
+        self.x = np.concatenate((self.x, np.zeros(n_new)))
+        self.var_status = np.concatenate((self.var_status,
+                                          np.full(n_new, BasisStatus.AT_LOWER, dtype=np.int8)))
+        self.n_artificial += n_new
+        return np.arange(n_total, n_total + n_new)
+
+    def append_rows(self, first):
+        """
+        Appends the constraints from index first on to the prepared matrices, each with its own
+        slack, surplus, or artificial column basic, and borders the basis factorization with
+        them, so that the basis stays a basis without rebuilding A.
+        """
+        k = self.n_rows - first
+        n_total = self.A.shape[1]
+        rows = self._a_rows.values
+        is_new = rows >= first
+        cols = self._a_cols.values[is_new]
+        vals = self._a_vals.values[is_new]
+        # the rows are added unscaled on the scaled columns
+        if self.scaling is not None:
+            vals = vals * self.scaling.col_scale[cols]
+            self.scaling.add_rows(k)
+        R = csc_matrix((vals, (rows[is_new] - first, cols)), shape=(k, n_total))
+        senses = self.senses.values[first:]
+        new_rows = np.concatenate((np.flatnonzero(senses == Sense.LE),
+                                   np.flatnonzero(senses == Sense.GE),
+                                   np.flatnonzero(senses == Sense.EQ)))
+        n_slack = np.count_nonzero(senses == Sense.LE)
+        n_surplus = np.count_nonzero(senses == Sense.GE)
+        signs = np.where(senses[new_rows] == Sense.GE, -1.0, 1.0)
+        logical = csc_matrix((signs, (first + new_rows, np.arange(k))), shape=(first + k, k))
+        # new slack and surplus columns go to the end of their blocks, as if just prepared
+        first_surplus = self.n_cols + self.n_slack
+        first_artificial = n_total - self.n_artificial
+        order = np.concatenate((np.arange(first_surplus),
+                                n_total + np.arange(n_slack),
+                                np.arange(first_surplus, first_artificial),
+                                n_total + np.arange(n_slack, n_slack + n_surplus),
+                                np.arange(first_artificial, n_total),
+                                n_total + np.arange(n_slack + n_surplus, k)))
+        position = np.empty(n_total + k, dtype=np.int64)
+        position[order] = np.arange(n_total + k)
+        self.A = hstack((vstack((self.A, R)), logical), format='csc')[:, order]
+        rhs = self.rhs.values[first:]
+        values = (rhs - R.dot(self.x))[new_rows] * signs
+        self.b = np.concatenate((self.b, rhs))
+        self.c = np.concatenate((self.c, np.zeros(k)))[order]
+        self.lb = np.concatenate((self.lb, np.zeros(k)))[order]
+        self.ub = np.concatenate((self.ub, np.where(senses[new_rows] == Sense.EQ,
+                                                    0.0, np.inf)))[order]
+        self.x = np.concatenate((self.x, values))[order]
+        self.var_status = np.concatenate((self.var_status,
+                                          np.full(k, BasisStatus.BASIC, dtype=np.int8)))[order]
+        self._slack_rows = np.concatenate((self._slack_rows, first + new_rows[:n_slack]))
+        self._surplus_rows = np.concatenate((self._surplus_rows,
+                                             first + new_rows[n_slack:n_slack + n_surplus]))
+        self.n_slack += n_slack
+        self.n_surplus += n_surplus
+        self.n_artificial += k - n_slack - n_surplus
+        if self.basis is None:
+            return
+        # the logical column of row first + i is basic at position len(basis) + i
+        new_cols = np.empty(k, dtype=np.int64)
+        new_cols[new_rows] = n_total + np.arange(k)
+        row_signs = np.empty(k)
+        row_signs[new_rows] = signs
+        R_b = R[:, self.basis].toarray()
+        self.basis = np.concatenate((position[self.basis], position[new_cols]))
+        if self.factor is not None:
+            for i in range(k):
+                self.factor.add_row(np.concatenate((R_b[i], np.zeros(i))), row_signs[i])
+
+    def remove_basic_rows(self, consts):
+        """
+        Removes the constraints whose slack, surplus, or artificial column is basic from the
+        model and from the prepared matrices, together with their logical columns, and refactors
+        the basis, which stays a basis without them.
+        """
+        rows = np.fromiter((const.index for const in consts), dtype=np.int64, count=len(consts))
+        self.remove_constrs(consts)
+        m, n_total = self.A.shape
+        is_row_kept = np.ones(m, dtype=bool)
+        is_row_kept[rows] = False
+        # every column after the variables is the logical column of a single row
+        logical_rows = self.A.indices[self.A.indptr[self.n_cols:-1]]
+        is_kept = np.ones(n_total, dtype=bool)
+        is_kept[self.n_cols:] = is_row_kept[logical_rows]
+        new_rows = np.cumsum(is_row_kept) - 1
+        new_cols = np.cumsum(is_kept) - 1
+        self.A = self.A[is_row_kept][:, is_kept]
+        if self.scaling is not None:
+            self.scaling.remove_rows(is_row_kept)
+        self.b = self.b[is_row_kept]
+        self.c = self.c[is_kept]
+        self.lb = self.lb[is_kept]
+        self.ub = self.ub[is_kept]
+        self.x = self.x[is_kept]
+        self.var_status = self.var_status[is_kept]
+        self._slack_rows = new_rows[self._slack_rows[is_row_kept[self._slack_rows]]]
+        self._surplus_rows = new_rows[self._surplus_rows[is_row_kept[self._surplus_rows]]]
+        self.n_slack = len(self._slack_rows)
+        self.n_surplus = len(self._surplus_rows)
+        self.n_artificial = np.count_nonzero(is_kept[n_total - self.n_artificial:])
+        self.basis = new_cols[self.basis[is_kept[self.basis]]]
+        self.factor.factorize(self.get_basis_matrix())
+
+    def get_slack_rows(self):
+        return self._slack_rows
+
+    def get_surplus_rows(self):
+        return self._surplus_rows
+
+    def get_slack_cols(self):
+        return np.arange(self.n_cols, self.n_cols + self.n_slack)
+
+    def get_surplus_cols(self):
+        first_surplus = self.n_cols + self.n_slack
+        return np.arange(first_surplus, first_surplus + self.n_surplus)
+
+    def get_artificial_cols(self):
+        return np.arange(self.A.shape[1] - self.n_artificial, self.A.shape[1])
+
+    def get_basic_rows(self):
+        """Returns whether the slack, surplus, or artificial column of each row is basic."""
+        is_basic = self.var_status == BasisStatus.BASIC
+        is_row_basic = np.zeros(self.n_rows, dtype=bool)
+        is_row_basic[self._slack_rows] = is_basic[self.get_slack_cols()]
+        is_row_basic[self._surplus_rows] = is_basic[self.get_surplus_cols()]
+        artificial_cols = self.get_artificial_cols()
+        artificial_rows = self.A.indices[self.A.indptr[artificial_cols]]
+        is_row_basic[artificial_rows[is_basic[artificial_cols]]] = True
+        return is_row_basic
+
+    def get_reduced_rhs(self):
+        x_n = self.x.copy()
+        x_n[self.basis] = 0.0
+        return self.b - self.A.dot(x_n)
+
+    def get_basis_matrix(self):
+        return self.A[:, self.basis]
+
+    def update_duals(self):
+        self.y = self.factor.btran(self.c[self.basis])
+
+    def prepare_result(self):
+        if self.scaling is not None:
+            self.scaling.unscale()
+            self.scaling = None
+        result = self.result
+        solution = {}
+        is_reported = (self.var_status == BasisStatus.BASIC) | (self.x != 0.0)
+        for j in np.flatnonzero(is_reported[:self.n_cols]):
+            solution[self.vars[j].name] = round(self.x[j].item(), 3)
+        result.solution = solution
+        constant = self.obj.expr.constant if self.obj.expr is not None else 0.0
+        if self.obj.obj_type == ObjectiveType.MIN:
+            result.obj_val = round(self.obj.value + constant, 3)
+        elif self.obj.obj_type == ObjectiveType.MAX:
+            result.obj_val = round(constant - self.obj.value, 3)
+
+    def prepare_sensitivity(self):
+        """Adds the slacks, duals, reduced costs, and ranges of the solution to the result."""
+        result = self.result
+        if result.status not in (AlgorithmStatus.OPTIMAL, AlgorithmStatus.FEASIBLE):
+            return
+        result.slacks = self.get_slacks().tolist()
+        if self.is_mip or result.status != AlgorithmStatus.OPTIMAL or self.y is None:
+            return
+        result.duals = self.get_duals().tolist()
+        result.reduced_costs = self.get_reduced_costs().tolist()
+        if self.SOLVER_PARAM.SENSITIVITY and self.basis is not None:
+            analysis = SensitivityAnalysis(self)
+            result.rhs_ranges = analysis.get_rhs_ranges().tolist()
+            result.cost_ranges = analysis.get_cost_ranges().tolist()
 
     def add_cut(self, expr, sense, rhs):
-        # matrix = np.zeros((self.n_rows, 1), dtype=np.float32)
-        # for key, value in self.vars[v].coeffs_a.items():
-        #     matrix[key] = value
-        # self.A[self.vars[v]] = matrix
-        pass
+        """
+        Adds a constraint like add_const. If the model keeps the basis of its last LP solve, the
+        row is also appended to the prepared matrices and the basis factorization with its
+        slack, surplus, or artificial column basic, so the next solve continues from there
+        without rebuilding A.
+        """
+        is_prepared = self._has_basis and self._row_map is None and \
+            self.n_cols == self._n_cols_solved
+        const = self.add_const(expr, sense, rhs)
+        if is_prepared:
+            self._row_map = None
+            self.append_rows(const.index)
+        return const
 
     def get_value(self, var):
-        var_in_vars = get_first_or_default([v for v in self.vars if v == var])
-        if var_in_vars:
-            return var_in_vars.value
+        if var.index >= self.n_cols or self.vars[var.index] is not var:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        if self.x is None:
+            return 0.0
+        return self.x[var.index].item()
+
+    def get_values(self, variables=None):
+        """Returns a numpy array of the values of the variables, or of all variables if None."""
+        if variables is None:
+            variables = self.vars
+        indices = np.fromiter((var.index for var in variables), dtype=np.int64,
+                              count=len(variables))
+        if len(indices) > 0 and indices.max() >= self.n_cols:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        if self.x is None:
+            return np.zeros(len(indices))
+        return self.x[indices]
+
+    def get_dual(self, const):
+        i = const.index
+        if i >= self.n_rows or self.consts[i] is not const:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        if self.y is None or i >= len(self.y):
+            return 0.0
+        # duals are kept for the minimization form of the objective and the rows as stored
+        sign = -1.0 if self.obj.obj_type == ObjectiveType.MAX else 1.0
+        return sign * self.row_signs.values[i].item() * self.y[i].item()
+
+    def get_duals(self, consts=None):
+        """Returns a numpy array of the duals of the constraints, or of all constraints if None."""
+        if consts is None:
+            consts = self.consts
+        indices = np.fromiter((const.index for const in consts), dtype=np.int64,
+                              count=len(consts))
+        if len(indices) > 0 and indices.max() >= self.n_rows:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        if self.y is None:
+            return np.zeros(len(indices))
+        sign = -1.0 if self.obj.obj_type == ObjectiveType.MAX else 1.0
+        return sign * self.row_signs.values[indices] * self.get_row_duals()[indices]
+
+    def get_row_duals(self):
+        """Returns the duals of the rows as stored, which are zero for the rows added since."""
+        y = np.zeros(self.n_rows)
+        if self.y is not None:
+            y[:len(self.y)] = self.y[:self.n_rows]
+        return y
+
+    def get_reduced_cost(self, var):
+        j = var.index
+        if j >= self.n_cols or self.vars[j] is not var:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        if self.y is None:
+            return 0.0
+        return self.get_reduced_costs([var])[0].item()
+
+    def get_reduced_costs(self, variables=None):
+        """Returns a numpy array of the reduced costs of the variables, or of all if None."""
+        if variables is None:
+            indices = np.arange(self.n_cols)
         else:
+            indices = np.fromiter((var.index for var in variables), dtype=np.int64,
+                                  count=len(variables))
+        if len(indices) > 0 and indices.max() >= self.n_cols:
             raise UnknownVariableError('Unknown variable to the solver.')
+        if self.y is None:
+            return np.zeros(len(indices))
+        if self._reduced_costs is None:
+            sign = -1.0 if self.obj.obj_type == ObjectiveType.MAX else 1.0
+            self._reduced_costs = self.var_obj.values - \
+                sign * self.get_coefficient_matrix().T.dot(self.get_row_duals())
+        return self._reduced_costs[indices]
+
+    def get_slack(self, const):
+        i = const.index
+        if i >= self.n_rows or self.consts[i] is not const:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        if self.x is None:
+            return 0.0
+        return self.get_slacks([const])[0].item()
+
+    def get_slacks(self, consts=None):
+        """Returns a numpy array of the right hand sides minus the activities of the constraints."""
+        if consts is None:
+            indices = np.arange(self.n_rows)
+        else:
+            indices = np.fromiter((const.index for const in consts), dtype=np.int64,
+                                  count=len(consts))
+        if len(indices) > 0 and indices.max() >= self.n_rows:
+            raise UnknownModelError('Unknown constraint to the solver.')
+        if self.x is None:
+            return np.zeros(len(indices))
+        if self._slacks is None:
+            activity = self.get_coefficient_matrix().dot(self.x[:self.n_cols])
+            self._slacks = self.row_signs.values * (self.rhs.values - activity)
+        return self._slacks[indices]
@@ -0,0 +1,364 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from lp.entity import Sense, ObjectiveType, VarType, Expression, UnknownModelError, \
+    UnknownVariableError
+from lp.helper import GrowingArray, open_file
+
+MPS_SECTIONS = {'NAME', 'OBJSENSE', 'ROWS', 'COLUMNS', 'RHS', 'RANGES', 'BOUNDS', 'ENDATA'}
+MPS_SENSES = {'L': Sense.LE, 'G': Sense.GE, 'E': Sense.EQ}
+
+
+class MPSReader:
+    """
+    This reads a model from a free or fixed MPS file. The file is parsed line by line, and the
+    coefficients are collected in growing arrays that are written into the column store of the
+    model in bulk, so no dense or per-term intermediate is built. Gzipped files are detected
+    from their header.
+
+    Columns between INTORG and INTEND markers are integer with bounds [0, inf]. A ranged row is
+    kept with its own sense and right hand side, and a copy of it is added for the other side
+    of the range. The right hand side of the objective row is taken as minus its constant.
+
+    Parameters
+    ==========
+    model       : Model class to read into, which has no variables or constraints yet
+    fixed       : bool whether or not the fields are read from the fixed MPS columns
+
+    Properties
+    ==========
+    _rows       : dict of row indices by row name, without the objective row
+    _cols       : dict of column indices by column name
+    _obj_name   : str name of the objective row
+    _lb_cols    : set of indices of the columns whose lower bound is given in BOUNDS
+    """
+
+    def __init__(self, model, fixed=False):
+        self._model = model
+        self._fixed = fixed
+        self._rows = {}
+        self._cols = {}
+        self._obj_name = None
+        self._lb_cols = set()
+        self._free_rows = set()
+        self._senses = GrowingArray(np.int8)
+        self._rhs = None
+        self._ranges = {}
+        self._a_rows = GrowingArray(np.int64)
+        self._a_cols = GrowingArray(np.int64)
+        self._a_vals = GrowingArray()
+        self._lb = GrowingArray()
+        self._ub = GrowingArray()
+        self._obj = GrowingArray()
+        self._types = GrowingArray(np.int8)
+        self._names = []
+        self._obj_type = ObjectiveType.MIN
+        self._obj_constant = 0.0
+        self._is_int_marker = False
+
+    def read(self, path):
+        section = None
+        with open_file(path, 'rt') as file:
+            for line in file:
+                line = line.rstrip('\n\r')
+                if not line.strip() or line[0] == '*':
+                    continue
+                if not line[0].isspace():
+                    header = line.split()
+                    section = header[0].upper()
+                    if section not in MPS_SECTIONS:
+                        raise UnknownModelError('Unknown MPS section: {0}'.format(section))
+                    if section == 'NAME':
+                        self._model.name = line[4:].strip() or self._model.name
+                    elif section == 'OBJSENSE' and len(header) > 1:
+                        self.read_objsense(header[1])
+                    elif section == 'COLUMNS':
+                        self._rhs = np.zeros(len(self._senses))
+                    elif section == 'ENDATA':
+                        break
+                    continue
+                if section == 'OBJSENSE':
+                    self.read_objsense(line.strip())
+                elif section == 'ROWS':
+                    self.read_row(self.get_fields(line, section))
+                elif section == 'COLUMNS':
+                    self.read_column(line)
+                elif section in ('RHS', 'RANGES'):
+                    self.read_rhs(self.get_fields(line, section), section)
+                elif section == 'BOUNDS':
+                    self.read_bound(self.get_fields(line, section))
+        self.add_to_model()
+        return self._model
+
+    def get_fields(self, line, section):
+        if not self._fixed:
+            return line.split()
+        fields = [line[1:3], line[4:12], line[14:22], line[24:36], line[39:47], line[49:61]]
+        fields = [field.strip() for field in fields]
+        if section == 'ROWS':
+            return fields[:2]
+        if section == 'BOUNDS':
+            return fields[:4] if fields[3] else fields[:3]
+        # the column or set name is followed by pairs of row names and values
+        fields = fields[1:]
+        while len(fields) > 1 and not fields[-1]:
+            fields = fields[:-2]
+        return fields
+
+    def read_objsense(self, value):
+        if value.upper() in ('MAX', 'MAXIMIZE'):
+            self._obj_type = ObjectiveType.MAX
+        elif value.upper() in ('MIN', 'MINIMIZE'):
+            self._obj_type = ObjectiveType.MIN
+        else:
+            raise UnknownModelError('Unknown objective sense: {0}'.format(value))
+
+    def read_row(self, fields):
+        sense, name = fields[0].upper(), fields[1]
+        if sense == 'N':
+            if self._obj_name is None:
+                self._obj_name = name
+            else:
+                self._free_rows.add(name)
+        elif sense in MPS_SENSES:
+            self._rows[name] = len(self._senses)
+            self._senses.append(MPS_SENSES[sense])
+        else:
+            raise UnknownModelError('Unknown row type: {0}'.format(sense))
+
+    def read_column(self, line):
+        if "'MARKER'" in line:
+            if "'INTORG'" in line:
+                self._is_int_marker = True
+            elif "'INTEND'" in line:
+                self._is_int_marker = False
+            return
+        fields = self.get_fields(line, 'COLUMNS')
+        name = fields[0]
+        j = self._cols.get(name)
+        if j is None:
+            j = self.add_column(name)
+        for k in range(1, len(fields) - 1, 2):
+            row, value = fields[k], float(fields[k + 1])
+            if row == self._obj_name:
+                self._obj.values[j] += value
+            elif row in self._rows:
+                self._a_rows.append(self._rows[row])
+                self._a_cols.append(j)
+                self._a_vals.append(value)
+            elif row not in self._free_rows:
+                raise UnknownModelError('Unknown row: {0}'.format(row))
+
+    def add_column(self, name):
+        j = len(self._names)
+        self._cols[name] = j
+        self._names.append(name)
+        self._lb.append(0.0)
+        self._ub.append(np.inf)
+        self._obj.append(0.0)
+        self._types.append(VarType.INTEGER if self._is_int_marker else VarType.CONTINUOUS)
+        return j
+
+    def read_rhs(self, fields, section):
+        # the set name is optional, so it is present if the number of fields is odd
+        start = len(fields) % 2
+        for k in range(start, len(fields) - 1, 2):
+            row, value = fields[k], float(fields[k + 1])
+            if section == 'RANGES':
+                self._ranges[self._rows[row]] = value
+            elif row == self._obj_name:
+                self._obj_constant = -value
+            elif row in self._rows:
+                self._rhs[self._rows[row]] = value
+            elif row not in self._free_rows:
+                raise UnknownModelError('Unknown row: {0}'.format(row))
+
+    def read_bound(self, fields):
+        bound_type = fields[0].upper()
+        has_value = bound_type in ('UP', 'LO', 'FX', 'LI', 'UI', 'SC')
+        # the set name is optional, so it is present if the fields do not start with a column
+        fields = fields[1:]
+        n_fields = 2 if has_value else 1
+        if len(fields) > n_fields and \
+                (len(fields) > n_fields + 1 or fields[0] not in self._cols):
+            fields = fields[1:]
+        j = self._cols.get(fields[0])
+        if j is None:
+            raise UnknownVariableError('Unknown variable to the solver.')
+        value = float(fields[1]) if has_value else 0.0
+        lb, ub = self._lb.values, self._ub.values
+        if bound_type == 'UP' or bound_type == 'UI':
+            ub[j] = value
+            # a negative upper bound of a column with default lower bound makes it unbounded below
+            if value < 0.0 and lb[j] == 0.0 and j not in self._lb_cols:
+                lb[j] = -np.inf
+        elif bound_type == 'LO' or bound_type == 'LI':
+            lb[j] = value
+        elif bound_type == 'FX':
+            lb[j] = ub[j] = value
+        elif bound_type == 'FR':
+            lb[j], ub[j] = -np.inf, np.inf
+        elif bound_type == 'MI':
+            lb[j] = -np.inf
+        elif bound_type == 'PL':
+            ub[j] = np.inf
+        elif bound_type == 'BV':
+            lb[j], ub[j] = 0.0, 1.0
+            self._types.values[j] = VarType.BINARY
+        else:
+            raise UnknownModelError('Unsupported bound type: {0}'.format(bound_type))
+        if bound_type in ('LO', 'LI', 'FX', 'FR', 'MI', 'BV'):
+            self._lb_cols.add(j)
+        if bound_type in ('LI', 'UI'):
+            self._types.values[j] = VarType.INTEGER
+
+    def add_to_model(self):
+        model = self._model
+        if self._rhs is None:
+            self._rhs = np.zeros(len(self._senses))
+        senses = self._senses.values.copy()
+        rhs = self._rhs
+        rows, cols, vals = self._a_rows.values, self._a_cols.values, self._a_vals.values
+        if self._ranges:
+            senses, rhs, rows, cols, vals = self.add_range_rows(senses, rhs, rows, cols, vals)
+        # the objective is set first so that the costs of the variables are kept
+        model.set_objective(Expression(self._obj_constant), self._obj_type)
+        model.add_vars(len(self._names), self._lb.values, self._ub.values, self._obj.values,
+                       self._types.values, self._names)
+        model.add_constrs(coo_matrix((vals, (rows, cols)), shape=(len(senses), len(self._names))),
+                          senses, rhs)
+
+    def add_range_rows(self, senses, rhs, rows, cols, vals):
+        """Turns each ranged row into two rows with opposite senses."""
+        ranged = np.fromiter(self._ranges.keys(), dtype=np.int64, count=len(self._ranges))
+        ranges = np.fromiter(self._ranges.values(), dtype=np.float64, count=len(self._ranges))
+        ranged_senses = senses[ranged]
+        is_lower = (ranged_senses == Sense.GE) | ((ranged_senses == Sense.EQ) & (ranges > 0.0))
+        # the original rows keep one side of the range, and their copies get the other side
+        copy_rhs = np.where(is_lower, rhs[ranged] + np.abs(ranges), rhs[ranged] - np.abs(ranges))
+        copy_senses = np.where(is_lower, Sense.LE, Sense.GE).astype(np.int8)
+        senses[ranged] = np.where(is_lower, Sense.GE, Sense.LE)
+        new_index = np.full(len(senses), -1, dtype=np.int64)
+        new_index[ranged] = np.arange(len(senses), len(senses) + len(ranged))
+        is_copied = new_index[rows] >= 0
+        rows = np.concatenate((rows, new_index[rows[is_copied]]))
+        cols = np.concatenate((cols, cols[is_copied]))
+        vals = np.concatenate((vals, vals[is_copied]))
+        return (np.concatenate((senses, copy_senses)), np.concatenate((rhs, copy_rhs)),
+                rows, cols, vals)
+
+
+class MPSWriter:
+    """
+    This writes a model to a free or fixed MPS file, column by column from the column store, and
+    gzips it if the path ends with .gz. Rows are named c0, c1, ... and the objective row obj.
+
+    Fixed MPS limits names to 8 characters without spaces, so if any column name does not fit,
+    columns are named C0, C1, ... and rows R0, R1, ... instead.
+
+    Parameters
+    ==========
+    model       : Model class to write
+    fixed       : bool whether or not the fields are written in the fixed MPS columns
+    """
+
+    def __init__(self, model, fixed=False):
+        self._model = model
+        self._fixed = fixed
+
+    def write(self, path):
+        model = self._model
+        A = model.get_coefficient_matrix()
+        col_names = [var.name or 'x' + str(var.index) for var in model.vars]
+        row_names = ['c' + str(i) for i in range(model.n_rows)]
+        if self._fixed and any(len(name) > 8 or ' ' in name for name in col_names):
+            col_names = ['C' + str(j) for j in range(model.n_cols)]
+            row_names = ['R' + str(i) for i in range(model.n_rows)]
+        obj_type = model.obj.obj_type if model.obj is not None else ObjectiveType.MIN
+        constant = model.obj.expr.constant if model.obj is not None and \
+            model.obj.expr is not None else 0.0
+        costs = model.var_obj.values
+        types = model.var_types.values
+        with open_file(path, 'wt') as file:
+            file.write('NAME          {0}\n'.format(model.name))
+            if obj_type == ObjectiveType.MAX:
+                file.write('OBJSENSE\n    MAX\n')
+            file.write('ROWS\n')
+            file.write(self.format_line('N', 'obj'))
+            sense_names = {Sense.LE: 'L', Sense.GE: 'G', Sense.EQ: 'E'}
+            for name, sense in zip(row_names, model.senses.values.tolist()):
+                file.write(self.format_line(sense_names[sense], name))
+            file.write('COLUMNS\n')
+            is_int_marker = False
+            for j in range(model.n_cols):
+                is_int = types[j] != VarType.CONTINUOUS
+                if is_int != is_int_marker:
+                    marker = "'INTORG'" if is_int else "'INTEND'"
+                    file.write(self.format_line('', 'MARKER', "'MARKER'", '', marker))
+                    is_int_marker = is_int
+                start, end = A.indptr[j], A.indptr[j + 1]
+                # a column without any coefficient is declared with a zero cost
+                if costs[j] != 0.0 or start == end:
+                    file.write(self.format_line('', col_names[j], 'obj', costs[j]))
+                for i, value in zip(A.indices[start:end].tolist(), A.data[start:end].tolist()):
+                    file.write(self.format_line('', col_names[j], row_names[i], value))
+            if is_int_marker:
+                file.write(self.format_line('', 'MARKER', "'MARKER'", '', "'INTEND'"))
+            file.write('RHS\n')
+            if constant != 0.0:
+                file.write(self.format_line('', 'RHS', 'obj', -constant))
+            rhs = model.rhs.values
+            for i in np.flatnonzero(rhs):
+                file.write(self.format_line('', 'RHS', row_names[i], rhs[i]))
+            file.write('BOUNDS\n')
+            for j in range(model.n_cols):
+                for bound_type, value in self.get_bounds(j):
+                    file.write(self.format_line(bound_type, 'BND', col_names[j], value))
+            file.write('ENDATA\n')
+
+    def get_bounds(self, j):
+        model = self._model
+        lb, ub = model.var_lb.values[j], model.var_ub.values[j]
+        is_int = model.var_types.values[j] != VarType.CONTINUOUS
+        has_lb = lb > -np.inf and lb > -1e300
+        has_ub = ub < np.inf and ub < 1e300
+        if has_lb and has_ub and lb == ub:
+            return [('FX', lb)]
+        if model.var_types.values[j] == VarType.BINARY and lb == 0.0 and ub == 1.0:
+            return [('BV', '')]
+        if not has_lb and not has_ub:
+            return [('FR', '')]
+        bounds = []
+        if not has_lb:
+            bounds.append(('MI', ''))
+        elif lb != 0.0 or (has_ub and ub < 0.0):
+            # a negative upper bound alone is read as a column unbounded below
+            bounds.append(('LO', lb))
+        if has_ub:
+            bounds.append(('UP', ub))
+        elif is_int:
+            # integer columns are written with an explicit infinite upper bound
+            bounds.append(('PL', ''))
+        return bounds
+
+    def format_line(self, f1, f2, f3='', f4='', f5='', f6=''):
+        f4 = self.format_value(f4)
+        f6 = self.format_value(f6)
+        if not self._fixed:
+            fields = [field for field in (f1, f2, f3, f4, f5, f6) if field != '']
+            return ' ' + ' '.join(fields) + '\n' if f1 else '    ' + ' '.join(fields) + '\n'
+        line = ' {0:<2} {1:<8}  {2:<8}  {3:>12}   {4:<8}  {5:>12}'.format(f1, f2, f3, f4, f5, f6)
+        return line.rstrip() + '\n'
+
+    def format_value(self, value):
+        if isinstance(value, str):
+            return value
+        text = repr(float(value))
+        if not self._fixed or len(text) <= 12:
+            return text
+        # fixed MPS allows 12 characters per value
+        for precision in range(11, 0, -1):
+            text = '{0:.{1}g}'.format(value, precision)
+            if len(text) <= 12:
+                return text
+        return text
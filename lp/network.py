@@ -0,0 +1,425 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+from lp.entity import AlgorithmStatus, BasisStatus, IterationEvent, SolverParam
+from lp.factorization import BasisFactorization
+
+
+def create_network_solver(model):
+    """Returns a NetworkSimplex for the prepared model if it is a network, else None."""
+    A = model.A
+    counts = np.diff(A.indptr)
+    if np.any(np.abs(A.data) != 1.0) or np.any(counts > 2):
+        return None
+    # a column without a finite bound can not be an arc
+    if np.any(~np.isfinite(model.lb) & ~np.isfinite(model.ub)):
+        return None
+    if model.is_mip:
+        # the basic solutions are integral if the right hand sides and all bounds are, since a
+        # fractional bound of a continuous column can carry into the integer columns
+        values = np.concatenate((model.b, model.lb, model.ub))
+        values = values[np.isfinite(values)]
+        if np.any(values != np.round(values)):
+            return None
+    signs = get_row_signs(A, counts)
+    if signs is None:
+        return None
+    return NetworkSimplex(model, signs)
+
+
+def get_row_signs(A, counts):
+    """
+    Returns the signs of the rows that make every column with two entries have a +1 and a -1,
+    or None if there are none. Two rows must have the same sign if a column has entries of
+    opposite signs in them, and opposite signs otherwise; the signs are found by coloring the
+    graph of these relations, with an extra node on the edges of the same sign relations.
+    """
+    m = A.shape[0]
+    cols = np.flatnonzero(counts == 2)
+    first = A.indptr[cols]
+    p = A.indices[first]
+    q = A.indices[first + 1]
+    is_same = A.data[first] * A.data[first + 1] < 0.0
+    n_same = int(np.count_nonzero(is_same))
+    middle = np.arange(m, m + n_same)
+    tails = np.concatenate((p[~is_same], p[is_same], middle))
+    heads = np.concatenate((q[~is_same], middle, q[is_same]))
+    n_nodes = m + n_same
+    # connect one node of every component to an extra root, so one search colors the graph
+    graph = coo_matrix((np.ones(len(tails)), (tails, heads)), shape=(n_nodes, n_nodes))
+    _, labels = connected_components(graph, directed=False)
+    _, representatives = np.unique(labels, return_index=True)
+    root = n_nodes
+    graph = coo_matrix((np.ones(len(tails) + len(representatives)),
+                        (np.concatenate((tails, np.full(len(representatives), root))),
+                         np.concatenate((heads, representatives)))),
+                       shape=(n_nodes + 1, n_nodes + 1)).tocsr()
+    order, predecessors = breadth_first_order(graph, root, directed=False)
+    parity = [0] * (n_nodes + 1)
+    for u, v in zip(order[1:].tolist(), predecessors[order[1:]].tolist()):
+        parity[u] = 1 - parity[v]
+    signs = 1.0 - 2.0 * np.array(parity[:m], dtype=np.float64)
+    if np.any(signs[p] * A.data[first] + signs[q] * A.data[first + 1] != 0.0):
+        return None
+    return signs
+
+
+class NetworkSimplex:
+    """
+    This solves a model whose coefficient matrix, with some rows negated, is the node arc
+    incidence matrix of a network: every column, including the slack and surplus columns, has
+    a +1 and a -1, or a single +1 or -1. Rows are the nodes, and a ground node takes the
+    columns with a single entry, so every column is an arc and every row a flow balance.
+
+    The network Simplex algorithm keeps a spanning tree of the nodes as the basis, rooted at the
+    ground node. Flows change along the cycle an entering arc closes in the tree, and the node
+    potentials, which are the duals, change only in the subtree that is moved to the entering
+    arc. Phase I starts from artificial arcs between every node and the ground node and
+    minimizes their flow; phase II fixes them at zero and minimizes the costs of the arcs. The
+    tree is kept strongly feasible to avoid cycling. Bounds are those of the arcs: lower bounds
+    are shifted to zero, and columns with only an upper bound are reversed.
+
+    The tree is returned as the basis of the model with an artificial column fixed at zero for
+    every row, so that warm starts, ranging, and postsolve work as after the Simplex algorithms.
+
+    Parameters
+    ==========
+    model           : Model class whose coefficient matrices are prepared
+    signs           : numpy array of the signs that turn the rows into flow balances
+
+    Properties
+    ==========
+    n_iterations    : int number of pivots and bound flips of both phases
+    status          : AlgorithmStatus of the solve
+    _tail, _head    : numpy arrays of the end nodes of the arcs; the arcs of the columns come
+                      first, followed by one artificial arc for every row
+    _cost           : numpy array of arc costs of the current phase
+    _arc_cost       : numpy array of costs of the arcs of the columns
+    _cap            : list of arc capacities
+    _flow           : list of arc flows above the lower bounds
+    _state          : numpy array of 1 for arcs at zero flow, -1 at capacity, 0 in the tree
+    _pi             : numpy array of node potentials
+    _parent, _pred  : lists of the parent node and the arc to it of every node in the tree
+    _pred_dir       : list of 1 if the arc to the parent leaves the node, else -1
+    _succ_num       : list of the numbers of nodes in the subtrees of the nodes
+    _children       : list of the sets of child nodes
+    """
+
+    LOWER = 1
+    TREE = 0
+    UPPER = -1
+
+    def __init__(self, model, signs):
+        self._model = model
+        self._signs = signs
+        self._statistics = model.statistics
+        self._callback = model.callback
+        self.n_iterations = 0
+        self.status = AlgorithmStatus.NONE
+        m = model.n_rows
+        n_total = model.A.shape[1]
+        self._n_total = n_total
+        self._root = m
+        A = model.A
+        entry_cols = np.repeat(np.arange(n_total), np.diff(A.indptr))
+        is_out = A.data * signs[A.indices] > 0.0
+        tail = np.full(n_total, m, dtype=np.int64)
+        head = np.full(n_total, m, dtype=np.int64)
+        tail[entry_cols[is_out]] = A.indices[is_out]
+        head[entry_cols[~is_out]] = A.indices[~is_out]
+        # columns with only an upper bound are reversed
+        self._is_reversed = ~np.isfinite(model.lb)
+        cost = np.where(self._is_reversed, -model.c, model.c)
+        self._shift = np.where(self._is_reversed, -model.ub, model.lb)
+        upper = np.where(self._is_reversed, -model.lb, model.ub)
+        tail, head = (np.where(self._is_reversed, head, tail),
+                      np.where(self._is_reversed, tail, head))
+        supply = np.zeros(m + 1)
+        supply[:m] = signs * model.b
+        supply[m] = -supply[:m].sum()
+        supply -= np.bincount(tail, self._shift, minlength=m + 1)
+        supply += np.bincount(head, self._shift, minlength=m + 1)
+        # artificial arcs carry the supplies to the ground node
+        rows = np.arange(m)
+        is_source = supply[:m] >= 0.0
+        self._arc_cost = cost
+        self._tail = np.concatenate((tail, np.where(is_source, rows, m)))
+        self._head = np.concatenate((head, np.where(is_source, m, rows)))
+        self._cost = np.concatenate((np.zeros(n_total), np.ones(m)))
+        self._cap = np.concatenate((upper - self._shift, np.full(m, np.inf))).tolist()
+        self._flow = [0.0] * n_total + np.abs(supply[:m]).tolist()
+        self._state = np.concatenate((np.full(n_total, self.LOWER, dtype=np.int8),
+                                      np.full(m, self.TREE, dtype=np.int8)))
+        self._pi = np.append(np.where(is_source, -1.0, 1.0), 0.0)
+        self._parent = [m] * m + [-1]
+        self._pred = list(range(n_total, n_total + m)) + [-1]
+        self._pred_dir = np.where(is_source, 1, -1).tolist() + [0]
+        self._succ_num = [1] * m + [m + 1]
+        self._children = [set() for _ in range(m)] + [set(range(m))]
+        self._tail_list = self._tail.tolist()
+        self._head_list = self._head.tolist()
+        self._cost_list = self._cost.tolist()
+        self._phase = 1
+        self._tol = model.SOLVER_PARAM.PIVOT_TOL
+        self._block_size = max(64, int(np.sqrt(len(self._cost))))
+        self._next_arc = 0
+        if self._statistics is not None:
+            self.find_entering = self._statistics.timed(self.find_entering, 'pricing')
+            self.find_leaving = self._statistics.timed(self.find_leaving, 'ratio_test')
+
+    def run(self):
+        if any(self._flow[self._n_total:]):
+            self.run_phase()
+            if sum(self._flow[self._n_total:]) > self._model.SOLVER_PARAM.FEASIBILITY_TOL:
+                self.status = AlgorithmStatus.INFEASIBLE
+        if self.status == AlgorithmStatus.NONE:
+            self.start_phase_two()
+            self.run_phase()
+            if self.status == AlgorithmStatus.NONE:
+                self.status = AlgorithmStatus.OPTIMAL
+        self.set_solution()
+
+    def run_phase(self):
+        while True:
+            entering_arc = self.find_entering()
+            if entering_arc < 0:
+                break
+            join = self.find_join(entering_arc)
+            u_in, v_in, u_out, delta = self.find_leaving(entering_arc, join)
+            if delta == np.inf:
+                self.status = AlgorithmStatus.UNBOUNDED
+                break
+            leaving_arc = self.change_flow(entering_arc, join, u_out, delta)
+            if u_out >= 0:
+                self.update_tree(entering_arc, join, u_in, v_in, u_out)
+            self.n_iterations += 1
+            if self._statistics is not None or self._callback is not None:
+                self.record_iteration(entering_arc, leaving_arc, delta)
+
+    def start_phase_two(self):
+        """Fixes the artificial arcs at zero, sets the arc costs, and recomputes the potentials."""
+        n_total = self._n_total
+        n_arcs = len(self._cost)
+        self._flow[n_total:] = [0.0] * (n_arcs - n_total)
+        self._cap[n_total:] = [0.0] * (n_arcs - n_total)
+        self._state[n_total:][self._state[n_total:] != self.TREE] = self.LOWER
+        self._cost = np.concatenate((self._arc_cost, np.zeros(n_arcs - n_total)))
+        self._cost_list = self._cost.tolist()
+        max_cost = np.abs(self._arc_cost).max(initial=0.0)
+        self._tol = self._model.SOLVER_PARAM.PIVOT_TOL * (max_cost + 1.0)
+        self._phase = 2
+        pi = [0.0] * len(self._pi)
+        nodes = [self._root]
+        for u in nodes:
+            for v in self._children[u]:
+                pi[v] = pi[u] - self._pred_dir[v] * self._cost_list[self._pred[v]]
+                nodes.append(v)
+        self._pi = np.array(pi)
+
+    def find_entering(self):
+        """Returns the arc with the largest violation in the first block that has one, or -1."""
+        n_arcs = len(self._cost)
+        start = self._next_arc
+        n_searched = 0
+        while n_searched < n_arcs:
+            end = min(start + self._block_size, n_arcs)
+            tail = self._tail[start:end]
+            head = self._head[start:end]
+            violation = self._state[start:end] * \
+                (self._cost[start:end] + self._pi[tail] - self._pi[head])
+            k = int(np.argmin(violation))
+            if violation[k] < -self._tol:
+                self._next_arc = end % n_arcs
+                return start + k
+            n_searched += end - start
+            start = end % n_arcs
+        return -1
+
+    def find_join(self, arc):
+        parent = self._parent
+        succ_num = self._succ_num
+        u = self._tail_list[arc]
+        v = self._head_list[arc]
+        while u != v:
+            if succ_num[u] < succ_num[v]:
+                u = parent[u]
+            else:
+                v = parent[v]
+        return u
+
+    def find_leaving(self, arc, join):
+        """
+        Returns the end node of the entering arc in the subtree that is cut off, the other end
+        node, the node above the leaving arc, or -1 if the entering arc flips, and the step.
+        Ties go to the last blocking arc in the direction of the flow, which keeps the tree
+        strongly feasible.
+        """
+        parent = self._parent
+        pred = self._pred
+        pred_dir = self._pred_dir
+        flow = self._flow
+        cap = self._cap
+        if self._state[arc] == self.LOWER:
+            first, second = self._tail_list[arc], self._head_list[arc]
+        else:
+            first, second = self._head_list[arc], self._tail_list[arc]
+        delta = cap[arc]
+        u_out = -1
+        is_first = False
+        u = first
+        while u != join:
+            e = pred[u]
+            d = flow[e] if pred_dir[u] == 1 else cap[e] - flow[e]
+            if d < delta:
+                delta = d
+                u_out = u
+                is_first = True
+            u = parent[u]
+        u = second
+        while u != join:
+            e = pred[u]
+            d = cap[e] - flow[e] if pred_dir[u] == 1 else flow[e]
+            if d <= delta:
+                delta = d
+                u_out = u
+                is_first = False
+            u = parent[u]
+        if is_first:
+            return first, second, u_out, delta
+        return second, first, u_out, delta
+
+    def change_flow(self, arc, join, u_out, delta):
+        """Moves the flows along the cycle of the entering arc and returns the leaving arc."""
+        parent = self._parent
+        pred = self._pred
+        pred_dir = self._pred_dir
+        flow = self._flow
+        state = int(self._state[arc])
+        if delta > 0.0:
+            value = state * delta
+            flow[arc] += value
+            u = self._tail_list[arc]
+            while u != join:
+                flow[pred[u]] -= pred_dir[u] * value
+                u = parent[u]
+            u = self._head_list[arc]
+            while u != join:
+                flow[pred[u]] += pred_dir[u] * value
+                u = parent[u]
+        if u_out < 0:
+            self._state[arc] = -state
+            return -1
+        # the leaving arc is set exactly to the bound it reaches
+        leaving_arc = pred[u_out]
+        if abs(flow[leaving_arc]) <= abs(self._cap[leaving_arc] - flow[leaving_arc]):
+            flow[leaving_arc] = 0.0
+            self._state[leaving_arc] = self.LOWER
+        else:
+            flow[leaving_arc] = self._cap[leaving_arc]
+            self._state[leaving_arc] = self.UPPER
+        self._state[arc] = self.TREE
+        return leaving_arc
+
+    def update_tree(self, arc, join, u_in, v_in, u_out):
+        """Hangs the subtree cut off at u_out from the entering arc and updates its potentials."""
+        parent = self._parent
+        pred = self._pred
+        pred_dir = self._pred_dir
+        children = self._children
+        succ_num = self._succ_num
+        # the subtree moves from the path of u_out to the join node to that of v_in
+        n_moved = succ_num[u_out]
+        u = parent[u_out]
+        while u != join:
+            succ_num[u] -= n_moved
+            u = parent[u]
+        u = v_in
+        while u != join:
+            succ_num[u] += n_moved
+            u = parent[u]
+        # the path from u_in to u_out is reversed
+        stem = [u_in]
+        while stem[-1] != u_out:
+            stem.append(parent[stem[-1]])
+        stem_pred = [pred[u] for u in stem]
+        stem_dir = [pred_dir[u] for u in stem]
+        stem_succ_num = [succ_num[u] for u in stem]
+        n_above = 0
+        for k in range(len(stem) - 1, 0, -1):
+            n_above += stem_succ_num[k] - stem_succ_num[k - 1]
+            succ_num[stem[k]] = n_above
+        succ_num[u_in] = n_moved
+        children[parent[u_out]].discard(u_out)
+        for k in range(1, len(stem)):
+            child, u = stem[k - 1], stem[k]
+            children[u].discard(child)
+            children[child].add(u)
+            parent[u] = child
+            pred[u] = stem_pred[k - 1]
+            pred_dir[u] = -stem_dir[k - 1]
+        parent[u_in] = v_in
+        pred[u_in] = arc
+        pred_dir[u_in] = 1 if self._tail_list[arc] == u_in else -1
+        children[v_in].add(u_in)
+        # the reduced cost of the entering arc becomes zero
+        sigma = self._pi[v_in] - self._pi[u_in] - pred_dir[u_in] * self._cost_list[arc]
+        nodes = [u_in]
+        for u in nodes:
+            nodes.extend(children[u])
+        self._pi[nodes] += sigma
+
+    def record_iteration(self, entering_arc, leaving_arc, step):
+        statistics = self._statistics
+        if statistics is not None:
+            statistics.counters['iterations'] += 1
+            if leaving_arc < 0:
+                statistics.counters['bound_flips'] += 1
+            elif step == 0.0:
+                statistics.counters['degenerate_pivots'] += 1
+        if self._callback is not None:
+            n_total = self._n_total
+            flow = np.array(self._flow)
+            self._callback(IterationEvent(SolverParam.Algorithm.NETWORK_SIMPLEX, self._phase,
+                                          self.n_iterations,
+                                          float(self._arc_cost.dot(flow[:n_total] + self._shift)),
+                                          float(flow[n_total:].sum()), int(entering_arc),
+                                          int(leaving_arc), float(step), step == 0.0))
+
+    def set_solution(self):
+        """Sets the values, basis, duals, and factorization of the model from the tree."""
+        model = self._model
+        n_total = self._n_total
+        m = self._root
+        flow = np.array(self._flow)
+        state = self._state
+        x = flow[:n_total] + self._shift
+        model.x = np.where(self._is_reversed, -x, x)
+        is_lower = (state[:n_total] == self.LOWER) != self._is_reversed
+        model.var_status = np.where(state[:n_total] == self.TREE, BasisStatus.BASIC,
+                                    np.where(is_lower, BasisStatus.AT_LOWER,
+                                             BasisStatus.AT_UPPER)).astype(np.int8)
+        # every row gets the artificial column of its artificial arc
+        rows = np.arange(m)
+        artificial_cols = model.add_artificial_cols(
+            rows, np.where(self._tail[n_total:] == rows, self._signs, -self._signs))
+        model.ub[artificial_cols] = 0.0
+        model.x[artificial_cols] = flow[n_total:]
+        model.var_status[artificial_cols[state[n_total:] == self.TREE]] = BasisStatus.BASIC
+        model.basis = np.flatnonzero(model.var_status == BasisStatus.BASIC)
+        model.factor = BasisFactorization(model.SOLVER_PARAM.REFACTOR_FREQUENCY)
+        if self._statistics is not None:
+            self._statistics.instrument_factor(model.factor)
+            self._statistics.counters['factorizations'] += 1
+        model.factor.factorize(model.get_basis_matrix())
+        # the potentials are the duals of the flow balances with the opposite sign
+        model.y = -self._signs * self._pi[:m]
+        model.obj.value = model.c.dot(model.x)
+        result = model.result
+        result.status = self.status
+        result.iterations += self.n_iterations
+        result.nodes += 1
+        if self._statistics is not None:
+            self._statistics.counters['nodes'] += 1
+        result.mip_gap = 0.0 if self.status == AlgorithmStatus.OPTIMAL else None
+        model.prepare_result()
@@ -0,0 +1,423 @@
+import math
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, BasisStatus, Sense, VarType, ObjectiveType
+from lp.factorization import BasisFactorization
+
+
+class Presolver:
+    """
+    This reduces the structural part of a prepared model before the Simplex algorithm starts, and
+    maps the solution of the reduced model back to the original variables and constraints.
+
+    The reductions are repeated until none of them applies:
+        - fixed columns are removed and their activity is moved to the right hand side,
+        - empty rows are removed after their feasibility is checked,
+        - singleton rows are turned into bounds of their only column,
+        - empty columns are fixed at the bound that is best for their cost,
+        - dominated columns, whose cost and coefficients all favour one bound, are fixed at it,
+        - rows implied by the activity bounds of their columns are removed.
+    Duplicate rows, whose coefficients are proportional, are merged once before the others, and
+    the bounds of integer columns are rounded inward before any of them.
+
+    In postsolve the removed columns take their fixed values, and removed rows take zero duals
+    except for the singleton rows whose bound is active, which take over the reduced cost of
+    their column, and the duplicate rows which take over the dual of their merged row if only
+    their sense allows it.
+
+    The basis of an LP model is rebuilt from the basis of the reduced model, so that the model
+    can be solved again from it after it is changed. Removed rows add their slack, surplus, or
+    artificial column to the basis, except for the singleton rows whose bound is active, which
+    add their column instead; removed columns are nonbasic at their fixed values.
+
+    Parameters
+    ==========
+    model           : Model class whose coefficient matrices are prepared
+
+    Properties
+    ==========
+    status          : AlgorithmStatus, INFEASIBLE or UNBOUNDED if presolve proves it, OPTIMAL if it
+                      removes every column, NONE otherwise
+    stats           : dict of number of rows and columns removed by each reduction
+    _row_kept       : numpy bool array of rows kept in the reduced model
+    _col_kept       : numpy bool array of columns kept in the reduced model
+    _x              : numpy array of values of the removed columns
+    _singletons     : list of (row, col, coefficient, bound) of removed singleton rows
+    _duplicates     : list of (removed row, merged row, dual ratio) of removed duplicate rows
+    """
+
+    MAX_PASSES = 20
+
+    def __init__(self, model):
+        self._model = model
+        n = model.n_cols
+        self._A = model.A[:, :n].tocsc()
+        self._A.eliminate_zeros()
+        self._A_rows = self._A.tocsr()
+        self._pattern = self._A_rows.copy()
+        self._pattern.data[:] = 1.0
+        self._b = model.b.copy()
+        self._senses = model.senses.values.copy()
+        self._orig_senses = self._senses.copy()
+        self._c = model.c[:n].copy()
+        self._lb = model.lb[:n].copy()
+        self._ub = model.ub[:n].copy()
+        self._is_int = model.var_types.values != VarType.CONTINUOUS
+        self._row_kept = np.ones(model.n_rows, dtype=bool)
+        self._col_kept = np.ones(n, dtype=bool)
+        self._x = np.zeros(n)
+        self._singletons = []
+        self._duplicates = []
+        self.status = AlgorithmStatus.NONE
+        self.round_bounds()
+        self.stats = {'rows': model.n_rows, 'cols': n,
+                      'empty_rows': 0, 'singleton_rows': 0, 'duplicate_rows': 0,
+                      'redundant_rows': 0, 'fixed_cols': 0, 'empty_cols': 0,
+                      'dominated_cols': 0, 'reduced_rows': 0, 'reduced_cols': 0}
+
+    def presolve(self):
+        """Returns the reduced model, or None if presolve solves the model on its own."""
+        reductions = (self.remove_fixed_cols, self.remove_empty_rows,
+                      self.remove_singleton_rows, self.remove_empty_cols,
+                      self.remove_dominated_cols, self.remove_redundant_rows)
+        if self.status == AlgorithmStatus.NONE:
+            self.remove_duplicate_rows()
+        for _ in range(self.MAX_PASSES):
+            is_changed = False
+            for reduction in reductions:
+                if self.status != AlgorithmStatus.NONE:
+                    break
+                is_changed |= reduction()
+            if not is_changed:
+                break
+        self.stats['reduced_rows'] = int(self._row_kept.sum())
+        self.stats['reduced_cols'] = int(self._col_kept.sum())
+        if self.status != AlgorithmStatus.NONE:
+            return None
+        if self.stats['reduced_cols'] == 0:
+            self.status = AlgorithmStatus.OPTIMAL
+            return None
+        return self.get_reduced_model()
+
+    def round_bounds(self):
+        """Rounds the bounds of integer columns inward, since reductions fix columns at them."""
+        is_binary = self._model.var_types.values == VarType.BINARY
+        self._lb[is_binary] = np.maximum(self._lb[is_binary], 0.0)
+        self._ub[is_binary] = np.minimum(self._ub[is_binary], 1.0)
+        tol = self._model.SOLVER_PARAM.INTEGRALITY_TOL
+        self._lb[self._is_int] = np.ceil(self._lb[self._is_int] - tol)
+        self._ub[self._is_int] = np.floor(self._ub[self._is_int] + tol)
+        if np.any(self._lb[self._is_int] > self._ub[self._is_int]):
+            self.status = AlgorithmStatus.INFEASIBLE
+
+    def get_tol(self, values):
+        return self._model.SOLVER_PARAM.FEASIBILITY_TOL * (1.0 + np.abs(values))
+
+    def get_row_counts(self):
+        return self._pattern.dot(self._col_kept.astype(np.float64))
+
+    def get_col_counts(self, rows):
+        return self._pattern.T.dot(rows.astype(np.float64))
+
+    def fix_cols(self, cols, values, reduction):
+        if len(cols) == 0:
+            return False
+        self._x[cols] = values
+        self._lb[cols] = values
+        self._ub[cols] = values
+        self._col_kept[cols] = False
+        self._b -= self._A[:, cols].dot(values)
+        self.stats[reduction] += len(cols)
+        return True
+
+    def remove_rows(self, rows, reduction):
+        self._row_kept[rows] = False
+        self.stats[reduction] += len(rows)
+        return len(rows) > 0
+
+    def remove_fixed_cols(self):
+        gap = self._ub - self._lb
+        if np.any(self._col_kept & (gap < -self.get_tol(self._lb))):
+            self.status = AlgorithmStatus.INFEASIBLE
+            return False
+        cols = np.flatnonzero(self._col_kept & (gap <= 0.0))
+        return self.fix_cols(cols, self._lb[cols], 'fixed_cols')
+
+    def remove_empty_rows(self):
+        rows = np.flatnonzero(self._row_kept & (self.get_row_counts() == 0))
+        b = self._b[rows]
+        senses = self._senses[rows]
+        tol = self.get_tol(b)
+        is_violated = ((senses == Sense.LE) & (b < -tol)) | \
+                      ((senses == Sense.GE) & (b > tol)) | \
+                      ((senses == Sense.EQ) & (np.abs(b) > tol))
+        if np.any(is_violated):
+            self.status = AlgorithmStatus.INFEASIBLE
+            return False
+        return self.remove_rows(rows, 'empty_rows')
+
+    def remove_singleton_rows(self):
+        A = self._A_rows
+        rows = np.flatnonzero(self._row_kept & (self.get_row_counts() == 1))
+        int_tol = self._model.SOLVER_PARAM.INTEGRALITY_TOL
+        for i in rows:
+            start, end = A.indptr[i], A.indptr[i + 1]
+            cols = A.indices[start:end]
+            k = np.flatnonzero(self._col_kept[cols])[0]
+            j, a = cols[k], A.data[start + k]
+            bound = self._b[i] / a
+            sense = self._senses[i]
+            if sense == Sense.EQ or (sense == Sense.LE) == (a > 0.0):
+                ub = math.floor(bound + int_tol) if self._is_int[j] else bound
+                self._ub[j] = min(self._ub[j], ub)
+            if sense == Sense.EQ or (sense == Sense.GE) == (a > 0.0):
+                lb = math.ceil(bound - int_tol) if self._is_int[j] else bound
+                self._lb[j] = max(self._lb[j], lb)
+            if self._lb[j] > self._ub[j]:
+                if self._lb[j] - self._ub[j] > self.get_tol(bound):
+                    self.status = AlgorithmStatus.INFEASIBLE
+                    return False
+                self._ub[j] = self._lb[j]
+            self._singletons.append((i, j, a, bound))
+        return self.remove_rows(rows, 'singleton_rows')
+
+    def remove_empty_cols(self):
+        cols = np.flatnonzero(self._col_kept & (self.get_col_counts(self._row_kept) == 0))
+        c = self._c[cols]
+        lb = self._lb[cols]
+        ub = self._ub[cols]
+        values = np.where(c > 0.0, lb, np.where(c < 0.0, ub,
+                          np.where(np.isfinite(lb), lb, np.where(np.isfinite(ub), ub, 0.0))))
+        # an unbounded empty column is left to the solver, since the rows may still be infeasible
+        is_finite = np.isfinite(values)
+        return self.fix_cols(cols[is_finite], values[is_finite], 'empty_cols')
+
+    def remove_dominated_cols(self):
+        A = self._A
+        is_le = (self._row_kept & (self._senses == Sense.LE)).astype(np.float64)
+        is_ge = (self._row_kept & (self._senses == Sense.GE)).astype(np.float64)
+        is_eq = self._row_kept & (self._senses == Sense.EQ)
+        positive = (A > 0.0).astype(np.float64).T
+        negative = (A < 0.0).astype(np.float64).T
+        # decreasing the column can only relax the rows, and increasing it can only tighten them
+        is_down = (positive.dot(is_ge) == 0) & (negative.dot(is_le) == 0)
+        is_up = (positive.dot(is_le) == 0) & (negative.dot(is_ge) == 0)
+        is_candidate = self._col_kept & (self.get_col_counts(is_eq) == 0)
+        to_lower = is_candidate & is_down & (self._c >= 0.0) & np.isfinite(self._lb)
+        to_upper = is_candidate & ~to_lower & is_up & (self._c <= 0.0) & np.isfinite(self._ub)
+        is_changed = self.fix_cols(np.flatnonzero(to_lower),
+                                   self._lb[to_lower], 'dominated_cols')
+        is_changed |= self.fix_cols(np.flatnonzero(to_upper),
+                                    self._ub[to_upper], 'dominated_cols')
+        return is_changed
+
+    def remove_redundant_rows(self):
+        min_activity, max_activity = self.get_activity_bounds()
+        b = self._b
+        tol = self.get_tol(b)
+        is_le = self._senses == Sense.LE
+        is_ge = self._senses == Sense.GE
+        is_eq = self._senses == Sense.EQ
+        is_infeasible = self._row_kept & (
+            (~is_ge & (min_activity > b + tol)) | (~is_le & (max_activity < b - tol)))
+        if np.any(is_infeasible):
+            self.status = AlgorithmStatus.INFEASIBLE
+            return False
+        is_implied = self._row_kept & (
+            (is_le & (max_activity <= b + tol)) |
+            (is_ge & (min_activity >= b - tol)) |
+            (is_eq & (max_activity <= b + tol) & (min_activity >= b - tol)))
+        return self.remove_rows(np.flatnonzero(is_implied), 'redundant_rows')
+
+    def get_activity_bounds(self):
+        """Returns the minimum and maximum activities of the rows over the kept columns."""
+        A = self._A_rows
+        positive = A.multiply(A > 0.0).tocsr()
+        negative = A.multiply(A < 0.0).tocsr()
+        lb = np.where(self._col_kept, self._lb, 0.0)
+        ub = np.where(self._col_kept, self._ub, 0.0)
+        lb_inf = np.isinf(lb).astype(np.float64)
+        ub_inf = np.isinf(ub).astype(np.float64)
+        lb[lb_inf > 0] = 0.0
+        ub[ub_inf > 0] = 0.0
+        min_activity = positive.dot(lb) + negative.dot(ub)
+        max_activity = positive.dot(ub) + negative.dot(lb)
+        min_activity[(positive != 0).dot(lb_inf) + (negative != 0).dot(ub_inf) > 0] = -np.inf
+        max_activity[(positive != 0).dot(ub_inf) + (negative != 0).dot(lb_inf) > 0] = np.inf
+        return min_activity, max_activity
+
+    def remove_duplicate_rows(self):
+        A = self._A_rows
+        groups = {}
+        for i in np.flatnonzero(self._row_kept & (self.get_row_counts() > 1)):
+            start, end = A.indptr[i], A.indptr[i + 1]
+            order = np.argsort(A.indices[start:end])
+            cols = A.indices[start:end][order]
+            vals = A.data[start:end][order]
+            key = (cols.tobytes(), np.round(vals / vals[0], 12).tobytes())
+            groups.setdefault(key, []).append((i, vals[0]))
+        for rows in groups.values():
+            if len(rows) > 1:
+                self.merge_duplicate_rows(rows)
+                if self.status != AlgorithmStatus.NONE:
+                    return
+
+    def merge_duplicate_rows(self, rows):
+        """Merges rows whose coefficients are proportional into one or two of them."""
+        lower, upper = (-np.inf, None), (np.inf, None)
+        for i, scale in rows:
+            value = self._b[i] / scale
+            sense = self._senses[i]
+            if sense == Sense.EQ or (sense == Sense.LE) == (scale > 0.0):
+                upper = min(upper, (value, i), key=lambda bound: bound[0])
+            if sense == Sense.EQ or (sense == Sense.GE) == (scale > 0.0):
+                lower = max(lower, (value, i), key=lambda bound: bound[0])
+        if lower[0] - upper[0] > self.get_tol(upper[0]):
+            self.status = AlgorithmStatus.INFEASIBLE
+            return
+        scales = dict(rows)
+        if upper[1] is not None and lower[0] >= upper[0] - self.get_tol(upper[0]):
+            kept = [upper[1]]
+            self._senses[upper[1]] = Sense.EQ
+            self._b[upper[1]] = upper[0] * scales[upper[1]]
+        else:
+            kept = [i for _, i in (lower, upper) if i is not None]
+        for i, scale in rows:
+            if i not in kept:
+                self._row_kept[i] = False
+                self._duplicates.append((i, kept[0], scales[kept[0]] / scale))
+                self.stats['duplicate_rows'] += 1
+
+    def get_reduced_model(self):
+        model = self._model
+        reduced = type(model)(model.name)
+        cols = np.flatnonzero(self._col_kept)
+        rows = np.flatnonzero(self._row_kept)
+        reduced.add_vars(len(cols), self._lb[cols], self._ub[cols], self._c[cols],
+                         model.var_types.values[cols], [model.vars[j].name for j in cols])
+        # costs are already in minimization form
+        reduced.set_objective(None, ObjectiveType.MIN)
+        reduced.add_constrs(self._A_rows[rows][:, cols], self._senses[rows], self._b[rows])
+        reduced.prepare_coefficient_matrices()
+        return reduced
+
+    def postsolve(self, reduced):
+        """Maps the solution and duals of the reduced model back to the model."""
+        model = self._model
+        result = model.result
+        result.presolve = self.stats
+        x = self._x.copy()
+        status = np.where(x >= self._ub, BasisStatus.AT_UPPER, BasisStatus.AT_LOWER)
+        y = None
+        if reduced is None:
+            result.status = self.status
+            result.mip_gap = None
+            if self.status == AlgorithmStatus.OPTIMAL:
+                result.mip_gap = 0.0
+                y = np.zeros(model.n_rows)
+        else:
+            result.status = reduced.result.status
+            result.iterations += reduced.result.iterations
+            result.nodes += reduced.result.nodes
+            result.mip_gap = reduced.result.mip_gap
+            x[self._col_kept] = reduced.x[:reduced.n_cols]
+            status[self._col_kept] = reduced.var_status[:reduced.n_cols]
+            if reduced.y is not None:
+                y = np.zeros(model.n_rows)
+                # rows with negative right hand side are negated when the reduced model is built
+                y[self._row_kept] = reduced.y * np.where(self._b[self._row_kept] < 0.0, -1.0, 1.0)
+        if y is not None and not model.is_mip:
+            self.postsolve_duals(x, y)
+            model.y = y
+        self.set_solution(x, status)
+        has_basis = reduced.basis is not None if reduced is not None else \
+            self.status == AlgorithmStatus.OPTIMAL
+        if not model.is_mip and has_basis:
+            self.set_basis(reduced)
+        model.prepare_result()
+
+    def postsolve_duals(self, x, y):
+        for i, k, ratio in reversed(self._duplicates):
+            if not self.is_dual_feasible(k, y[k]) and self.is_dual_feasible(i, y[k] * ratio):
+                y[i] = y[k] * ratio
+                y[k] = 0.0
+        for i, j, a, bound in reversed(self._singletons):
+            d = self._c[j] - self._A[:, j].T.dot(y)[0]
+            if abs(x[j] - bound) <= self.get_tol(bound) and self.is_dual_feasible(i, d / a):
+                y[i] = d / a
+
+    def is_dual_feasible(self, i, y_i):
+        sense = self._orig_senses[i]
+        return sense == Sense.EQ or (y_i <= 0.0 if sense == Sense.LE else y_i >= 0.0)
+
+    def set_solution(self, x, status):
+        """Sets the values and basis status of the columns of the model from its structural values."""
+        model = self._model
+        model.x = np.zeros(model.A.shape[1])
+        model.x[:model.n_cols] = x
+        activity = model.A[:, :model.n_cols].dot(x)
+        slack_rows = model.get_slack_rows()
+        surplus_rows = model.get_surplus_rows()
+        model.x[model.get_slack_cols()] = model.b[slack_rows] - activity[slack_rows]
+        model.x[model.get_surplus_cols()] = activity[surplus_rows] - model.b[surplus_rows]
+        model.var_status = np.full(model.A.shape[1], BasisStatus.AT_LOWER, dtype=np.int8)
+        model.var_status[:model.n_cols] = status
+        is_logical_basic = model.x > model.SOLVER_PARAM.FEASIBILITY_TOL
+        is_logical_basic[:model.n_cols] = False
+        model.var_status[is_logical_basic] = BasisStatus.BASIC
+        model.basis = None
+        model.obj.value = model.c.dot(model.x)
+
+    def set_basis(self, reduced):
+        """Sets the basis of the model from the basis of the reduced model, if it is valid."""
+        model = self._model
+        n = model.n_cols
+        x = model.x[:n]
+        lb = model.lb[:n]
+        ub = model.ub[:n]
+        at_lower = np.isfinite(lb) & (np.abs(x - lb) <= self.get_tol(lb))
+        at_upper = ~at_lower & np.isfinite(ub) & (np.abs(x - ub) <= self.get_tol(ub))
+        is_free = ~np.isfinite(lb) & ~np.isfinite(ub) & (np.abs(x) <= self.get_tol(0.0))
+        status = np.where(at_lower, BasisStatus.AT_LOWER,
+                          np.where(at_upper, BasisStatus.AT_UPPER,
+                                   np.where(is_free, BasisStatus.FREE, BasisStatus.NONE)))
+        # whether the slack, surplus, or artificial column of a row is basic
+        is_row_basic = ~self._row_kept
+        if reduced is not None:
+            status[np.flatnonzero(self._col_kept)[
+                reduced.var_status[:reduced.n_cols] == BasisStatus.BASIC]] = BasisStatus.BASIC
+            is_row_basic[self._row_kept] = reduced.get_basic_rows()
+        for i, j, a, bound in reversed(self._singletons):
+            if status[j] != BasisStatus.BASIC and abs(x[j] - bound) <= self.get_tol(bound):
+                status[j] = BasisStatus.BASIC
+                is_row_basic[i] = False
+        if np.any(status == BasisStatus.NONE) or \
+                np.count_nonzero(status == BasisStatus.BASIC) + \
+                np.count_nonzero(is_row_basic) != model.n_rows:
+            return
+        solution_status = model.var_status
+        model.var_status = np.full(model.A.shape[1], BasisStatus.AT_LOWER, dtype=np.int8)
+        model.var_status[:n] = status
+        model.var_status[model.get_slack_cols()[is_row_basic[model.get_slack_rows()]]] = \
+            BasisStatus.BASIC
+        model.var_status[model.get_surplus_cols()[is_row_basic[model.get_surplus_rows()]]] = \
+            BasisStatus.BASIC
+        rows = np.flatnonzero(is_row_basic & (model.senses.values == Sense.EQ))
+        artificial_cols = model.add_artificial_cols(rows, np.ones(len(rows)))
+        model.ub[artificial_cols] = 0.0
+        model.var_status[artificial_cols] = BasisStatus.BASIC
+        basis = np.flatnonzero(model.var_status == BasisStatus.BASIC)
+        factor = BasisFactorization(model.SOLVER_PARAM.REFACTOR_FREQUENCY)
+        if model.statistics is not None:
+            model.statistics.instrument_factor(factor)
+            model.statistics.counters['factorizations'] += 1
+        try:
+            factor.factorize(model.A[:, basis])
+        except RuntimeError:
+            model.var_status = np.concatenate((solution_status, np.full(
+                len(artificial_cols), BasisStatus.AT_LOWER, dtype=np.int8)))
+            return
+        model.basis = basis
+        model.factor = factor
+
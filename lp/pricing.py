@@ -0,0 +1,279 @@
+import numpy as np
+
+from lp.entity import SolverParam
+
+
+class DantzigPricing:
+    """
+    This selects the entering variable with the largest reduced cost violation over all columns.
+
+    Parameters
+    ==========
+    solver      : SimplexSolver class which provides the reduced cost violations of the columns
+    model       : Model class
+    """
+
+    def __init__(self, solver, model):
+        self._solver = solver
+        self._model = model
+
+    def select_entering(self, w):
+        infeasibility = self._solver.get_infeasibility(w)
+        entering_var = int(np.argmax(infeasibility))
+        if infeasibility[entering_var] > 0.0:
+            return entering_var
+        return -1
+
+    def update(self, entering_var, leaving_var, k, y_k):
+        pass
+
+
+class PartialPricing(DantzigPricing):
+    """
+    This uses partial and multiple pricing. Columns are priced one segment at a time, starting
+    from the segment after the last one priced, and the best columns of a segment are kept as
+    a candidate list that is re-priced first in the following iterations.
+
+    Parameters
+    ==========
+    solver          : SimplexSolver class which provides the reduced cost violations of the columns
+    model           : Model class
+    n_segments      : int number of segments the columns are partitioned into
+    n_candidates    : int maximum number of columns kept in the candidate list
+
+    Properties
+    ==========
+    _segment        : int index of the next segment to price
+    _candidates     : numpy array of candidate columns of the last priced segment
+    """
+
+    def __init__(self, solver, model, n_segments=8, n_candidates=5):
+        super().__init__(solver, model)
+        n_total = model.A.shape[1]
+        self._n_segments = max(1, min(n_segments, n_total))
+        self._segment_size = -(-n_total // self._n_segments)
+        self._n_candidates = n_candidates
+        self._segment = 0
+        self._candidates = np.empty(0, dtype=np.int64)
+
+    def select_entering(self, w):
+        if len(self._candidates) > 0:
+            infeasibility = self._solver.get_infeasibility(w, self._candidates)
+            if np.any(infeasibility > 0.0):
+                return self.select_candidate(self._candidates, infeasibility)
+        for _ in range(self._n_segments):
+            start = self._segment * self._segment_size
+            cols = np.arange(start, min(start + self._segment_size, self._model.A.shape[1]))
+            self._segment = (self._segment + 1) % self._n_segments
+            infeasibility = self._solver.get_infeasibility(w, cols)
+            if np.any(infeasibility > 0.0):
+                return self.select_candidate(cols, infeasibility)
+        self._candidates = np.empty(0, dtype=np.int64)
+        return -1
+
+    def select_candidate(self, cols, infeasibility):
+        eligible = np.flatnonzero(infeasibility > 0.0)
+        order = eligible[np.argsort(-infeasibility[eligible])][:self._n_candidates + 1]
+        self._candidates = cols[order[1:]]
+        return int(cols[order[0]])
+
+
+class DevexPricing(DantzigPricing):
+    """
+    This uses the Devex approximation of steepest edge pricing. The reference weights start
+    from one and are updated from the pivot row after every basis change; they are reset once
+    they grow beyond the reset threshold.
+
+    Parameters
+    ==========
+    solver          : SimplexSolver class which provides the reduced cost violations of the columns
+    model           : Model class
+
+    Properties
+    ==========
+    _weights        : numpy array of reference weights of the columns
+    """
+
+    RESET_THRESHOLD = 1e6
+
+    def __init__(self, solver, model):
+        super().__init__(solver, model)
+        self._weights = np.ones(model.A.shape[1])
+
+    def select_entering(self, w):
+        infeasibility = self._solver.get_infeasibility(w)
+        score = infeasibility * infeasibility / self._weights
+        entering_var = int(np.argmax(score))
+        if infeasibility[entering_var] > 0.0:
+            return entering_var
+        return -1
+
+    def update(self, entering_var, leaving_var, k, y_k):
+        ratio = self._solver.get_pivot_row(k) / y_k[k]
+        weight_q = self._weights[entering_var]
+        np.maximum(self._weights, ratio * ratio * weight_q, out=self._weights)
+        self._weights[leaving_var] = max(weight_q / (y_k[k] * y_k[k]), 1.0)
+        if weight_q > self.RESET_THRESHOLD:
+            self._weights.fill(1.0)
+
+
+class SteepestEdgePricing(DantzigPricing):
+    """
+    This uses primal steepest edge pricing, which divides the reduced cost violations by the
+    norms gamma_j = 1 + ||B^-1 a_j||^2 of the edge directions. The norms are updated exactly
+    after every basis change with the Goldfarb-Reid recurrences. They are initialized from the
+    column norms of A, which are the exact norms only for a starting basis of slack, surplus,
+    and artificial columns. A warm start from another basis, as in a resolve, a branch and bound
+    node, or a batch scenario, starts from these approximate norms, and the recurrences keep them
+    approximate, like reference weights.
+
+    Parameters
+    ==========
+    solver          : SimplexSolver class which provides the reduced cost violations of the columns
+    model           : Model class
+
+    Properties
+    ==========
+    _gamma          : numpy array of reference norms of the columns
+    """
+
+    def __init__(self, solver, model):
+        super().__init__(solver, model)
+        A = model.A
+        self._gamma = 1.0 + np.asarray(A.multiply(A).sum(axis=0)).ravel()
+
+    def select_entering(self, w):
+        infeasibility = self._solver.get_infeasibility(w)
+        score = infeasibility * infeasibility / self._gamma
+        entering_var = int(np.argmax(score))
+        if infeasibility[entering_var] > 0.0:
+            return entering_var
+        return -1
+
+    def update(self, entering_var, leaving_var, k, y_k):
+        ratio = self._solver.get_pivot_row(k) / y_k[k]
+        tau = self._model.A.T.dot(self._model.factor.btran(y_k))
+        gamma_q = 1.0 + y_k.dot(y_k)
+        gamma = self._gamma - 2.0 * ratio * tau + ratio * ratio * gamma_q
+        np.maximum(gamma, 1.0 + ratio * ratio, out=self._gamma)
+        self._gamma[leaving_var] = max(gamma_q / (y_k[k] * y_k[k]), 1.0)
+
+
+def create_pricing(solver, model):
+    pricing = model.SOLVER_PARAM.PRICING
+    if pricing == SolverParam.Pricing.PARTIAL:
+        return PartialPricing(solver, model)
+    elif pricing == SolverParam.Pricing.DEVEX:
+        return DevexPricing(solver, model)
+    elif pricing == SolverParam.Pricing.STEEPEST_EDGE:
+        return SteepestEdgePricing(solver, model)
+    else:
+        return DantzigPricing(solver, model)
+
+
+class DualDantzigPricing:
+    """
+    This selects the leaving row of the dual Simplex algorithm with the largest primal infeasibility.
+
+    Parameters
+    ==========
+    solver      : DualSimplexSolver class which provides the primal infeasibilities of the basic rows
+    model       : Model class
+    """
+
+    def __init__(self, solver, model):
+        self._solver = solver
+        self._model = model
+
+    def select_leaving(self, infeasibility):
+        k = int(np.argmax(infeasibility))
+        if infeasibility[k] > 0.0:
+            return k
+        return -1
+
+    def update(self, entering_var, k, y_k, rho):
+        pass
+
+
+class DualDevexPricing(DualDantzigPricing):
+    """
+    This uses the dual Devex approximation of dual steepest edge pricing. The reference weights of
+    the rows start from one and are updated from the entering column after every basis change.
+
+    Parameters
+    ==========
+    solver      : DualSimplexSolver class which provides the primal infeasibilities of the basic rows
+    model       : Model class
+
+    Properties
+    ==========
+    _weights    : numpy array of reference weights of the basic rows
+    """
+
+    RESET_THRESHOLD = 1e6
+
+    def __init__(self, solver, model):
+        super().__init__(solver, model)
+        self._weights = np.ones(model.n_rows)
+
+    def select_leaving(self, infeasibility):
+        k = int(np.argmax(infeasibility * infeasibility / self._weights))
+        if infeasibility[k] > 0.0:
+            return k
+        return -1
+
+    def update(self, entering_var, k, y_k, rho):
+        ratio = y_k / y_k[k]
+        weight_k = self._weights[k]
+        np.maximum(self._weights, ratio * ratio * weight_k, out=self._weights)
+        self._weights[k] = max(weight_k / (y_k[k] * y_k[k]), 1.0)
+        if weight_k > self.RESET_THRESHOLD:
+            self._weights.fill(1.0)
+
+
+class DualSteepestEdgePricing(DualDantzigPricing):
+    """
+    This uses dual steepest edge pricing, which divides the primal infeasibilities by the norms
+    beta_i = ||e_i B^-1||^2 of the rows of the basis inverse. The norms are updated exactly after
+    every basis change with the Forrest-Goldfarb recurrences. They start from one, which is exact
+    only for a starting basis of slack, surplus, and artificial columns; a warm start from
+    another basis, as in a resolve, a branch and bound node, or a batch scenario, keeps
+    approximate norms.
+
+    Parameters
+    ==========
+    solver      : DualSimplexSolver class which provides the primal infeasibilities of the basic rows
+    model       : Model class
+
+    Properties
+    ==========
+    _beta       : numpy array of reference norms of the basic rows
+    """
+
+    def __init__(self, solver, model):
+        super().__init__(solver, model)
+        self._beta = np.ones(model.n_rows)
+
+    def select_leaving(self, infeasibility):
+        k = int(np.argmax(infeasibility * infeasibility / self._beta))
+        if infeasibility[k] > 0.0:
+            return k
+        return -1
+
+    def update(self, entering_var, k, y_k, rho):
+        ratio = y_k / y_k[k]
+        tau = self._model.factor.ftran(rho)
+        beta_k = rho.dot(rho)
+        beta = self._beta - 2.0 * ratio * tau + ratio * ratio * beta_k
+        np.maximum(beta, 1e-12, out=self._beta)
+        self._beta[k] = max(beta_k / (y_k[k] * y_k[k]), 1e-12)
+
+
+def create_dual_pricing(solver, model):
+    pricing = model.SOLVER_PARAM.PRICING
+    if pricing == SolverParam.Pricing.DEVEX:
+        return DualDevexPricing(solver, model)
+    elif pricing == SolverParam.Pricing.STEEPEST_EDGE:
+        return DualSteepestEdgePricing(solver, model)
+    else:
+        return DualDantzigPricing(solver, model)
@@ -0,0 +1,121 @@
+import numpy as np
+
+from lp.entity import VarType
+
+
+class Scaling:
+    """
+    This scales the rows and columns of the prepared matrices of a model before it is solved,
+    and unscales the solution afterwards. The solver runs on R A C, with right hand sides R b,
+    costs C c, and bounds divided by C, so that the values of the columns are x / C and the
+    duals of the rows y / R.
+
+    The scales are found by passes of geometric mean scaling, which divide every row and then
+    every column by the square root of the product of its largest and smallest absolute
+    coefficient, until the ratio of the largest to the smallest coefficient of the matrix stops
+    improving, followed by an equilibration pass that makes the largest absolute coefficient of
+    every row and column one. All scales are rounded to powers of two, so that scaling and
+    unscaling are exact. Integer columns are not scaled, to keep their values integral, and the
+    slack, surplus, and artificial columns are scaled by the inverse of their row scale, so
+    that their coefficients stay one.
+
+    Parameters
+    ==========
+    model       : Model class with prepared matrices
+
+    Properties
+    ==========
+    row_scale   : numpy array of scales of the rows
+    col_scale   : numpy array of scales of the variables
+    """
+
+    MAX_PASSES = 20
+    # smallest relative decrease of the coefficient ratio for another pass
+    MIN_IMPROVEMENT = 0.1
+
+    def __init__(self, model):
+        self._model = model
+        n = model.n_cols
+        A = model.A[:, :n].tocoo()
+        rows = A.row
+        cols = A.col
+        values = np.abs(A.data)
+        is_nonzero = values > 0.0
+        rows, cols, values = rows[is_nonzero], cols[is_nonzero], values[is_nonzero]
+        var_types = model.var_types.values
+        is_scaled = (var_types != VarType.BINARY) & (var_types != VarType.INTEGER)
+        self.row_scale = np.ones(A.shape[0])
+        self.col_scale = np.ones(n)
+        ratio = np.inf
+        for _ in range(self.MAX_PASSES):
+            scaled = values * self.row_scale[rows] * self.col_scale[cols]
+            new_ratio = scaled.max(initial=1.0) / scaled.min(initial=1.0)
+            if new_ratio > (1.0 - self.MIN_IMPROVEMENT) * ratio:
+                break
+            ratio = new_ratio
+            largest, smallest = self.get_extremes(rows, scaled, len(self.row_scale))
+            self.row_scale /= np.sqrt(largest * smallest)
+            scaled = values * self.row_scale[rows] * self.col_scale[cols]
+            largest, smallest = self.get_extremes(cols, scaled, n)
+            self.col_scale[is_scaled] /= np.sqrt(largest * smallest)[is_scaled]
+        scaled = values * self.row_scale[rows] * self.col_scale[cols]
+        self.row_scale /= self.get_extremes(rows, scaled, len(self.row_scale))[0]
+        scaled = values * self.row_scale[rows] * self.col_scale[cols]
+        self.col_scale[is_scaled] /= self.get_extremes(cols, scaled, n)[0][is_scaled]
+        self.row_scale = np.exp2(np.round(np.log2(self.row_scale)))
+        self.col_scale = np.exp2(np.round(np.log2(self.col_scale)))
+
+    @staticmethod
+    def get_extremes(indices, values, size):
+        """Returns the largest and smallest of the values of each index, or ones if it has none."""
+        largest = np.zeros(size)
+        np.maximum.at(largest, indices, values)
+        smallest = np.full(size, np.inf)
+        np.minimum.at(smallest, indices, values)
+        is_empty = largest == 0.0
+        largest[is_empty] = 1.0
+        smallest[is_empty] = 1.0
+        return largest, smallest
+
+    def get_all_col_scales(self):
+        """Returns the scales of all columns, where a logical column has the inverse of its row's."""
+        model = self._model
+        A = model.A
+        logical_rows = A.indices[A.indptr[model.n_cols:-1]]
+        return np.concatenate((self.col_scale, 1.0 / self.row_scale[logical_rows]))
+
+    def scale(self):
+        """Scales the matrices, right hand sides, costs, bounds, and values of the model."""
+        model = self._model
+        col_scale = self.get_all_col_scales()
+        A = model.A
+        A.data *= self.row_scale[A.indices] * np.repeat(col_scale, np.diff(A.indptr))
+        model.b = model.b * self.row_scale
+        model.c = model.c * col_scale
+        model.lb = model.lb / col_scale
+        model.ub = model.ub / col_scale
+        model.x = model.x / col_scale
+
+    def unscale(self):
+        """Unscales the matrices and the solution, and refactors the basis if there is one."""
+        model = self._model
+        col_scale = self.get_all_col_scales()
+        A = model.A
+        A.data /= self.row_scale[A.indices] * np.repeat(col_scale, np.diff(A.indptr))
+        model.b = model.b / self.row_scale
+        model.c = model.c / col_scale
+        model.lb = model.lb * col_scale
+        model.ub = model.ub * col_scale
+        model.x = model.x * col_scale[:len(model.x)]
+        if model.y is not None:
+            model.y = model.y * self.row_scale
+        if model.basis is not None and model.factor is not None:
+            model.factor.factorize(model.get_basis_matrix())
+
+    def add_rows(self, k):
+        """Adds unscaled rows, such as cuts built from the scaled columns."""
+        self.row_scale = np.concatenate((self.row_scale, np.ones(k)))
+
+    def remove_rows(self, is_kept):
+        """Removes the scales of the rows that are not kept, such as cuts purged from the pool."""
+        self.row_scale = self.row_scale[is_kept]
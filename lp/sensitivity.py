@@ -0,0 +1,101 @@
+import numpy as np
+
+from lp.entity import BasisStatus, ObjectiveType
+
+
+class SensitivityAnalysis:
+    """
+    This computes the ranging of an optimal basis from its factorization, with no further
+    solves. A range is the interval over which a right hand side or a cost can change on its own
+    while the basis stays optimal; the duals stay the same over the range of a right hand side,
+    and the values of the variables over the range of a cost.
+
+    The basic values move along B^-1 e_i as the right hand side of row i changes, so its range
+    ends where the first basic variable reaches a bound. The reduced costs move along row k of
+    B^-1 A as the cost of the basic variable at position k changes, so its range ends where the
+    first nonbasic reduced cost changes sign. The cost of a nonbasic variable can change until
+    its own reduced cost changes sign. Both are done for many rows at once with FTRAN and BTRAN
+    over blocks of unit vectors.
+
+    Parameters
+    ==========
+    model       : Model class with an optimal basis and its factorization
+
+    Properties
+    ==========
+    _sign       : double -1 for a maximization objective, else 1
+    """
+
+    # bound on the number of values of the matrices built for a block of rows
+    CHUNK_SIZE = 1 << 22
+
+    def __init__(self, model):
+        self._model = model
+        self._sign = -1.0 if model.obj.obj_type == ObjectiveType.MAX else 1.0
+
+    def get_rhs_ranges(self):
+        """Returns the lower and upper ends of the right hand side ranges of the constraints."""
+        model = self._model
+        m = model.n_rows
+        basis = model.basis
+        x_b = model.x[basis]
+        down = np.zeros(m)
+        up = np.zeros(m)
+        chunk = max(1, self.CHUNK_SIZE // max(m, 1))
+        for start in range(0, m, chunk):
+            rows = np.arange(start, min(m, start + chunk))
+            E = np.zeros((m, len(rows)))
+            E[rows, np.arange(len(rows))] = 1.0
+            down[rows], up[rows] = self.get_step_range(
+                model.factor.ftran_many(E), x_b, model.lb[basis], model.ub[basis])
+        # ranges are given in the orientation the constraints are added with
+        signs = model.row_signs.values
+        rhs = signs * model.b
+        return np.column_stack((rhs + np.where(signs > 0, down, -up),
+                                rhs + np.where(signs > 0, up, -down)))
+
+    def get_cost_ranges(self):
+        """Returns the lower and upper ends of the cost ranges of the variables."""
+        model = self._model
+        n = model.n_cols
+        basis = model.basis
+        d = model.c - model.A.T.dot(model.factor.btran(model.c[basis]))
+        d_lb, d_ub = self.get_reduced_cost_bounds()
+        # nonbasic variables change their own reduced cost only
+        down = np.minimum(d_lb[:n] - d[:n], 0.0)
+        up = np.maximum(d_ub[:n] - d[:n], 0.0)
+        positions = np.flatnonzero(basis < n)
+        chunk = max(1, self.CHUNK_SIZE // max(model.A.shape[1], 1))
+        for start in range(0, len(positions), chunk):
+            block = positions[start:start + chunk]
+            E = np.zeros((len(basis), len(block)))
+            E[block, np.arange(len(block))] = 1.0
+            alpha = model.A.T.dot(model.factor.btran_many(E))
+            cols = basis[block]
+            down[cols], up[cols] = self.get_step_range(-alpha, d, d_lb, d_ub)
+        # ranges are given for the objective as it is set
+        c = model.c[:n]
+        if self._sign > 0:
+            return np.column_stack((c + down, c + up))
+        return np.column_stack((-c - up, -c - down))
+
+    def get_reduced_cost_bounds(self):
+        """Returns the bounds on the reduced costs of the columns for the basis to stay optimal."""
+        model = self._model
+        status = model.var_status
+        is_free = (status == BasisStatus.BASIC) | (model.lb == model.ub)
+        d_lb = np.where(~is_free & (status != BasisStatus.AT_UPPER), 0.0, -np.inf)
+        d_ub = np.where(~is_free & (status != BasisStatus.AT_LOWER), 0.0, np.inf)
+        return d_lb, d_ub
+
+    def get_step_range(self, alpha, values, lb, ub):
+        """Returns the smallest and largest steps along each column of alpha within the bounds."""
+        tol = self._model.SOLVER_PARAM.PIVOT_TOL
+        to_ub = np.maximum(ub - values, 0.0)[:, None]
+        to_lb = np.minimum(lb - values, 0.0)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            up = np.where(alpha > tol, to_ub / alpha,
+                          np.where(alpha < -tol, to_lb / alpha, np.inf))
+            down = np.where(alpha > tol, to_lb / alpha,
+                            np.where(alpha < -tol, to_ub / alpha, -np.inf))
+        return down.max(axis=0, initial=-np.inf), up.min(axis=0, initial=np.inf)
@@ -1,31 +1,86 @@
-import json
+import copy
+import math
+import multiprocessing
+import queue
 import time
 
 import numpy as np
+from scipy.sparse import vstack
 
-from lp.entity import AlgorithmStatus, VarNameType, \
-    ObjectiveType, VarType, Node
-from lp.helper import get_c_b
+from lp.cuts import CutPool, GomorySeparator, KnapsackCoverSeparator
+from lp.entity import AlgorithmStatus, BasisStatus, VarType, Node, \
+    SolverParam, Objective, Result, IterationEvent
+from lp.factorization import BasisFactorization
+from lp.helper import get_column
+from lp.heuristics import create_heuristics
+from lp.pricing import create_pricing, create_dual_pricing
+from lp.tree import NodeQueue
 
 
 class InitialBasicSolutionGenerator:
+    """
+    This builds the starting basis of the two-phase Simplex algorithm. Nonbasic columns start at
+    a finite bound, or at zero if they are free. The slack or surplus column of a row is basic
+    whenever its value is feasible; every other row gets an artificial column whose sign makes
+    its value nonnegative, so the starting basis is always primal feasible for phase I.
+
+    For the dual Simplex algorithm the slack or surplus column of every row is basic whatever its
+    value, and equality rows get an artificial column fixed at zero.
+
+    Parameters
+    ==========
+    model       : Model class
+    """
     def __init__(self, model):
         self._model = model
 
     def generate(self):
-        n_rows = self._model.n_rows
-        self._model.B_inv = np.identity(n_rows)
-        B_inv_b = self._model.B_inv.dot(self._model.b)
-        if np.all(B_inv_b >= 0):
-            for v in range(n_rows):
-                self._model.basis[v].value = B_inv_b[v].item()
-            return True
-        return False
+        model = self._model
+        model.var_status = np.where(np.isfinite(model.lb), BasisStatus.AT_LOWER,
+                                    np.where(np.isfinite(model.ub), BasisStatus.AT_UPPER,
+                                             BasisStatus.FREE)).astype(np.int8)
+        model.x = np.where(model.var_status == BasisStatus.AT_LOWER, model.lb,
+                           np.where(model.var_status == BasisStatus.AT_UPPER, model.ub, 0.0))
+        residual = model.b - model.A.dot(model.x)
+        model.basis = np.full(model.n_rows, -1, dtype=np.int64)
+        slack_rows = model.get_slack_rows()
+        surplus_rows = model.get_surplus_rows()
+        is_slack_feasible = residual[slack_rows] >= 0.0
+        is_surplus_feasible = residual[surplus_rows] <= 0.0
+        if model.SOLVER_PARAM.ALGORITHM == SolverParam.Algorithm.DUAL_SIMPLEX:
+            is_slack_feasible[:] = True
+            is_surplus_feasible[:] = True
+        model.basis[slack_rows[is_slack_feasible]] = \
+            model.get_slack_cols()[is_slack_feasible]
+        model.basis[surplus_rows[is_surplus_feasible]] = \
+            model.get_surplus_cols()[is_surplus_feasible]
+        # add artificial columns for the remaining rows
+        artificial_rows = np.flatnonzero(model.basis < 0)
+        signs = np.where(residual[artificial_rows] >= 0.0, 1.0, -1.0)
+        artificial_cols = model.add_artificial_cols(artificial_rows, signs)
+        model.basis[artificial_rows] = artificial_cols
+        if model.SOLVER_PARAM.ALGORITHM == SolverParam.Algorithm.DUAL_SIMPLEX:
+            model.ub[artificial_cols] = 0.0
+        model.var_status[model.basis] = BasisStatus.BASIC
+        model.x[model.basis] = 0.0
+        model.factor = BasisFactorization(model.SOLVER_PARAM.REFACTOR_FREQUENCY)
+        if model.statistics is not None:
+            model.statistics.instrument_factor(model.factor)
+        model.factor.factorize(model.get_basis_matrix())
+        model.x[model.basis] = model.factor.ftran(model.get_reduced_rhs())
+        return True
 
 
 class SimplexSolver:
     """
-    This uses Simplex algorithm to solve original LP problem or relaxed MIP problem.
+    This uses bounded Simplex algorithm to solve original LP problem or relaxed MIP problem.
+    Nonbasic variables are kept at one of their bounds, and a variable whose bounds are
+    reached before any basic variable blocks it flips between its bounds without a pivot.
+
+    If the starting basis has positive artificial variables, phase I minimizes their sum first.
+    Afterwards the artificial variables are pivoted out of the basis where possible, the ones
+    left in redundant rows are fixed at zero, and phase II optimizes the original objective
+    from the feasible basis.
 
     Parameters
     ==========
@@ -34,135 +89,709 @@ class SimplexSolver:
     Properties
     ==========
     _is_terminated : bool whether or not the simplex solver is terminated
+    _c             : numpy array of cost vector of the current phase
+    _factor        : BasisFactorization class of the current basis
+    _pricing       : pricing strategy selected by SolverParam.PRICING
+    _phase         : int 1 while phase I minimizes the artificials, else 2
+    _statistics    : Statistics class of the model, or None if statistics are disabled
+    _callback      : function of the model called with an IterationEvent after every iteration
+    status         : AlgorithmStatus of the LP problem once the solver is terminated
+    n_iterations   : int number of iterations done by the simplex solver
     """
     def __init__(self, model):
         self._model = model
         self._is_terminated = False
-        self._E = np.identity(model.n_rows)
+        self._c = model.c
+        self._factor = model.factor
+        self._pricing = create_pricing(self, model)
+        self._phase = 2
+        self._statistics = model.statistics
+        self._callback = model.callback
+        self.status = AlgorithmStatus.NONE
+        self.n_iterations = 0
+        if self._statistics is not None:
+            self._statistics.instrument_pricing(self._pricing, 'select_entering')
+            self.ratio_test = self._statistics.timed(self.ratio_test, 'ratio_test')
 
     def run(self):
+        model = self._model
+        artificial_cols = model.get_artificial_cols()
+        if np.any(model.x[artificial_cols] > model.SOLVER_PARAM.PIVOT_TOL):
+            self.run_phase_one(artificial_cols)
+        if self.status != AlgorithmStatus.INFEASIBLE:
+            model.ub[artificial_cols] = 0.0
+            self._c = model.c
+            self._phase = 2
+            self._is_terminated = False
+            while not self._is_terminated:
+                self.iterate()
+        self.update_obj_value()
+
+    def run_phase_one(self, artificial_cols):
+        model = self._model
+        self._c = np.zeros(model.A.shape[1])
+        self._c[artificial_cols] = 1.0
+        self._phase = 1
         while not self._is_terminated:
             self.iterate()
-        self.prepare_and_print_result()
+        if self._c.dot(model.x) > model.SOLVER_PARAM.FEASIBILITY_TOL:
+            self.status = AlgorithmStatus.INFEASIBLE
+        else:
+            self.drive_out_artificials(artificial_cols)
+
+    def drive_out_artificials(self, artificial_cols):
+        model = self._model
+        is_artificial = np.zeros(model.A.shape[1], dtype=bool)
+        is_artificial[artificial_cols] = True
+        for k in np.flatnonzero(is_artificial[model.basis]):
+            alpha_row = self.get_pivot_row(k)
+            alpha_row[is_artificial | (model.var_status == BasisStatus.BASIC)] = 0.0
+            entering_var = int(np.argmax(np.abs(alpha_row)))
+            if abs(alpha_row[entering_var]) > model.SOLVER_PARAM.DRIVE_OUT_TOL:
+                y_k = self._factor.ftran(get_column(model.A, entering_var))
+                self._pricing.update(entering_var, model.basis[k], k, y_k)
+                self.update_basis(k, y_k, entering_var, 1.0, 0.0, True)
 
     def iterate(self):
-        c_b = get_c_b(self._model.basis)
-        w = c_b.dot(self._E)
-        z_c = {}
-        for var in [v for v in self._model.vars if not v.in_basis]:
-            z_c[var] = w.dot(self._model.A[var]) - var.coeff_c
-        entering_var = max(z_c, key=z_c.get)
-        if z_c[entering_var] > 0:
-            u = self._model.A[entering_var]  # entering variable column
-            y_k = self._E.dot(u)
-            if np.all(y_k <= 0):
-                self._model.result.status = AlgorithmStatus.UNBOUNDED
+        model = self._model
+        w = self._factor.btran(self._c[model.basis])
+        entering_var = self._pricing.select_entering(w)
+        if entering_var >= 0:
+            u = get_column(model.A, entering_var)  # entering variable column
+            # the entering variable increases if its reduced cost is negative
+            direction = 1.0 if self._c[entering_var] - u.dot(w) < 0.0 else -1.0
+            y_k = self._factor.ftran(u)
+            k, theta = self.ratio_test(entering_var, direction, y_k)
+            if theta == np.inf:
+                self.status = AlgorithmStatus.UNBOUNDED
                 self._is_terminated = True
                 return
-            rates = {}
-            for i in range(len(y_k)):
-                if y_k[i] > 0:
-                    rates[i] = self._model.basis[i].value / y_k[i]
-            k = min(rates, key=rates.get)    # leaving variable index
-            self.update_basis(k, y_k, entering_var)
+            if k < 0:
+                self.flip_bound(entering_var, direction, theta, y_k)
+                leaving_var = -1
+            else:
+                leaving_var = model.basis[k]
+                self._pricing.update(entering_var, leaving_var, k, y_k)
+                self.update_basis(k, y_k, entering_var, direction, theta,
+                                  direction * y_k[k] > 0.0)
             self.update_obj_value()
+            self.n_iterations += 1
+            if self._statistics is not None or self._callback is not None:
+                self.record_iteration(SolverParam.Algorithm.PRIMAL_SIMPLEX, entering_var,
+                                      leaving_var, theta,
+                                      leaving_var >= 0 and theta <= model.SOLVER_PARAM.PIVOT_TOL)
         else:
             self._is_terminated = True
             self.check_status()
 
-    def update_basis(self, k, y_k, entering_var):
+    def ratio_test(self, entering_var, direction, y_k):
+        """Returns the basis position of the leaving variable, -1 for a bound flip, and the step."""
+        model = self._model
+        pivot_tol = model.SOLVER_PARAM.PIVOT_TOL
+        # basic variables move by -direction * y_k per unit step
+        delta = -direction * y_k
+        x_b = model.x[model.basis]
+        lb_b = model.lb[model.basis]
+        ub_b = model.ub[model.basis]
+        rates = np.full(model.n_rows, np.inf)
+        decreasing = delta < -pivot_tol
+        increasing = delta > pivot_tol
+        rates[decreasing] = (x_b[decreasing] - lb_b[decreasing]) / -delta[decreasing]
+        rates[increasing] = (ub_b[increasing] - x_b[increasing]) / delta[increasing]
+        np.maximum(rates, 0.0, out=rates)
+        theta_flip = model.ub[entering_var] - model.lb[entering_var]
+        theta = rates.min() if model.n_rows > 0 else np.inf
+        if theta_flip <= theta:
+            return -1, theta_flip
+        # among the ties of the ratio test, the largest pivot leaves
+        ties = np.flatnonzero(rates <= theta + pivot_tol)
+        k = ties[np.argmax(np.abs(y_k[ties]))]
+        return k, rates[k]
+
+    def record_iteration(self, algorithm, entering_var, leaving_var, step, is_degenerate):
+        statistics = self._statistics
+        if statistics is not None:
+            statistics.counters['iterations'] += 1
+            if leaving_var < 0:
+                statistics.counters['bound_flips'] += 1
+            elif is_degenerate:
+                statistics.counters['degenerate_pivots'] += 1
+        if self._callback is not None:
+            self._callback(IterationEvent(algorithm, self._phase, self.n_iterations,
+                                          float(self._model.obj.value),
+                                          self.get_sum_infeasibility(),
+                                          int(entering_var), int(leaving_var), float(step),
+                                          bool(is_degenerate)))
+
+    def get_sum_infeasibility(self):
+        # the phase I objective is the sum of the artificials
+        if self._phase == 1:
+            return float(self._c.dot(self._model.x))
+        return 0.0
+
+    def get_infeasibility(self, w, cols=None):
+        model = self._model
+        if cols is None:
+            d = self._c - model.A.T.dot(w)
+            status = model.var_status
+            is_fixed = model.lb == model.ub
+        else:
+            d = self._c[cols] - model.A[:, cols].T.dot(w)
+            status = model.var_status[cols]
+            is_fixed = model.lb[cols] == model.ub[cols]
+        infeasibility = np.zeros(len(d))
+        at_lower = status == BasisStatus.AT_LOWER
+        at_upper = status == BasisStatus.AT_UPPER
+        free = status == BasisStatus.FREE
+        infeasibility[at_lower] = -d[at_lower]
+        infeasibility[at_upper] = d[at_upper]
+        infeasibility[free] = np.abs(d[free])
+        infeasibility[is_fixed] = 0.0
+        infeasibility[infeasibility <= model.SOLVER_PARAM.PIVOT_TOL] = 0.0
+        return infeasibility
+
+    def get_pivot_row(self, k):
+        e_k = np.zeros(self._model.n_rows)
+        e_k[k] = 1.0
+        return self._model.A.T.dot(self._factor.btran(e_k))
+
+    def flip_bound(self, entering_var, direction, theta, y_k):
+        model = self._model
+        model.x[model.basis] -= direction * theta * y_k
+        if direction > 0.0:
+            model.x[entering_var] = model.ub[entering_var]
+            model.var_status[entering_var] = BasisStatus.AT_UPPER
+        else:
+            model.x[entering_var] = model.lb[entering_var]
+            model.var_status[entering_var] = BasisStatus.AT_LOWER
+
+    def update_basis(self, k, y_k, entering_var, direction, theta, to_lower):
+        model = self._model
+        x_b = model.x[model.basis]
         # update leaving variable
-        leaving_var = self._model.basis[k]
-        leaving_var.in_basis = False
-        leaving_var.value = 0.0
+        leaving_var = model.basis[k]
+        if to_lower:
+            model.x[leaving_var] = model.lb[leaving_var]
+            model.var_status[leaving_var] = BasisStatus.AT_LOWER
+        else:
+            model.x[leaving_var] = model.ub[leaving_var]
+            model.var_status[leaving_var] = BasisStatus.AT_UPPER
         # update entering variable
-        entering_var.in_basis = True
-        # update basis matrix
-        self._model.basis = [entering_var if x == leaving_var
-                             else x for x in self._model.basis]
-        # update E
-        E = np.identity(self._model.n_rows)
-        rep = y_k * (-1 / y_k[k])
-        E[:, k] = rep[:, 0]
-        E[k, k] = 1 / y_k[k]
-        self._E = E.dot(self._E)
+        x_entering = model.x[entering_var] + direction * theta
+        model.var_status[entering_var] = BasisStatus.BASIC
+        model.basis[k] = entering_var
+        # update factorization
+        if self._factor.needs_refactor:
+            self._factor.factorize(model.get_basis_matrix())
+            x_b = self._factor.ftran(model.get_reduced_rhs())
+        else:
+            self._factor.update(k, y_k)
+            x_b -= direction * theta * y_k
+            x_b[k] = x_entering
         # update variable values in the basis
-        B_inv_b = self._E.dot(self._model.b)
-        for v in range(len(self._model.basis)):
-            self._model.basis[v].value = B_inv_b[v].item()
+        model.x[model.basis] = x_b
 
     def update_obj_value(self):
-        obj_val = 0.0
-        for var in self._model.vars:
-            obj_val += var.coeff_c * var.value
-        self._model.obj.value = obj_val
+        self._model.obj.value = self._model.c.dot(self._model.x)
 
     def check_status(self):
-        for var in [v for v in self._model.vars
-                    if v.var_name_type == VarNameType.ARTIFICIAL]:
-            if var.value > 0.0:
-                self._model.result.status = AlgorithmStatus.INFEASIBLE
-                return
         if self._is_terminated:
-            self._model.result.status = AlgorithmStatus.OPTIMAL
+            self.status = AlgorithmStatus.OPTIMAL
         else:
-            self._model.result.status = AlgorithmStatus.FEASIBLE
+            self.status = AlgorithmStatus.FEASIBLE
+
+
+class DualSimplexSolver(SimplexSolver):
+    """
+    This uses bounded dual Simplex algorithm. It starts from the current basis and factorization
+    of the model, which makes it suitable for reoptimization after bounds are changed, and it
+    can be used on its own for primal degenerate problems.
+
+    Nonbasic boxed variables are moved to the bound that makes their reduced cost dual feasible.
+    Any remaining dual infeasibility is removed by shifting the costs of those columns; once the
+    shifted problem is primal feasible, the original costs are restored and primal Simplex
+    iterations finish the solution from that basis.
+
+    Since the objective never decreases along dual Simplex iterations on the original costs,
+    the solver stops with CUTOFF status as soon as it exceeds the cutoff value.
+
+    Parameters
+    ==========
+    model       : Model class
+    cutoff      : double objective value above which the LP problem is of no interest
+
+    Properties
+    ==========
+    _dual_pricing  : dual pricing strategy selected by SolverParam.PRICING
+    _is_shifted    : bool whether or not the costs are shifted
+    """
+    def __init__(self, model, cutoff=np.inf):
+        super().__init__(model)
+        self._dual_pricing = create_dual_pricing(self, model)
+        self._is_shifted = False
+        self._cutoff = cutoff
+        if self._statistics is not None:
+            self._statistics.instrument_pricing(self._dual_pricing, 'select_leaving')
+            self.dual_ratio_test = self._statistics.timed(self.dual_ratio_test, 'ratio_test')
+
+    def run(self):
+        model = self._model
+        self.make_dual_feasible()
+        while not self._is_terminated:
+            self.iterate_dual()
+        if self._is_shifted and self.status == AlgorithmStatus.OPTIMAL:
+            self._c = model.c
+            self._is_terminated = False
+            while not self._is_terminated:
+                self.iterate()
+        self.update_obj_value()
+
+    def make_dual_feasible(self):
+        model = self._model
+        tol = model.SOLVER_PARAM.PIVOT_TOL
+        w = self._factor.btran(self._c[model.basis])
+        d = self._c - model.A.T.dot(w)
+        is_nonbasic = model.var_status != BasisStatus.BASIC
+        has_lb = np.isfinite(model.lb)
+        has_ub = np.isfinite(model.ub)
+        to_lower = is_nonbasic & has_lb & ((d >= 0.0) | ~has_ub)
+        to_upper = is_nonbasic & has_ub & ~to_lower
+        model.var_status[to_lower] = BasisStatus.AT_LOWER
+        model.var_status[to_upper] = BasisStatus.AT_UPPER
+        model.var_status[is_nonbasic & ~has_lb & ~has_ub] = BasisStatus.FREE
+        model.x[to_lower] = model.lb[to_lower]
+        model.x[to_upper] = model.ub[to_upper]
+        model.x[model.var_status == BasisStatus.FREE] = 0.0
+        model.x[model.basis] = self._factor.ftran(model.get_reduced_rhs())
+        # shift the costs of the columns that are still dual infeasible
+        is_fixed = model.lb == model.ub
+        is_infeasible = ~is_fixed & (
+            ((model.var_status == BasisStatus.AT_LOWER) & (d < -tol)) |
+            ((model.var_status == BasisStatus.AT_UPPER) & (d > tol)) |
+            ((model.var_status == BasisStatus.FREE) & (np.abs(d) > tol)))
+        if np.any(is_infeasible):
+            self._c = self._c.copy()
+            self._c[is_infeasible] -= d[is_infeasible]
+            self._is_shifted = True
+
+    def get_primal_infeasibility(self):
+        model = self._model
+        x_b = model.x[model.basis]
+        infeasibility = np.maximum(model.lb[model.basis] - x_b, x_b - model.ub[model.basis])
+        infeasibility[infeasibility <= model.SOLVER_PARAM.FEASIBILITY_TOL] = 0.0
+        return infeasibility
+
+    def iterate_dual(self):
+        model = self._model
+        k = -1
+        if model.n_rows > 0:
+            k = self._dual_pricing.select_leaving(self.get_primal_infeasibility())
+        if k < 0:
+            self._is_terminated = True
+            self.check_status()
+            return
+        leaving_var = model.basis[k]
+        to_lower = model.x[leaving_var] < model.lb[leaving_var]
+        # the leaving variable increases to its lower bound or decreases to its upper bound
+        sign = 1.0 if to_lower else -1.0
+        e_k = np.zeros(model.n_rows)
+        e_k[k] = 1.0
+        rho = self._factor.btran(e_k)
+        alpha_row = model.A.T.dot(rho)
+        w = self._factor.btran(self._c[model.basis])
+        d = self._c - model.A.T.dot(w)
+        entering_var, dual_step = self.dual_ratio_test(sign, alpha_row, d)
+        if entering_var < 0:
+            self.status = AlgorithmStatus.INFEASIBLE
+            self._is_terminated = True
+            return
+        y_k = self._factor.ftran(get_column(model.A, entering_var))
+        bound = model.lb[leaving_var] if to_lower else model.ub[leaving_var]
+        step = (model.x[leaving_var] - bound) / y_k[k]
+        self._dual_pricing.update(entering_var, k, y_k, rho)
+        self.update_basis(k, y_k, entering_var, np.sign(step), abs(step), to_lower)
+        self.update_obj_value()
+        self.n_iterations += 1
+        if self._statistics is not None or self._callback is not None:
+            self.record_iteration(SolverParam.Algorithm.DUAL_SIMPLEX, entering_var, leaving_var,
+                                  abs(step), dual_step <= model.SOLVER_PARAM.PIVOT_TOL)
+        if not self._is_shifted and model.obj.value > self._cutoff:
+            self.status = AlgorithmStatus.CUTOFF
+            self._is_terminated = True
+
+    def dual_ratio_test(self, sign, alpha_row, d):
+        """Returns the entering variable, or -1 if the dual is unbounded, and the dual step."""
+        model = self._model
+        pivot_tol = model.SOLVER_PARAM.PIVOT_TOL
+        status = model.var_status
+        is_candidate = (model.lb != model.ub) & (
+            ((status == BasisStatus.AT_LOWER) & (sign * alpha_row < -pivot_tol)) |
+            ((status == BasisStatus.AT_UPPER) & (sign * alpha_row > pivot_tol)) |
+            ((status == BasisStatus.FREE) & (np.abs(alpha_row) > pivot_tol)))
+        candidates = np.flatnonzero(is_candidate)
+        if len(candidates) == 0:
+            return -1, np.inf
+        rates = np.abs(d[candidates]) / np.abs(alpha_row[candidates])
+        # among the ties of the ratio test, the largest pivot enters
+        dual_step = rates.min()
+        ties = candidates[rates <= dual_step + pivot_tol]
+        return int(ties[np.argmax(np.abs(alpha_row[ties]))]), dual_step
 
-    def prepare_and_print_result(self):
-        solution = {}
-        for var in self._model.basis:
-            if var.var_name_type == VarNameType.PRIMAL:
-                solution[var.name] = round(var.value, 3)
-        self._model.result.solution = solution
-        if self._model.obj.obj_type == ObjectiveType.MIN:
-            self._model.result.obj_val = round(self._model.obj.value, 3)
-        elif self._model.obj.obj_type == ObjectiveType.MAX:
-            self._model.result.obj_val = -round(self._model.obj.value, 3)
-        print(json.dumps(self._model.result.__dict__))
+    def get_sum_infeasibility(self):
+        return float(self.get_primal_infeasibility().sum())
 
 
 class MIPSolver:
     """
     This uses Branch & Bound algorithm to solve the MIP problem.
 
+    A node keeps only the bound change of its branching relative to its parent and the final
+    basis status of its parent, which is shared with its sibling. The bounds of a node are
+    rebuilt from the root bounds along its path to the root, and its LP is warm started from
+    the parent basis with the dual Simplex algorithm.
+
+    Open nodes are kept in a NodeQueue ordered by SolverParam.BRANCHING_ALGORITHM. Best
+    estimate selection uses pseudocosts, the average objective degradation per unit change of
+    each integer column observed so far in the down and up branches.
+
+    If SolverParam.CUTS, the root LP is strengthened before branching by rounds of Gomory
+    mixed-integer and knapsack cover cuts, each reoptimized by the dual Simplex algorithm,
+    until no cut is found or the bound stalls. The cuts left inactive at the end are removed,
+    the others stay in the LP of every node, and all are removed from the constraints of the
+    model once the tree is solved.
+
+    If SolverParam.HEURISTICS, primal heuristics look for incumbents from the LP solutions of
+    the root and, at their own frequencies, of the nodes solved in this process: rounding,
+    fractional diving, and the feasibility pump while there is no incumbent.
+
     Parameters
     ==========
     model           : Model class
+    algorithm       : SolverParam.Algorithm of the root LP, or None for SolverParam.ALGORITHM
 
     Properties
     ==========
-    _tree          : list of nodes in the solution tree; index 0 is the root node
-    _n_nodes       : int number of nodes in the solution tree
-    _int_vars      : list of integer and binary variables in the model
+    _tree          : NodeQueue class of open nodes in the solution tree
+    _n_nodes       : int number of nodes solved in the solution tree
+    _n_iterations  : int number of simplex iterations over all nodes
+    _int_cols      : numpy array of column indices of integer and binary variables
     _root_node     : Node class of root
+    _root_status   : AlgorithmStatus of the LP relaxation at the root
+    _root_lb       : numpy array of lower bounds of the columns at the root
+    _root_ub       : numpy array of upper bounds of the columns at the root
+    _incumbent     : numpy array of column values of the best integer solution found
+    _incumbent_obj : double objective value of the incumbent
+    _pseudocosts   : numpy array of summed degradations per unit of the integer columns;
+                     row 0 is for the down branches and row 1 for the up branches
+    _pseudo_counts : numpy array of number of degradations summed in _pseudocosts
     _mip_gap       : double current mip_gap in the tree
     _solution_time : double total time elapsed in seconds since the solve method called
+    _shared_cutoff : multiprocessing Value of the incumbent cutoff shared with the workers
+    _cut_pool      : CutPool class of the cuts added at the root, or None
+    _heuristics    : list of PrimalHeuristic classes run on the optimal node LPs, or None
     """
 
-    def __init__(self, model):
+    # bound on the number of rounds of cuts at the root
+    MAX_CUT_ROUNDS = 10
+    # smallest relative improvement of the root bound for another round of cuts
+    MIN_CUT_IMPROVEMENT = 1e-4
+
+    def __init__(self, model, algorithm=None):
         self._model = model
-        self._tree = []
+        self._algorithm = algorithm if algorithm is not None else model.SOLVER_PARAM.ALGORITHM
+        self._tree = NodeQueue(model.SOLVER_PARAM.BRANCHING_ALGORITHM)
         self._n_nodes = 0
-        self._int_vars = [v for v in model.vars
-                          if (v.var_type == VarType.BINARY) or
-                          (v.var_type == VarType.INTEGER)]
-        self._root_node = Node(model)
+        self._n_iterations = 0
+        var_types = model.var_types.values
+        self._int_cols = np.flatnonzero((var_types == VarType.BINARY) |
+                                        (var_types == VarType.INTEGER))
+        self._root_node = Node()
+        self._root_status = AlgorithmStatus.NONE
+        self._root_lb = None
+        self._root_ub = None
+        self._incumbent = None
+        self._incumbent_obj = np.inf
+        self._pseudocosts = np.zeros((2, model.n_cols))
+        self._pseudo_counts = np.zeros((2, model.n_cols))
         self._mip_gap = 100.0
         self._solution_time = 0
+        self._shared_cutoff = None
+        self._cut_pool = None
+        self._heuristics = None
+        self.round_bounds()
+
+    def round_bounds(self):
+        model = self._model
+        binary_cols = np.flatnonzero(model.var_types.values == VarType.BINARY)
+        model.lb[binary_cols] = np.maximum(model.lb[binary_cols], 0.0)
+        model.ub[binary_cols] = np.minimum(model.ub[binary_cols], 1.0)
+        tol = model.SOLVER_PARAM.INTEGRALITY_TOL
+        model.lb[self._int_cols] = np.ceil(model.lb[self._int_cols] - tol)
+        model.ub[self._int_cols] = np.floor(model.ub[self._int_cols] + tol)
+        # an integer column without an integer value between its bounds makes the root infeasible
+        if np.any(model.lb[self._int_cols] > model.ub[self._int_cols]):
+            self._root_status = AlgorithmStatus.INFEASIBLE
 
     def run(self):
-        current_node = self._root_node
-        self._tree.append(current_node)
-        while not self.is_terminated():
-            simplex_solver = SimplexSolver(current_node.model)
+        if self._root_status == AlgorithmStatus.INFEASIBLE:
+            self.prepare_result()
+            return
+        self._tree.push(self._root_node)
+        self.solve_node(self._tree.pop())
+        self.update_mip_gap()
+        if self._model.SOLVER_PARAM.THREADS > 1 and not self.is_terminated():
+            self.run_parallel()
+        else:
+            while not self.is_terminated():
+                self.solve_node(self._tree.pop())
+                self.update_mip_gap()
+        if self._cut_pool is not None:
+            self._cut_pool.clear()
+        self.prepare_result()
+
+    def run_parallel(self):
+        """
+        Solves the open nodes in a process pool. Workers receive the bound changes of a node from
+        the root and its warm start basis, and read the cutoff of the incumbent from shared memory
+        to skip or stop nodes that cannot improve it. In deterministic mode nodes are solved in
+        rounds of SolverParam.THREADS nodes whose results are processed in selection order.
+        """
+        model = self._model
+        threads = model.SOLVER_PARAM.THREADS
+        context = multiprocessing.get_context()
+        self._shared_cutoff = context.Value('d', self.get_cutoff())
+        worker_model = copy.copy(model)
+        worker_model.vars = []
+        worker_model.consts = []
+        worker_model.obj = Objective(obj_type=model.obj.obj_type)
+        worker_model.result = Result()
+        worker_model.factor = None
+        # statistics and callbacks are kept in this process
+        worker_model.statistics = None
+        worker_model.callback = None
+        initargs = (worker_model, vars(model.SOLVER_PARAM), self._root_lb, self._root_ub,
+                    self._shared_cutoff)
+        with context.Pool(threads, initializer=init_worker, initargs=initargs) as pool:
+            if model.SOLVER_PARAM.DETERMINISTIC:
+                while not self.is_terminated():
+                    batch = [self._tree.pop() for _ in range(min(threads, len(self._tree)))]
+                    tasks = [self.get_task(i, node) for i, node in enumerate(batch)]
+                    for node, result in zip(batch, pool.map(solve_node_task, tasks)):
+                        self.process_node(node, *result[1:])
+                    self.update_mip_gap()
+            else:
+                results = queue.Queue()
+                pending = {}
+                n_tasks = 0
+                while True:
+                    while len(pending) < threads and not self.is_terminated():
+                        node = self._tree.pop()
+                        pending[n_tasks] = node
+                        pool.apply_async(solve_node_task, (self.get_task(n_tasks, node),),
+                                         callback=results.put, error_callback=results.put)
+                        n_tasks += 1
+                    if not pending:
+                        break
+                    result = results.get()
+                    if isinstance(result, BaseException):
+                        raise result
+                    self.process_node(pending.pop(result[0]), *result[1:])
+                    self.update_mip_gap()
+
+    def get_task(self, task_id, node):
+        task = (task_id, get_bound_changes(node), node.warm_start, node.lp_bound)
+        node.warm_start = None
+        return task
+
+    def solve_node(self, node):
+        model = self._model
+        if node is self._root_node:
+            if self._algorithm == SolverParam.Algorithm.DUAL_SIMPLEX:
+                simplex_solver = DualSimplexSolver(model)
+            else:
+                simplex_solver = SimplexSolver(model)
             simplex_solver.run()
-            self._root_node.is_pruned = True
-            # TODO: handle pruning and branching
-            # if self.is_pruned():
-            #   do stuff
-            # else:
-            #   create 2 deep copy of model and add cuts
-            # select current_node
+            status = simplex_solver.status
+            n_iterations = simplex_solver.n_iterations
+            if status == AlgorithmStatus.OPTIMAL and model.is_mip and model.SOLVER_PARAM.CUTS:
+                status, n_cut_iterations = self.add_cuts()
+                n_iterations += n_cut_iterations
+            self._root_status = status
+            self._root_lb = model.lb.copy()
+            self._root_ub = model.ub.copy()
+            if status == AlgorithmStatus.OPTIMAL and model.is_mip and \
+                    model.SOLVER_PARAM.HEURISTICS:
+                self._heuristics = create_heuristics(self, model, self._int_cols,
+                                                     self._root_lb, self._root_ub)
+                self.run_heuristics()
+        elif self.is_pruned(node.lp_bound):
+            node.is_pruned = True
+            node.warm_start = None
+            return
+        else:
+            simplex_solver = solve_from_basis(model, self._root_lb, self._root_ub,
+                                              get_bound_changes(node), node.warm_start,
+                                              self.get_cutoff())
+            status = simplex_solver.status
+            n_iterations = simplex_solver.n_iterations
+        node.warm_start = None
+        obj_val = model.obj.value
+        self.process_node(node, status, obj_val, model.x, model.var_status, n_iterations)
+        if node is not self._root_node and self._heuristics is not None and \
+                status == AlgorithmStatus.OPTIMAL and not self.is_pruned(obj_val):
+            self.run_heuristics()
+
+    def run_heuristics(self):
+        """Runs the heuristics due at this node and keeps their solutions as incumbents."""
+        for heuristic in self._heuristics:
+            if not heuristic.is_due(self._n_nodes):
+                continue
+            solution = heuristic.run(self.get_cutoff())
+            self._n_iterations += heuristic.n_iterations
+            if solution is not None and solution[1] < self._incumbent_obj:
+                self.update_incumbent(*solution)
+
+    def reoptimize(self, cutoff=np.inf, is_dual=True):
+        """Reoptimizes the LP of the model from the current basis and returns the Simplex solver."""
+        if is_dual:
+            simplex_solver = DualSimplexSolver(self._model, cutoff)
+        else:
+            simplex_solver = SimplexSolver(self._model)
+        simplex_solver.run()
+        return simplex_solver
+
+    def add_cuts(self):
+        """
+        Adds rounds of cuts to the optimal root LP and reoptimizes it, and returns the status and
+        the number of iterations of the last LP.
+        """
+        model = self._model
+        self._cut_pool = CutPool(model)
+        separators = (GomorySeparator(model, self._int_cols),
+                      KnapsackCoverSeparator(model, self._int_cols))
+        status = AlgorithmStatus.OPTIMAL
+        n_iterations = 0
+        obj_val = model.obj.value
+        for _ in range(self.MAX_CUT_ROUNDS):
+            cuts = [separator.separate() for separator in separators]
+            n_added = self._cut_pool.add(vstack([A for A, _ in cuts], format='csr'),
+                                         np.concatenate([rhs for _, rhs in cuts]))
+            if n_added == 0:
+                break
+            if model.statistics is not None:
+                model.statistics.counters['cuts'] += n_added
+            simplex_solver = self.reoptimize()
+            status = simplex_solver.status
+            n_iterations += simplex_solver.n_iterations
+            if status != AlgorithmStatus.OPTIMAL:
+                break
+            self._cut_pool.age()
+            self._cut_pool.purge(CutPool.MAX_AGE)
+            values = model.x[self._int_cols]
+            if model.obj.value - obj_val <= self.MIN_CUT_IMPROVEMENT * max(1.0, abs(obj_val)) \
+                    or np.all(np.abs(values - np.round(values)) <=
+                              model.SOLVER_PARAM.INTEGRALITY_TOL):
+                break
+            obj_val = model.obj.value
+        if status == AlgorithmStatus.OPTIMAL:
+            self._cut_pool.age()
+            self._cut_pool.purge(1)
+        return status, n_iterations
+
+    def process_node(self, node, status, obj_val, x, var_status, n_iterations):
+        model = self._model
+        node.is_pruned = True
+        self._n_iterations += n_iterations
+        if status == AlgorithmStatus.CUTOFF and n_iterations == 0:
+            return
+        self._n_nodes += 1
+        if status != AlgorithmStatus.OPTIMAL:
+            return
+        if node.parent is not None:
+            self.update_pseudocosts(node, obj_val)
+        if self.is_pruned(obj_val):
+            return
+        values = x[self._int_cols]
+        fractionality = np.abs(values - np.round(values))
+        if len(values) == 0 or \
+                fractionality.max() <= model.SOLVER_PARAM.INTEGRALITY_TOL:
+            self.update_incumbent(x.copy(), obj_val)
+            return
+        self.branch(node, self._int_cols[np.argmax(fractionality)], obj_val, x, var_status)
+
+    def update_incumbent(self, x, obj_val):
+        self._incumbent = x
+        self._incumbent_obj = obj_val
+        cutoff = self.get_cutoff()
+        self._tree.prune(cutoff)
+        if self._shared_cutoff is not None:
+            self._shared_cutoff.value = cutoff
+
+    def get_cutoff(self):
+        if self._incumbent is None:
+            return np.inf
+        gap = max(self._model.SOLVER_PARAM.FEASIBILITY_TOL,
+                  self._model.SOLVER_PARAM.MIP_GAP * abs(self._incumbent_obj))
+        return self._incumbent_obj - gap
+
+    def update_pseudocosts(self, node, obj_val):
+        # the up child is the only one whose lower bound is above the branched value
+        if node.lb > node.value:
+            direction, distance = 1, node.lb - node.value
+        else:
+            direction, distance = 0, node.value - node.ub
+        if distance > 0.0:
+            self._pseudocosts[direction, node.col] += (obj_val - node.lp_bound) / distance
+            self._pseudo_counts[direction, node.col] += 1
+
+    def get_estimates(self, lp_bound, col, x):
+        """Returns the best estimates of the down and up children of a node branched on col."""
+        counts = self._pseudo_counts[:, self._int_cols]
+        costs = self._pseudocosts[:, self._int_cols] / np.maximum(counts, 1)
+        known = counts > 0
+        default = costs[known].mean() if np.any(known) else 1.0
+        costs[~known] = default
+        values = x[self._int_cols]
+        down = values - np.floor(values)
+        up = np.ceil(values) - values
+        degradation = np.minimum(costs[0] * down, costs[1] * up)
+        total = lp_bound + degradation.sum()
+        k = np.flatnonzero(self._int_cols == col)[0]
+        base = total - degradation[k]
+        return base + costs[0, k] * down[k], base + costs[1, k] * up[k]
+
+    def get_col_bounds(self, node, col):
+        while node.parent is not None:
+            if node.col == col:
+                return node.lb, node.ub
+            node = node.parent
+        return self._root_lb[col], self._root_ub[col]
+
+    def branch(self, node, col, lp_bound, x, var_status):
+        value = x[col]
+        lb, ub = self.get_col_bounds(node, col)
+        warm_start = var_status.copy()
+        down_estimate, up_estimate = self.get_estimates(lp_bound, col, x)
+        down = Node(node, col, lb, math.floor(value), value,
+                    warm_start, lp_bound, down_estimate)
+        up = Node(node, col, math.ceil(value), ub, value,
+                  warm_start, lp_bound, up_estimate)
+        # the down branch is explored first by DFS
+        self._tree.push(up)
+        self._tree.push(down)
+
+    def is_pruned(self, lp_bound):
+        return lp_bound >= self.get_cutoff()
+
+    def update_mip_gap(self):
+        if self._incumbent is None:
+            return
+        if len(self._tree) == 0:
+            self._mip_gap = 0.0
+            return
+        best_bound = self._tree.get_best_bound()
+        self._mip_gap = max(0.0, (self._incumbent_obj - best_bound) /
+                            max(abs(self._incumbent_obj), 1e-10))
 
     def is_terminated(self):
         self._solution_time = time.perf_counter() - self._model.start_time
@@ -172,9 +801,78 @@ class MIPSolver:
         return (not any_nodes_to_branch) or is_mip_gap_reached or is_time_limit_reached
 
     def any_nodes_to_branch(self):
-        nodes_to_branch = [n for n in self._tree if not n.is_pruned]
-        if len(nodes_to_branch) == 0:
-            return False
-        return True
+        return len(self._tree) > 0
+
+    def get_status(self):
+        if self._root_status in (AlgorithmStatus.INFEASIBLE, AlgorithmStatus.UNBOUNDED):
+            return self._root_status
+        if self._incumbent is None:
+            if self.any_nodes_to_branch():
+                return AlgorithmStatus.NONE
+            return AlgorithmStatus.INFEASIBLE
+        if self._mip_gap <= self._model.SOLVER_PARAM.MIP_GAP:
+            return AlgorithmStatus.OPTIMAL
+        return AlgorithmStatus.FEASIBLE
+
+    def prepare_result(self):
+        model = self._model
+        result = model.result
+        result.status = self.get_status()
+        result.iterations += self._n_iterations
+        result.nodes += self._n_nodes
+        if model.statistics is not None:
+            model.statistics.counters['nodes'] += self._n_nodes
+        result.mip_gap = self._mip_gap if self._incumbent is not None else None
+        if self._incumbent is not None:
+            model.x = self._incumbent
+            model.obj.value = self._incumbent_obj
+        if not model.is_mip and result.status == AlgorithmStatus.OPTIMAL:
+            model.update_duals()
+        model.prepare_result()
+
+
+_worker = {}
+
+
+def get_bound_changes(node):
+    bound_changes = []
+    while node.parent is not None:
+        bound_changes.append((node.col, node.lb, node.ub))
+        node = node.parent
+    bound_changes.reverse()
+    return bound_changes
+
+
+def solve_from_basis(model, root_lb, root_ub, bound_changes, warm_start, cutoff=np.inf):
+    model.lb[:] = root_lb
+    model.ub[:] = root_ub
+    for col, lb, ub in bound_changes:
+        model.lb[col] = lb
+        model.ub[col] = ub
+    model.var_status = warm_start.copy()
+    model.basis = np.flatnonzero(model.var_status == BasisStatus.BASIC)
+    model.factor.factorize(model.get_basis_matrix())
+    simplex_solver = DualSimplexSolver(model, cutoff)
+    simplex_solver.run()
+    return simplex_solver
+
+
+def init_worker(model, solver_param, root_lb, root_ub, shared_cutoff):
+    model.SOLVER_PARAM.__dict__.update(solver_param)
+    model.factor = BasisFactorization(model.SOLVER_PARAM.REFACTOR_FREQUENCY)
+    _worker['model'] = model
+    _worker['root_lb'] = root_lb
+    _worker['root_ub'] = root_ub
+    _worker['cutoff'] = shared_cutoff
 
 
+def solve_node_task(task):
+    task_id, bound_changes, warm_start, lp_bound = task
+    model = _worker['model']
+    cutoff = _worker['cutoff'].value
+    if lp_bound >= cutoff:
+        return task_id, AlgorithmStatus.CUTOFF, lp_bound, None, None, 0
+    simplex_solver = solve_from_basis(model, _worker['root_lb'], _worker['root_ub'],
+                                      bound_changes, warm_start, cutoff)
+    return (task_id, simplex_solver.status, model.obj.value,
+            model.x, model.var_status, simplex_solver.n_iterations)
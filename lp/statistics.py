@@ -0,0 +1,57 @@
+import time
+
+TIMERS = ('pricing', 'ftran', 'btran', 'ratio_test', 'factorization', 'presolve', 'total')
+COUNTERS = ('iterations', 'degenerate_pivots', 'bound_flips', 'factorizations', 'nodes',
+            'cuts')
+
+
+class Statistics:
+    """
+    This keeps the counters and cumulative timers of a solve. Timing is added by replacing
+    methods of the solver objects with timed wrappers when statistics are enabled, so the
+    solver runs its plain methods when they are not. Timers are exclusive; the time of a
+    timed call made inside another one, such as an FTRAN inside a pricing update, is counted
+    only for the inner one.
+
+    Properties
+    ==========
+    timers      : dict of seconds spent by pricing, ftran, btran, ratio_test, factorization,
+                  presolve, and the total solve
+    counters    : dict of numbers of iterations, degenerate pivots, bound flips,
+                  factorizations, branch and bound nodes, and cuts added at the root
+    """
+
+    def __init__(self):
+        self.timers = dict.fromkeys(TIMERS, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._inner_time = 0.0
+
+    def timed(self, function, timer):
+        """Returns a wrapper of the function that adds its exclusive time to the timer."""
+        timers = self.timers
+
+        def timed_function(*args, **kwargs):
+            outer_inner_time = self._inner_time
+            self._inner_time = 0.0
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                timers[timer] += elapsed - self._inner_time
+                self._inner_time = outer_inner_time + elapsed
+        return timed_function
+
+    def instrument_factor(self, factor):
+        factor.factorize = self.timed(factor.factorize, 'factorization')
+        factor.ftran = self.timed(factor.ftran, 'ftran')
+        factor.btran = self.timed(factor.btran, 'btran')
+        factor.ftran_many = self.timed(factor.ftran_many, 'ftran')
+        factor.btran_many = self.timed(factor.btran_many, 'btran')
+
+    def instrument_pricing(self, pricing, select):
+        setattr(pricing, select, self.timed(getattr(pricing, select), 'pricing'))
+        pricing.update = self.timed(pricing.update, 'pricing')
+
+    def to_dict(self):
+        return {'timers': dict(self.timers), 'counters': dict(self.counters)}
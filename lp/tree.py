@@ -0,0 +1,89 @@
+import heapq
+
+from lp.entity import SolverParam
+
+
+class NodeQueue:
+    """
+    This keeps the open nodes of the branch and bound tree in a heap ordered by the node
+    selection strategy. The LP bounds of the open nodes are kept in a second heap whose
+    closed entries are discarded lazily, so the global lower bound is read from its top.
+
+    Parameters
+    ==========
+    strategy        : SolverParam.BranchingAlgorithm used to order the open nodes
+
+    Properties
+    ==========
+    _heap           : list heap of (key, sequence, node) of the open nodes
+    _bounds         : list heap of (lp_bound, sequence) of the nodes, including closed ones
+    _open           : set of sequence numbers of the open nodes
+    _seq            : int sequence number of the next node
+    _has_incumbent  : bool whether or not an incumbent is found, which switches HYBRID to best bound
+    """
+
+    def __init__(self, strategy):
+        self._strategy = strategy
+        self._heap = []
+        self._bounds = []
+        self._open = set()
+        self._seq = 0
+        self._has_incumbent = False
+
+    def __len__(self):
+        return len(self._open)
+
+    def push(self, node):
+        seq = self._seq
+        self._seq += 1
+        heapq.heappush(self._heap, (self.get_key(node, seq), seq, node))
+        heapq.heappush(self._bounds, (node.lp_bound, seq))
+        self._open.add(seq)
+
+    def pop(self):
+        _, seq, node = heapq.heappop(self._heap)
+        self._open.discard(seq)
+        return node
+
+    def get_key(self, node, seq):
+        strategy = self._strategy
+        if strategy == SolverParam.BranchingAlgorithm.HYBRID:
+            if not self._has_incumbent:
+                strategy = SolverParam.BranchingAlgorithm.DFS
+            else:
+                strategy = SolverParam.BranchingAlgorithm.BEST_BOUND
+        if strategy == SolverParam.BranchingAlgorithm.BEST_BOUND:
+            return node.lp_bound, -node.depth
+        elif strategy == SolverParam.BranchingAlgorithm.BEST_ESTIMATE:
+            return node.estimate, -node.depth
+        elif strategy == SolverParam.BranchingAlgorithm.BFS:
+            return node.depth, seq
+        # DFS takes the deepest node, and the last pushed one among equally deep nodes
+        return -node.depth, -seq
+
+    def get_best_bound(self):
+        bounds = self._bounds
+        while bounds and bounds[0][1] not in self._open:
+            heapq.heappop(bounds)
+        if bounds:
+            return bounds[0][0]
+        return float('inf')
+
+    def prune(self, cutoff):
+        """Frees the open nodes whose LP bound is at least cutoff and returns how many were pruned."""
+        self._has_incumbent = True
+        kept = []
+        n_pruned = 0
+        for _, seq, node in self._heap:
+            if node.lp_bound >= cutoff:
+                node.is_pruned = True
+                node.warm_start = None
+                self._open.discard(seq)
+                n_pruned += 1
+            else:
+                kept.append((self.get_key(node, seq), seq, node))
+        heapq.heapify(kept)
+        self._heap = kept
+        self._bounds = [(node.lp_bound, seq) for _, seq, node in kept]
+        heapq.heapify(self._bounds)
+        return n_pruned
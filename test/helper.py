@@ -0,0 +1,102 @@
+import collections
+import unittest
+
+import numpy as np
+from scipy.optimize import milp, Bounds, LinearConstraint
+
+from lp.entity import AlgorithmStatus, ObjectiveType, Sense, VarType
+from lp.model import Model
+
+# the data of a minimization problem, with a row of A and a sense per constraint
+Problem = collections.namedtuple('Problem', ('A', 'b', 'senses', 'c', 'lb', 'ub', 'types'))
+
+SENSES = np.array([Sense.LE, Sense.GE, Sense.EQ])
+
+
+def create_lp(seed):
+    """Returns a feasible and bounded LP with mixed senses and bounds."""
+    rng = np.random.default_rng(seed)
+    m, n = rng.integers(4, 12), rng.integers(4, 16)
+    A = rng.integers(-5, 10, size=(m, n)).astype(np.float64)
+    A[rng.random((m, n)) < 0.4] = 0.0
+    lb = rng.integers(-4, 2, size=n).astype(np.float64)
+    ub = lb + rng.integers(0, 8, size=n)
+    # a feasible point gives the right hand sides
+    activity = A.dot(rng.uniform(lb, ub))
+    senses = SENSES[rng.integers(0, 3, size=m)]
+    b = np.round(np.where(senses == Sense.LE, activity + rng.integers(0, 5, size=m),
+                          np.where(senses == Sense.GE, activity - rng.integers(0, 5, size=m),
+                                   activity)), 3)
+    c = rng.integers(-10, 10, size=n).astype(np.float64)
+    return Problem(A, b, senses, c, lb, ub, np.full(n, VarType.CONTINUOUS))
+
+
+def create_mip(seed):
+    """Returns a feasible MIP with knapsack rows over integer and continuous columns."""
+    rng = np.random.default_rng(seed)
+    m, n = rng.integers(3, 7), rng.integers(6, 14)
+    A = rng.integers(1, 20, size=(m, n)).astype(np.float64)
+    A[rng.random((m, n)) < 0.3] = 0.0
+    b = np.floor(A.sum(axis=1) * rng.uniform(0.3, 0.6, size=m))
+    ub = rng.integers(1, 4, size=n).astype(np.float64)
+    types = np.where(rng.random(n) < 0.8, VarType.INTEGER, VarType.CONTINUOUS)
+    c = -rng.integers(1, 30, size=n).astype(np.float64)
+    return Problem(A, b, np.full(m, Sense.LE), c, np.zeros(n), ub, types)
+
+
+def create_scaled_lp(seed):
+    """Returns an LP whose rows and columns are scaled over eight decades."""
+    rng = np.random.default_rng(seed)
+    m, n = rng.integers(10, 30), rng.integers(10, 40)
+    A = rng.uniform(1.0, 10.0, size=(m, n)) * (rng.random((m, n)) < 0.4)
+    b = rng.uniform(10.0, 100.0, size=m)
+    c = -rng.uniform(0.0, 10.0, size=n)
+    row_scale = 10.0 ** rng.uniform(-4.0, 4.0, size=m)
+    col_scale = 10.0 ** rng.uniform(-4.0, 4.0, size=n)
+    return Problem(A * row_scale[:, None] * col_scale, b * row_scale, np.full(m, Sense.LE),
+                   c * col_scale, np.zeros(n), 50.0 / col_scale, np.full(n, VarType.CONTINUOUS))
+
+
+def create_model(problem):
+    model = Model()
+    model.add_vars(len(problem.c), lb=problem.lb, ub=problem.ub, obj=problem.c,
+                   types=problem.types)
+    model.add_constrs(problem.A, problem.senses, problem.b)
+    model.set_objective(None, ObjectiveType.MIN)
+    return model
+
+
+def solve_model(problem):
+    model = create_model(problem)
+    model.solve()
+    return model
+
+
+def solve_highs(problem):
+    """Returns the scipy result of HiGHS for the problem."""
+    lower = np.where(problem.senses == Sense.LE, -np.inf, problem.b)
+    upper = np.where(problem.senses == Sense.GE, np.inf, problem.b)
+    return milp(problem.c, constraints=LinearConstraint(problem.A, lower, upper),
+                bounds=Bounds(problem.lb, problem.ub),
+                integrality=(problem.types != VarType.CONTINUOUS).astype(int))
+
+
+class SolverTestCase(unittest.TestCase):
+    """This checks solutions of the models of problems against HiGHS."""
+
+    TOL = 1e-6
+
+    def assert_optimal(self, model, problem):
+        """Asserts that the values of the model are feasible for the problem and optimal."""
+        expected = solve_highs(problem)
+        self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+        x = model.get_values()
+        obj_val = problem.c.dot(x)
+        self.assertLessEqual(abs(obj_val - expected.fun), self.TOL * max(1.0, abs(expected.fun)))
+        self.assertTrue(np.all(x >= problem.lb - self.TOL) and np.all(x <= problem.ub + self.TOL))
+        is_int = problem.types != VarType.CONTINUOUS
+        np.testing.assert_allclose(x[is_int], np.round(x[is_int]), atol=self.TOL)
+        residual = problem.A.dot(x) - problem.b
+        violation = np.where(problem.senses == Sense.LE, residual,
+                             np.where(problem.senses == Sense.GE, -residual, np.abs(residual)))
+        self.assertTrue(np.all(violation <= self.TOL * (1.0 + np.abs(problem.b))))
@@ -1,52 +1,30 @@
 import sys
 
-from lp.entity import Sense, ObjectiveType, Expression, VarType
+import numpy as np
+
+from lp.entity import Sense, ObjectiveType, VarType
 from lp.model import Model
 
+VAR_TYPES = {'c': VarType.CONTINUOUS, 'i': VarType.INTEGER, 'b': VarType.BINARY}
+SENSES = {'<=': Sense.LE, '>=': Sense.GE, '==': Sense.EQ}
+
 
 def run(data):
     model = Model()
-    obj_expr = Expression()
-    var_types = data.var_type
-    cost = data.c
-    rhs = data.b
-    coeffs = data.A
-    sense = data.sense
-    n_cols = len(data.c)
-    n_rows = len(data.b)
-    cols = []
-    rows = []
 
     # add variables
-    for c in range(n_cols):
-        var_type = VarType.NONE
-        if var_types[c] == 'c':
-            var_type = VarType.CONTINUOUS
-        if var_types[c] == 'i':
-            var_type = VarType.INTEGER
-        elif var_types[c] == 'b':
-            var_type = VarType.BINARY
-        cols.append(model.add_var(lb=0, ub=sys.float_info.max,
-                                  var_type=var_type, name='x' + str(c)))
-        obj_expr.add_term(cost[c], cols[c])
+    var_types = [VAR_TYPES.get(var_type, VarType.NONE) for var_type in data.var_type]
+    model.add_vars(len(data.c), lb=0, ub=sys.float_info.max, obj=data.c, types=var_types)
 
     # add constraints
-    for r in range(n_rows):
-        expr = Expression()
-        for c in range(n_cols):
-            expr.add_term(coeffs[r][c], cols[c])
-        if sense[r] == '<=':
-            rows.append(model.add_const(expr, Sense.LE, rhs[r]))
-        elif sense[r] == '>=':
-            rows.append(model.add_const(expr, Sense.GE, rhs[r]))
-        elif sense[r] == '==':
-            rows.append(model.add_const(expr, Sense.EQ, rhs[r]))
+    senses = [SENSES[sense] for sense in data.sense]
+    model.add_constrs(np.asarray(data.A, dtype=np.float64), senses, data.b)
 
     # add objective
     if data.obj == 'max':
-        model.set_objective(obj_expr, ObjectiveType.MAX)
+        model.set_objective(None, ObjectiveType.MAX)
     elif data.obj == 'min':
-        model.set_objective(obj_expr, ObjectiveType.MIN)
+        model.set_objective(None, ObjectiveType.MIN)
 
     model.SOLVER_PARAM.MIP_GAP = 0.05
     model.SOLVER_PARAM.TIME_LIMIT = 30.0
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, ObjectiveType, Sense, VarType
+from lp.model import Model
+from test.helper import Problem, solve_highs
+
+
+class BatchTest(unittest.TestCase):
+    """Every scenario of a batch solve is checked against HiGHS."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.A = rng.integers(-2, 6, size=(6, 10)).astype(np.float64)
+        self.b = rng.integers(10, 30, size=6).astype(np.float64)
+        # a row with a negative right hand side is stored negated
+        self.b[0] = -5.0
+        self.senses = np.array([Sense.GE] + [Sense.LE] * 5)
+        self.c = rng.integers(1, 10, size=10).astype(np.float64)
+        self.model = Model()
+        self.model.add_vars(10, ub=5.0, obj=self.c)
+        self.model.add_constrs(self.A, self.senses, self.b)
+        self.model.set_objective(None, ObjectiveType.MAX)
+        self.rng = rng
+
+    def get_expected(self, b, c):
+        n = len(c)
+        return solve_highs(Problem(self.A, b, self.senses, -c, np.zeros(n), np.full(n, 5.0),
+                                   np.full(n, VarType.CONTINUOUS)))
+
+    def assert_scenarios(self, result, rhs, costs):
+        for k, (b, c) in enumerate(zip(rhs, costs)):
+            expected = self.get_expected(b, c)
+            if expected.status == 2:
+                self.assertEqual(result.status[k], AlgorithmStatus.INFEASIBLE)
+                continue
+            self.assertEqual(result.status[k], AlgorithmStatus.OPTIMAL)
+            self.assertAlmostEqual(result.obj_val[k], -expected.fun, places=6)
+            self.assertAlmostEqual(c.dot(result.x[k]), -expected.fun, places=6)
+
+    def test_rhs(self):
+        rhs = self.b + self.rng.integers(-8, 8, size=(12, 6))
+        # the first row can not be met, so the scenario is infeasible
+        rhs[5, 0] = 1000.0
+        result = self.model.solve_batch(rhs=rhs)
+        self.assert_scenarios(result, rhs, np.tile(self.c, (12, 1)))
+
+    def test_costs(self):
+        costs = self.c + self.rng.integers(-3, 3, size=(12, 10))
+        result = self.model.solve_batch(costs=costs)
+        self.assert_scenarios(result, np.tile(self.b, (12, 1)), costs)
+
+    def test_rhs_and_costs(self):
+        rhs = self.b + self.rng.integers(-8, 8, size=(8, 6))
+        costs = self.c + self.rng.integers(-3, 3, size=(8, 10))
+        result = self.model.solve_batch(rhs=rhs, costs=costs)
+        self.assert_scenarios(result, rhs, costs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from benchmark.compare import compare
+from benchmark.generators import GENERATORS, generate
+from lp.entity import AlgorithmStatus
+
+SIZES = {
+    'transportation': (3, 4),
+    'diet': (6, 3),
+    'min_cost_flow': (8,),
+    'max_flow': (8,),
+    'set_cover': (6, 5),
+    'knapsack': (6, 2),
+}
+
+
+def get_instance(status=AlgorithmStatus.OPTIMAL, obj_val=10.0, time=1.0, iterations=20,
+                 nodes=1, peak_memory_mb=50.0):
+    return {'status': status, 'obj_val': obj_val, 'time': time, 'iterations': iterations,
+            'nodes': nodes, 'peak_memory_mb': peak_memory_mb}
+
+
+class CompareTest(unittest.TestCase):
+    """Changes of the benchmark results against the baseline are flagged within tolerances."""
+
+    def compare(self, current, base, tolerances=None):
+        return compare({'instances': {'a': current}}, {'instances': {'a': base}}, tolerances)
+
+    def test_unchanged(self):
+        self.assertEqual(self.compare(get_instance(), get_instance()), ([], []))
+
+    def test_status(self):
+        regressions, improvements = self.compare(
+            get_instance(status=AlgorithmStatus.INFEASIBLE, time=5.0), get_instance())
+        # the measurements of an instance whose status changed are not compared
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('status', regressions[0])
+        self.assertEqual(improvements, [])
+
+    def test_obj_val(self):
+        regressions, _ = self.compare(get_instance(obj_val=10.5), get_instance())
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('obj_val', regressions[0])
+        self.assertEqual(self.compare(get_instance(obj_val=10.0 + 1e-8), get_instance()),
+                         ([], []))
+
+    def test_time(self):
+        # within the tolerance of 10%
+        self.assertEqual(self.compare(get_instance(time=1.05), get_instance()), ([], []))
+        regressions, improvements = self.compare(get_instance(time=1.5), get_instance())
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('time', regressions[0])
+        self.assertEqual(improvements, [])
+        regressions, improvements = self.compare(get_instance(time=0.5), get_instance())
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(improvements), 1)
+        # a difference below the noise of the timer is not flagged, however large relatively
+        self.assertEqual(self.compare(get_instance(time=0.005), get_instance(time=0.001)),
+                         ([], []))
+        regressions, _ = self.compare(get_instance(time=1.05), get_instance(), {'time': 0.01})
+        self.assertEqual(len(regressions), 1)
+
+    def test_iterations(self):
+        regressions, _ = self.compare(get_instance(iterations=21), get_instance())
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('iterations', regressions[0])
+
+    def test_missing_instance(self):
+        results = {'instances': {'a': get_instance(), 'b': get_instance(time=9.0)}}
+        baseline = {'instances': {'a': get_instance(), 'c': get_instance()}}
+        self.assertEqual(compare(results, baseline), ([], []))
+
+
+class GeneratorTest(unittest.TestCase):
+    """Each family of the benchmark builds a model that solves at a tiny size."""
+
+    def test_generators(self):
+        self.assertEqual(set(SIZES), set(GENERATORS))
+        for family, sizes in SIZES.items():
+            with self.subTest(family=family):
+                model = generate(family, sizes, seed=1)
+                self.assertGreater(model.n_rows, 0)
+                self.assertGreater(model.n_cols, 0)
+                model.solve()
+                self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+
+
+if __name__ == '__main__':
+    unittest.main()
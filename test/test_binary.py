@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.sparse import coo_matrix
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense
+from lp.model import Model
+
+
+class BinaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        self.model.add_vars(4, ub=5.0, obj=[1.0, 2.0, 3.0, 1.0])
+        # duplicate terms are summed when the model is saved
+        A = coo_matrix(([1.0, 2.0, 1.0, 1.0, 1.0, 3.0, 1.0],
+                        ([1, 0, 0, 1, 2, 2, 1], [0, 0, 1, 2, 3, 1, 0])), shape=(3, 4))
+        self.model.add_constrs(A, [Sense.LE, Sense.LE, Sense.GE], [6.0, 8.0, 2.0])
+        self.model.set_objective(None, ObjectiveType.MAX)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'model.bin')
+        self.model.save(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        expected = self.model.get_coefficient_matrix().toarray()
+        self.model.solve()
+        for mmap in (True, False):
+            model = Model.load(self.path, mmap)
+            np.testing.assert_array_equal(model.get_coefficient_matrix().toarray(), expected)
+            model.solve()
+            self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+            self.assertEqual(model.result.obj_val, self.model.result.obj_val)
+
+    def test_change_after_load(self):
+        model = Model.load(self.path)
+        expr = Expression()
+        expr.add_term(1.0, model.vars[3])
+        model.add_const(expr, Sense.LE, 1.0)
+        model.remove_const(model.consts[0])
+        A = model.get_coefficient_matrix().toarray()
+        np.testing.assert_array_equal(A[:2], self.model.get_coefficient_matrix().toarray()[1:])
+        np.testing.assert_array_equal(A[2], [0.0, 0.0, 0.0, 1.0])
+        self.assertEqual(Model.load(self.path).n_rows, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
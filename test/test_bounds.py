@@ -0,0 +1,74 @@
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, SolverParam
+from lp.model import Model
+
+ALGORITHMS = (SolverParam.Algorithm.PRIMAL_SIMPLEX, SolverParam.Algorithm.DUAL_SIMPLEX,
+              SolverParam.Algorithm.INTERIOR_POINT)
+
+
+class BoundsTest(unittest.TestCase):
+    """Bounds of the columns are kept by the algorithms without adding rows for them."""
+
+    def setUp(self):
+        # max x + 2 y + 0.5 z  s.t.  x + y + z <= 10,  x in [-2, 3], y in [1, 4], z free
+        self.model = Model()
+        self.x = self.model.add_var(lb=-2.0, ub=3.0)
+        self.y = self.model.add_var(lb=1.0, ub=4.0)
+        self.z = self.model.add_var(lb=-sys.float_info.max)
+        expr = Expression()
+        for var in (self.x, self.y, self.z):
+            expr.add_term(1.0, var)
+        self.model.add_const(expr, Sense.LE, 10.0)
+        objective = Expression()
+        objective.add_term(1.0, self.x)
+        objective.add_term(2.0, self.y)
+        objective.add_term(0.5, self.z)
+        self.model.set_objective(objective, ObjectiveType.MAX)
+
+    def test_bounded_columns(self):
+        for algorithm in ALGORITHMS:
+            for presolve in (True, False):
+                with self.subTest(algorithm=algorithm.name, presolve=presolve), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', presolve):
+                    self.model.solve()
+                    self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+                    np.testing.assert_allclose(self.model.get_values(), [3.0, 4.0, 3.0],
+                                               atol=1e-6)
+                    self.assertAlmostEqual(self.model.result.obj_val, 12.5)
+                    # the bounds add no rows to the prepared matrix
+                    self.assertEqual(self.model.A.shape[0], 1)
+
+    def test_crossed_bounds(self):
+        self.model.set_bounds(self.x, lb=3.0, ub=2.0)
+        for algorithm in ALGORITHMS:
+            with self.subTest(algorithm=algorithm.name), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+                self.model.solve()
+                self.assertEqual(self.model.result.status, AlgorithmStatus.INFEASIBLE)
+
+    def test_crossed_bounds_resolve(self):
+        self.model.solve()
+        self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+        self.model.set_bounds(self.y, lb=5.0)
+        self.model.solve()
+        self.assertEqual(self.model.result.status, AlgorithmStatus.INFEASIBLE)
+        self.model.set_bounds(self.y, lb=1.0)
+        self.model.solve()
+        self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(self.model.result.obj_val, 12.5)
+
+    def test_crossed_bounds_batch(self):
+        self.model.set_bounds(self.x, lb=3.0, ub=2.0)
+        result = self.model.solve_batch(rhs=[[10.0], [12.0]])
+        self.assertTrue(np.all(result.status == AlgorithmStatus.INFEASIBLE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, quicksum
+from lp.model import Model
+
+
+class ExpressionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        self.x = self.model.add_var(name='x')
+        self.y = self.model.add_var(name='y')
+
+    def test_operators(self):
+        expr = 2 * self.x + self.y - 3 + self.x * 0.5 - (self.y - 1)
+        self.assertEqual(expr.terms, {self.x: 2.5, self.y: 0.0})
+        self.assertEqual(expr.constant, -2.0)
+        expr = 4 - (-self.x)
+        self.assertEqual(expr.terms, {self.x: 1.0})
+        self.assertEqual(expr.constant, 4.0)
+        expr = np.float64(3.0) * self.x
+        self.assertIsInstance(expr, Expression)
+        self.assertEqual(expr.terms, {self.x: 3.0})
+
+    def test_in_place(self):
+        expr = Expression()
+        alias = expr
+        expr += self.x
+        expr -= 2 * self.y
+        expr += 1.5
+        self.assertIs(expr, alias)
+        self.assertEqual(expr.terms, {self.x: 1.0, self.y: -2.0})
+        self.assertEqual(expr.constant, 1.5)
+        with self.assertRaises(TypeError):
+            expr += 'x'
+
+    def test_quicksum(self):
+        expr = quicksum([self.x, (2.0, self.y), 3 * self.x, 4.0])
+        self.assertEqual(expr.terms, {self.x: 4.0, self.y: 2.0})
+        self.assertEqual(expr.constant, 4.0)
+
+    def test_solve(self):
+        # the constant of a constraint moves to its right hand side
+        self.model.add_const(self.x + self.y + 2, Sense.LE, 6.0)
+        self.model.add_const(self.x - self.y, Sense.LE, 1.0)
+        self.model.set_objective(quicksum([(3.0, self.x), (2.0, self.y), 1.0]), ObjectiveType.MAX)
+        self.model.solve()
+        self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(self.model.result.obj_val, 11.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from lp.factorization import BasisFactorization
+
+
+def create_basis(rng, m):
+    """Returns a sparse, diagonally dominant and so nonsingular basis matrix."""
+    B = rng.uniform(-1.0, 1.0, size=(m, m)) * (rng.random((m, m)) < 0.3)
+    return B + np.diag(np.abs(B).sum(axis=1) + 1.0)
+
+
+class FactorizationTest(unittest.TestCase):
+    """The updated LU factorization solves with the basis as a dense solve does."""
+
+    def assert_solves(self, factor, B, rng):
+        a = rng.uniform(-5.0, 5.0, size=len(B))
+        np.testing.assert_allclose(factor.ftran(a), np.linalg.solve(B, a), atol=1e-9)
+        np.testing.assert_allclose(factor.btran(a), np.linalg.solve(B.T, a), atol=1e-9)
+        A = rng.uniform(-5.0, 5.0, size=(len(B), 3))
+        np.testing.assert_allclose(factor.ftran_many(A), np.linalg.solve(B, A), atol=1e-9)
+        np.testing.assert_allclose(factor.btran_many(A), np.linalg.solve(B.T, A), atol=1e-9)
+
+    def test_factorize(self):
+        rng = np.random.default_rng(0)
+        B = create_basis(rng, 12)
+        factor = BasisFactorization()
+        factor.factorize(B)
+        self.assertEqual(factor.n_factorizations, 1)
+        self.assert_solves(factor, B, rng)
+
+    def test_update(self):
+        rng = np.random.default_rng(1)
+        B = create_basis(rng, 15)
+        factor = BasisFactorization(refactor_frequency=10)
+        factor.factorize(B)
+        for k in range(10):
+            self.assertFalse(factor.needs_refactor)
+            # the entering column replaces the basic column whose pivot is largest
+            a_q = rng.uniform(-1.0, 1.0, size=len(B)) * (rng.random(len(B)) < 0.5)
+            a_q[k] += 2.0
+            alpha = factor.ftran(a_q)
+            p = int(np.argmax(np.abs(alpha)))
+            factor.update(p, alpha)
+            B[:, p] = a_q
+            self.assert_solves(factor, B, rng)
+        self.assertTrue(factor.needs_refactor)
+        factor.factorize(B)
+        self.assertEqual(factor.n_updates, 0)
+        self.assertEqual(factor.n_factorizations, 2)
+        self.assert_solves(factor, B, rng)
+
+    def test_add_row(self):
+        rng = np.random.default_rng(2)
+        B = create_basis(rng, 10)
+        factor = BasisFactorization()
+        factor.factorize(B)
+        a_q = B[:, 3] + rng.uniform(-0.5, 0.5, size=len(B))
+        factor.update(3, factor.ftran(a_q))
+        B[:, 3] = a_q
+        for s in (1.0, -2.0):
+            r = rng.uniform(-1.0, 1.0, size=len(B))
+            factor.add_row(r, s)
+            B = np.block([[B, np.zeros((len(B), 1))], [r, s]])
+            self.assert_solves(factor, B, rng)
+
+    def test_empty(self):
+        factor = BasisFactorization()
+        factor.factorize(np.zeros((0, 0)))
+        self.assertEqual(len(factor.ftran(np.zeros(0))), 0)
+        self.assertEqual(len(factor.btran(np.zeros(0))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
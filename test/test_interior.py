@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import SolverParam
+from lp.model import Model
+from test.helper import SolverTestCase, create_lp, solve_model
+
+
+class InteriorPointTest(SolverTestCase):
+    """The interior point algorithm, with and without crossover, is checked against HiGHS."""
+
+    TOL = 1e-5
+
+    def test_crossover(self):
+        for crossover in (True, False):
+            with self.subTest(crossover=crossover), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM',
+                                      SolverParam.Algorithm.INTERIOR_POINT), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'CROSSOVER', crossover):
+                for seed in range(20):
+                    problem = create_lp(seed)
+                    model = solve_model(problem)
+                    self.assert_optimal(model, problem)
+                    self.assertEqual(model.algorithm, SolverParam.Algorithm.INTERIOR_POINT)
+
+    def test_duals(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM',
+                               SolverParam.Algorithm.INTERIOR_POINT):
+            for seed in range(20):
+                problem = create_lp(seed)
+                model = solve_model(problem)
+                y = model.get_duals()
+                d = model.get_reduced_costs()
+                np.testing.assert_allclose(d, problem.c - problem.A.T.dot(y), atol=1e-6)
+                # the dual objective meets the primal one
+                dual_obj = problem.b.dot(y) + np.sum(np.where(d > 0.0, d * problem.lb,
+                                                              d * problem.ub))
+                self.assertAlmostEqual(dual_obj, problem.c.dot(model.get_values()), places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, VarType
+from lp.model import Model
+
+BOUNDS = [(0.0, -1.0), (0.0, 4.0), (-2.0, 3.0), (1.5, 1.5), (-sys.float_info.max, -2.0),
+          (-sys.float_info.max, sys.float_info.max), (2.0, sys.float_info.max)]
+
+
+class LPFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def round_trip(self, model, name):
+        path = os.path.join(self.directory.name, name)
+        model.write(path)
+        return Model.read(path)
+
+    def test_bounds(self):
+        model = Model()
+        x = [model.add_var(lb=lb, ub=ub, name='x%d' % j) for j, (lb, ub) in enumerate(BOUNDS)]
+        x.append(model.add_var(ub=5.0, name='y', var_type=VarType.INTEGER))
+        x.append(model.add_var(ub=1.0, name='z', var_type=VarType.BINARY))
+        expr = Expression()
+        for j, var in enumerate(x):
+            expr.add_term(j + 1.0, var)
+        model.add_const(expr, Sense.LE, 10.0)
+        model.set_objective(expr, ObjectiveType.MIN)
+        for name in ('model.lp', 'model.lp.gz'):
+            read = self.round_trip(model, name)
+            for values, expected in ((read.var_lb.values, model.var_lb.values),
+                                     (read.var_ub.values, model.var_ub.values)):
+                np.testing.assert_array_equal(
+                    np.clip(values, -sys.float_info.max, sys.float_info.max), expected)
+            np.testing.assert_array_equal(read.var_types.values, model.var_types.values)
+
+    def test_solve(self):
+        # max 5 x + 4 y + 3 z  s.t.  2 x + 3 y + z <= 5,  4 x + y + 2 z <= 11,  3 x + 4 y + 2 z <= 8
+        model = Model()
+        x = [model.add_var(name=name) for name in ('x', 'y', 'z')]
+        for coeffs, rhs in (((2.0, 3.0, 1.0), 5.0), ((4.0, 1.0, 2.0), 11.0),
+                            ((3.0, 4.0, 2.0), 8.0)):
+            expr = Expression()
+            for coeff, var in zip(coeffs, x):
+                expr.add_term(coeff, var)
+            model.add_const(expr, Sense.LE, rhs)
+        objective = Expression()
+        for coeff, var in zip((5.0, 4.0, 3.0), x):
+            objective.add_term(coeff, var)
+        model.set_objective(objective, ObjectiveType.MAX)
+        read = self.round_trip(model, 'model.lp')
+        read.solve()
+        self.assertEqual(read.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(read.result.obj_val, 13.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, SolverParam, VarType
+from lp.model import Model
+from test.helper import SolverTestCase, create_mip, solve_model
+
+
+class MIPTest(SolverTestCase):
+    """Branch and bound with its options is checked against HiGHS."""
+
+    N_SEEDS = 10
+
+    def assert_mips(self):
+        for seed in range(self.N_SEEDS):
+            problem = create_mip(seed)
+            model = solve_model(problem)
+            self.assert_optimal(model, problem)
+
+    def test_branching_algorithms(self):
+        for branching in (SolverParam.BranchingAlgorithm.DFS, SolverParam.BranchingAlgorithm.BFS,
+                          SolverParam.BranchingAlgorithm.BEST_BOUND,
+                          SolverParam.BranchingAlgorithm.BEST_ESTIMATE,
+                          SolverParam.BranchingAlgorithm.HYBRID):
+            with self.subTest(branching=branching.name), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'BRANCHING_ALGORITHM', branching):
+                self.assert_mips()
+
+    def test_dual_simplex(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM',
+                               SolverParam.Algorithm.DUAL_SIMPLEX):
+            self.assert_mips()
+
+    def test_cuts(self):
+        for cuts in (True, False):
+            with self.subTest(cuts=cuts), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'CUTS', cuts), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'HEURISTICS', False):
+                self.assert_mips()
+
+    def test_heuristics(self):
+        for heuristics in (True, False):
+            with self.subTest(heuristics=heuristics), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'HEURISTICS', heuristics), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'CUTS', False):
+                self.assert_mips()
+
+    def test_threads(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'THREADS', 2), \
+                mock.patch.object(Model.SOLVER_PARAM, 'DETERMINISTIC', False):
+            self.assert_mips()
+
+    def test_deterministic(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'THREADS', 2), \
+                mock.patch.object(Model.SOLVER_PARAM, 'DETERMINISTIC', True):
+            for seed in range(self.N_SEEDS):
+                problem = create_mip(seed)
+                first = solve_model(problem)
+                second = solve_model(problem)
+                self.assert_optimal(first, problem)
+                self.assertEqual(first.result.nodes, second.result.nodes)
+                self.assertEqual(first.result.iterations, second.result.iterations)
+                np.testing.assert_array_equal(first.get_values(), second.get_values())
+
+    def test_integer_bounds(self):
+        # no integer lies in [0.2, 0.8], so the bounds cross once they are rounded
+        model = Model()
+        x = model.add_var(lb=0.2, ub=0.8, var_type=VarType.INTEGER)
+        y = model.add_var()
+        expr = Expression()
+        expr.add_term(1.0, x)
+        expr.add_term(1.0, y)
+        model.add_const(expr, Sense.LE, 3.0)
+        model.set_objective(expr, ObjectiveType.MAX)
+        with mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False), \
+                mock.patch.object(Model.SOLVER_PARAM, 'CUTS', False), \
+                mock.patch.object(Model.SOLVER_PARAM, 'HEURISTICS', False):
+            model.solve()
+        self.assertEqual(model.result.status, AlgorithmStatus.INFEASIBLE)
+        self.assertEqual(model.result.iterations, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
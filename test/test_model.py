@@ -0,0 +1,132 @@
+import unittest
+
+import numpy as np
+
+from scipy.sparse import coo_matrix, csr_matrix
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, UnknownModelError, \
+    UnknownVariableError, VarType
+from lp.model import Model
+
+
+class ModelTest(unittest.TestCase):
+
+    def setUp(self):
+        # max 3 x + 2 y  s.t.  x + y <= 4,  x + 3 y <= 9,  x <= 3
+        self.model = Model()
+        self.x = self.model.add_var(name='x')
+        self.y = self.model.add_var(name='y')
+        self.consts = []
+        for coeffs, rhs in (((1.0, 1.0), 4.0), ((1.0, 3.0), 9.0), ((1.0, 0.0), 3.0)):
+            expr = Expression()
+            expr.add_term(coeffs[0], self.x)
+            expr.add_term(coeffs[1], self.y)
+            self.consts.append(self.model.add_const(expr, Sense.LE, rhs))
+        objective = Expression()
+        objective.add_term(3.0, self.x)
+        objective.add_term(2.0, self.y)
+        self.model.set_objective(objective, ObjectiveType.MAX)
+
+    def test_solution_vectors(self):
+        self.model.solve()
+        self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(self.model.result.obj_val, 11.0)
+        np.testing.assert_allclose(self.model.get_duals(), [2.0, 0.0, 1.0], atol=1e-9)
+        np.testing.assert_allclose(self.model.get_slacks(), [0.0, 3.0, 0.0], atol=1e-9)
+        np.testing.assert_allclose(self.model.get_reduced_costs(), [0.0, 0.0], atol=1e-9)
+        for const, dual, slack in zip(self.consts, self.model.get_duals(),
+                                      self.model.get_slacks()):
+            self.assertAlmostEqual(self.model.get_dual(const), dual)
+            self.assertAlmostEqual(self.model.get_slack(const), slack)
+
+    def test_changes_after_solve(self):
+        self.model.solve()
+        self.model.set_rhs(self.consts[1], 11.0)
+        self.assertAlmostEqual(self.model.get_slack(self.consts[1]), 5.0)
+        self.model.set_obj_coeff(self.y, 1.0)
+        self.assertAlmostEqual(self.model.get_reduced_cost(self.y), -1.0)
+        self.model.solve()
+        self.assertAlmostEqual(self.model.result.obj_val, 10.0)
+        self.assertAlmostEqual(self.model.get_slack(self.consts[1]), 5.0)
+
+    def test_coefficient_matrix(self):
+        rng = np.random.default_rng(0)
+        A = rng.integers(-3, 4, size=(6, 8)).astype(np.float64)
+        A[rng.random((6, 8)) < 0.5] = 0.0
+        senses = np.array([Sense.LE, Sense.GE, Sense.EQ, Sense.LE, Sense.GE, Sense.LE])
+        b = np.array([4.0, -2.0, 1.0, -3.0, 5.0, 0.0])
+        model = Model()
+        model.add_vars(8)
+        model.add_constrs(A, senses, b)
+        model.prepare_coefficient_matrices()
+        self.assertEqual(model.A.format, 'csc')
+        # rows with a negative right hand side are stored negated
+        signs = model.row_signs.values
+        np.testing.assert_array_equal(signs, np.where(b < 0.0, -1, 1))
+        np.testing.assert_array_equal(model.A[:, :8].toarray(), signs[:, None] * A)
+        np.testing.assert_array_equal(model.b, signs * b)
+        # every slack and surplus column has its single entry in its row
+        n_logical = model.n_slack + model.n_surplus
+        self.assertEqual(model.A.shape[1], 8 + n_logical)
+        self.assertEqual(model.A.nnz, np.count_nonzero(A) + n_logical)
+        logical = model.A[:, 8:].toarray()
+        np.testing.assert_array_equal(logical[model.get_slack_rows(), np.arange(model.n_slack)],
+                                      1.0)
+        np.testing.assert_array_equal(
+            logical[model.get_surplus_rows(), model.n_slack + np.arange(model.n_surplus)], -1.0)
+
+    def test_bulk_construction(self):
+        # the LP of setUp built from arrays, with the first row sparse and the others dense
+        model = Model()
+        variables = model.add_vars(2, ub=[10.0, 10.0], obj=[3.0, 2.0], names=['x', 'y'])
+        self.assertEqual([var.name for var in variables], ['x', 'y'])
+        self.assertEqual([var.index for var in variables], [0, 1])
+        model.add_constrs(csr_matrix([[1.0, 1.0]]), Sense.LE, 4.0)
+        # a matrix narrower than the model covers its first variables
+        model.add_constrs(np.array([[1.0, 3.0], [1.0, 0.0]]), [Sense.LE, Sense.LE], [9.0, 3.0])
+        model.set_objective(None, ObjectiveType.MAX)
+        self.model.prepare_coefficient_matrices()
+        model.prepare_coefficient_matrices()
+        np.testing.assert_array_equal(model.A.toarray(), self.model.A.toarray())
+        model.solve()
+        self.model.solve()
+        self.assertAlmostEqual(model.result.obj_val, self.model.result.obj_val)
+        np.testing.assert_allclose(model.get_duals(), self.model.get_duals(), atol=1e-9)
+        # expressions add rows to the same store
+        expr = Expression()
+        expr.add_term(1.0, variables[1])
+        model.add_const(expr, Sense.LE, 0.5)
+        model.add_constrs(coo_matrix(([1.0], ([0], [0])), shape=(1, 1)), Sense.GE, 1.0)
+        model.solve()
+        self.assertAlmostEqual(model.result.obj_val, 10.0)
+        with self.assertRaises(UnknownVariableError):
+            model.add_constrs(np.ones((1, 3)), Sense.LE, 1.0)
+        model.add_vars(1, types=VarType.INTEGER)
+        self.assertTrue(model.is_mip)
+
+    def test_index_lookups(self):
+        self.model.solve()
+        # values and duals are read by index in the order the handles are given
+        np.testing.assert_allclose(self.model.get_values([self.y, self.x, self.y]),
+                                   [1.0, 3.0, 1.0], atol=1e-9)
+        self.assertAlmostEqual(self.model.get_value(self.x), 3.0)
+        consts = [self.consts[2], self.consts[0]]
+        np.testing.assert_allclose(self.model.get_duals(consts), [1.0, 2.0], atol=1e-9)
+        self.assertEqual(len(self.model.get_values([])), 0)
+        other = Model()
+        other.add_vars(3)
+        unknown = other.vars[2]
+        with self.assertRaises(UnknownVariableError):
+            self.model.get_values([self.x, unknown])
+        with self.assertRaises(UnknownVariableError):
+            self.model.get_value(other.vars[0])
+        other_const = other.add_constrs(np.ones((4, 3)), Sense.LE, 1.0)[3]
+        with self.assertRaises(UnknownModelError):
+            self.model.get_duals([other_const])
+        # the handles have no instance dict
+        for handle in (self.x, self.consts[0], Expression()):
+            self.assertFalse(hasattr(handle, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
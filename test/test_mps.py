@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from lp.entity import Expression, ObjectiveType, Sense, VarType
+from lp.model import Model
+
+BOUNDS = [(0.0, -1.0), (0.0, 4.0), (-2.0, 3.0), (1.5, 1.5), (-sys.float_info.max, -2.0),
+          (-sys.float_info.max, sys.float_info.max), (2.0, sys.float_info.max)]
+
+
+class MPSTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        x = [self.model.add_var(lb=lb, ub=ub, name='x%d' % j) for j, (lb, ub) in enumerate(BOUNDS)]
+        x.append(self.model.add_var(ub=5.0, name='y', var_type=VarType.INTEGER))
+        expr = Expression()
+        for j, var in enumerate(x):
+            expr.add_term(j + 1.0, var)
+        self.model.add_const(expr, Sense.LE, 10.0)
+        self.model.set_objective(expr, ObjectiveType.MIN)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def round_trip(self, name, fixed=False):
+        path = os.path.join(self.directory.name, name)
+        self.model.write(path, fixed)
+        return Model.read(path, fixed)
+
+    def assert_bounds(self, model):
+        def finite(values):
+            return np.clip(values, -sys.float_info.max, sys.float_info.max)
+        np.testing.assert_array_equal(finite(model.var_lb.values), finite(self.model.var_lb.values))
+        np.testing.assert_array_equal(finite(model.var_ub.values), finite(self.model.var_ub.values))
+        np.testing.assert_array_equal(model.var_types.values, self.model.var_types.values)
+
+    def test_free_format(self):
+        self.assert_bounds(self.round_trip('model.mps'))
+
+    def test_gzipped(self):
+        self.assert_bounds(self.round_trip('model.mps.gz'))
+
+    def test_fixed_format(self):
+        self.assert_bounds(self.round_trip('model.mps', fixed=True))
+
+    def test_negative_upper_bound_without_lower_bound(self):
+        path = os.path.join(self.directory.name, 'model.mps')
+        with open(path, 'w') as file:
+            file.write('NAME test\nROWS\n N obj\n L c0\nCOLUMNS\n x obj 1 c0 1\n'
+                       'RHS\n RHS c0 1\nBOUNDS\n UP BND x -1\nENDATA\n')
+        model = Model.read(path)
+        self.assertEqual(model.var_lb.values[0], -np.inf)
+        self.assertEqual(model.var_ub.values[0], -1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
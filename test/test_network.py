@@ -0,0 +1,53 @@
+import unittest
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, VarType
+from lp.model import Model
+
+
+class NetworkTest(unittest.TestCase):
+
+    def test_transportation(self):
+        model = Model()
+        supplies = [20.0, 30.0]
+        demands = [10.0, 25.0, 15.0]
+        costs = [[8.0, 6.0, 10.0], [9.0, 12.0, 13.0]]
+        x = [[model.add_var(name='x[%d,%d]' % (i, j)) for j in range(len(demands))]
+             for i in range(len(supplies))]
+        for i, supply in enumerate(supplies):
+            expr = Expression()
+            for var in x[i]:
+                expr.add_term(1.0, var)
+            model.add_const(expr, Sense.LE, supply)
+        for j, demand in enumerate(demands):
+            expr = Expression()
+            for row in x:
+                expr.add_term(1.0, row[j])
+            model.add_const(expr, Sense.GE, demand)
+        objective = Expression()
+        for i, row in enumerate(x):
+            for j, var in enumerate(row):
+                objective.add_term(costs[i][j], var)
+        model.set_objective(objective, ObjectiveType.MIN)
+        model.solve()
+        self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(model.result.obj_val, 465.0)
+
+    def test_mip_with_fractional_continuous_bound(self):
+        model = Model()
+        x = model.add_var(ub=10, name='x', var_type=VarType.INTEGER)
+        y = model.add_var(ub=0.5, name='y')
+        expr = Expression()
+        expr.add_term(1.0, x)
+        expr.add_term(-1.0, y)
+        model.add_const(expr, Sense.EQ, 0.0)
+        objective = Expression()
+        objective.add_term(1.0, x)
+        model.set_objective(objective, ObjectiveType.MAX)
+        model.solve()
+        self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(model.result.obj_val, 0.0)
+        self.assertAlmostEqual(model.result.solution.get('x', 0.0), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, ObjectiveType, Sense, VarType
+from lp.model import Model
+
+
+def solve(A, senses, b, c, lb, ub, types=VarType.CONTINUOUS, presolve=True):
+    model = Model()
+    model.add_vars(len(c), lb=lb, ub=ub, obj=c, types=types)
+    model.add_constrs(np.array(A, dtype=np.float64), senses, b)
+    model.set_objective(None, ObjectiveType.MIN)
+    with mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', presolve):
+        model.solve()
+    return model
+
+
+class PresolveTest(unittest.TestCase):
+    """Each reduction is counted, and the solution it maps back matches the one without presolve."""
+
+    def assert_reduction(self, reduction, count, *data):
+        model = solve(*data)
+        expected = solve(*data, presolve=False)
+        self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertEqual(model.result.presolve[reduction], count)
+        self.assertAlmostEqual(model.result.obj_val, expected.result.obj_val)
+        np.testing.assert_allclose(model.get_values(), expected.get_values(), atol=1e-9)
+        np.testing.assert_allclose(model.get_duals(), expected.get_duals(), atol=1e-9)
+        return model
+
+    def test_empty_rows(self):
+        # min -x - 2 y  s.t.  x + y <= 4,  0 <= 5,  x, y in [0, 3]
+        self.assert_reduction('empty_rows', 1, [[1.0, 1.0], [0.0, 0.0]], Sense.LE, [4.0, 5.0],
+                              [-1.0, -2.0], 0.0, 3.0)
+
+    def test_singleton_rows(self):
+        # min -x - 2 y  s.t.  x + y <= 4,  2 x <= 3,  y in [0, 2]
+        model = self.assert_reduction('singleton_rows', 1, [[1.0, 1.0], [2.0, 0.0]], Sense.LE,
+                                      [4.0, 3.0], [-1.0, -2.0], 0.0, [10.0, 2.0])
+        # the active singleton row takes over the reduced cost of its column
+        np.testing.assert_allclose(model.get_duals(), [0.0, -0.5], atol=1e-9)
+
+    def test_duplicate_rows(self):
+        # min -x - 2 y  s.t.  x + y <= 4,  2 x + 2 y <= 10,  x - y <= 1,  x, y in [0, 3]
+        self.assert_reduction('duplicate_rows', 1, [[1.0, 1.0], [2.0, 2.0], [1.0, -1.0]],
+                              Sense.LE, [4.0, 10.0, 1.0], [-1.0, -2.0], 0.0, 3.0)
+
+    def test_redundant_rows(self):
+        # min -x - 2 y  s.t.  x + y <= 4,  x + 2 y <= 10,  x, y in [0, 3]
+        self.assert_reduction('redundant_rows', 1, [[1.0, 1.0], [1.0, 2.0]], Sense.LE,
+                              [4.0, 10.0], [-1.0, -2.0], 0.0, 3.0)
+
+    def test_fixed_cols(self):
+        # min -x - 2 y + z  s.t.  x + y + z <= 6,  x, y in [0, 3],  z = 2
+        self.assert_reduction('fixed_cols', 1, [[1.0, 1.0, 1.0]], Sense.LE, [6.0],
+                              [-1.0, -2.0, 1.0], [0.0, 0.0, 2.0], [3.0, 3.0, 2.0])
+
+    def test_empty_cols(self):
+        # min -x - 2 y + z  s.t.  x + y <= 4,  x, y in [0, 3],  z in [-1, 5]
+        model = self.assert_reduction('empty_cols', 1, [[1.0, 1.0, 0.0]], Sense.LE, [4.0],
+                                      [-1.0, -2.0, 1.0], [0.0, 0.0, -1.0], [3.0, 3.0, 5.0])
+        self.assertAlmostEqual(model.get_values()[2], -1.0)
+
+    def test_dominated_cols(self):
+        # min -x - 2 y + z  s.t.  x + y + z <= 4,  x - y <= 1,  x, y in [0, 3],  z in [1, 5]
+        model = self.assert_reduction('dominated_cols', 1, [[1.0, 1.0, 1.0], [1.0, -1.0, 0.0]],
+                                      Sense.LE, [4.0, 1.0], [-1.0, -2.0, 1.0], [0.0, 0.0, 1.0],
+                                      [3.0, 3.0, 5.0])
+        self.assertAlmostEqual(model.get_values()[2], 1.0)
+
+    def test_integer_bounds(self):
+        # min 2 x + y  s.t.  y + z >= 0.5,  x integer in [0.5, 3.7],  y in [0, 1]
+        types = [VarType.INTEGER, VarType.CONTINUOUS, VarType.CONTINUOUS]
+        for presolve in (True, False):
+            with self.subTest(presolve=presolve):
+                model = solve([[0.0, 1.0, 1.0]], Sense.GE, [0.5], [2.0, 1.0, 0.0],
+                              [0.5, 0.0, 0.0], [3.7, 1.0, 10.0], types, presolve)
+                self.assertEqual(model.result.status, AlgorithmStatus.OPTIMAL)
+                self.assertAlmostEqual(model.result.obj_val, 2.0)
+                self.assertAlmostEqual(model.get_values()[0], 1.0)
+        # no integer lies in [0.2, 0.8]
+        model = solve([[0.0, 1.0, 1.0]], Sense.GE, [0.5], [2.0, 1.0, 0.0], [0.2, 0.0, 0.0],
+                      [0.8, 1.0, 10.0], types)
+        self.assertEqual(model.result.status, AlgorithmStatus.INFEASIBLE)
+
+if __name__ == '__main__':
+    unittest.main()
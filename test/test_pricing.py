@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import BasisStatus, Sense, SolverParam, VarType
+from lp.model import Model
+from lp.pricing import DantzigPricing, PartialPricing, DevexPricing, SteepestEdgePricing, \
+    DualDantzigPricing, DualDevexPricing, DualSteepestEdgePricing
+from lp.solver import InitialBasicSolutionGenerator, SimplexSolver, DualSimplexSolver
+from test.helper import Problem, SolverTestCase, create_lp, create_mip, create_model, \
+    solve_model
+
+PRICING_RULES = {
+    SolverParam.Pricing.DANTZIG: (DantzigPricing, DualDantzigPricing),
+    SolverParam.Pricing.PARTIAL: (PartialPricing, DualDantzigPricing),
+    SolverParam.Pricing.DEVEX: (DevexPricing, DualDevexPricing),
+    SolverParam.Pricing.STEEPEST_EDGE: (SteepestEdgePricing, DualSteepestEdgePricing),
+}
+
+
+def prepare_model(problem):
+    """Returns the model of the problem prepared with its starting basis."""
+    model = create_model(problem)
+    model.prepare_coefficient_matrices()
+    InitialBasicSolutionGenerator(model).generate()
+    return model
+
+
+class PricingTest(SolverTestCase):
+    """Each pricing rule is checked against HiGHS, and the weights it keeps against their values."""
+
+    def test_pricing_rules(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            for pricing, classes in PRICING_RULES.items():
+                with self.subTest(algorithm=algorithm.name, pricing=pricing.name), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'PRICING', pricing):
+                    model = prepare_model(create_lp(0))
+                    self.assertIsInstance(SimplexSolver(model)._pricing, classes[0])
+                    self.assertIsInstance(DualSimplexSolver(model)._dual_pricing, classes[1])
+                    for seed in range(20):
+                        problem = create_lp(seed)
+                        self.assert_optimal(solve_model(problem), problem)
+
+    def test_infeasibility(self):
+        for seed in range(10):
+            model = prepare_model(create_lp(seed))
+            solver = SimplexSolver(model)
+            w = np.random.default_rng(seed).uniform(-5.0, 5.0, size=model.n_rows)
+            infeasibility = solver.get_infeasibility(w)
+            A = model.A.toarray()
+            for j in range(A.shape[1]):
+                d = model.c[j] - A[:, j].dot(w)
+                status = model.var_status[j]
+                if model.lb[j] == model.ub[j] or status == BasisStatus.BASIC:
+                    expected = 0.0
+                elif status == BasisStatus.FREE:
+                    expected = abs(d)
+                else:
+                    expected = -d if status == BasisStatus.AT_LOWER else d
+                self.assertAlmostEqual(infeasibility[j], max(expected, 0.0))
+            cols = np.arange(0, A.shape[1], 3)
+            np.testing.assert_array_equal(solver.get_infeasibility(w, cols), infeasibility[cols])
+
+    def test_steepest_edge_norms(self):
+        # the slack basis of the LP relaxation is feasible, so the norms start exact
+        with mock.patch.object(Model.SOLVER_PARAM, 'PRICING', SolverParam.Pricing.STEEPEST_EDGE):
+            for seed in range(5):
+                problem = create_mip(seed)
+                model = prepare_model(problem._replace(types=np.full(len(problem.c),
+                                                                     VarType.CONTINUOUS)))
+                solver = SimplexSolver(model)
+                while not solver._is_terminated:
+                    solver.iterate()
+                    A = model.A.toarray()
+                    edges = np.linalg.solve(A[:, model.basis], A)
+                    is_nonbasic = model.var_status != BasisStatus.BASIC
+                    np.testing.assert_allclose(solver._pricing._gamma[is_nonbasic],
+                                               1.0 + (edges * edges).sum(axis=0)[is_nonbasic])
+
+    def test_dual_steepest_edge_norms(self):
+        # costs are nonnegative, so the surplus basis of the covering rows is dual feasible
+        with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM',
+                               SolverParam.Algorithm.DUAL_SIMPLEX), \
+                mock.patch.object(Model.SOLVER_PARAM, 'PRICING',
+                                  SolverParam.Pricing.STEEPEST_EDGE):
+            for seed in range(5):
+                rng = np.random.default_rng(seed)
+                A = rng.uniform(0.0, 5.0, size=(8, 12)) * (rng.random((8, 12)) < 0.5)
+                A[np.arange(8), rng.integers(0, 12, size=8)] = 1.0
+                problem = Problem(A, rng.uniform(1.0, 10.0, size=8), np.full(8, Sense.GE),
+                                  rng.uniform(1.0, 5.0, size=12), np.zeros(12),
+                                  np.full(12, np.inf), np.full(12, VarType.CONTINUOUS))
+                model = prepare_model(problem)
+                solver = DualSimplexSolver(model)
+                solver.make_dual_feasible()
+                while not solver._is_terminated:
+                    solver.iterate_dual()
+                    rows = np.linalg.inv(model.A.toarray()[:, model.basis])
+                    np.testing.assert_allclose(solver._dual_pricing._beta,
+                                               (rows * rows).sum(axis=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, VarType
+from lp.model import Model
+from test.helper import Problem, solve_highs
+
+
+class ResolveTest(unittest.TestCase):
+    """Each change of a solved LP is resolved from its basis and checked against HiGHS."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.A = rng.integers(0, 6, size=(8, 12)).astype(np.float64)
+        self.b = rng.integers(20, 40, size=8).astype(np.float64)
+        self.c = rng.integers(1, 10, size=12).astype(np.float64)
+        self.ub = np.full(12, 6.0)
+        self.model = Model()
+        self.x = self.model.add_vars(12, ub=self.ub, obj=self.c)
+        self.consts = self.model.add_constrs(self.A, Sense.LE, self.b)
+        self.model.set_objective(None, ObjectiveType.MAX)
+        self.model.solve()
+
+    def assert_optimal(self):
+        self.model.solve()
+        n = len(self.c)
+        expected = solve_highs(Problem(self.A, self.b, np.full(len(self.b), Sense.LE), -self.c,
+                                       np.zeros(n), self.ub, np.full(n, VarType.CONTINUOUS)))
+        self.assertEqual(self.model.result.status, AlgorithmStatus.OPTIMAL)
+        self.assertAlmostEqual(self.model.result.obj_val, -expected.fun, places=2)
+
+    def test_set_rhs(self):
+        self.model.set_rhs(self.consts[2], 10.0)
+        self.b[2] = 10.0
+        self.assert_optimal()
+
+    def test_set_obj_coeff(self):
+        self.model.set_obj_coeff(self.x[0], 20.0)
+        self.c[0] = 20.0
+        self.assert_optimal()
+
+    def test_set_bounds(self):
+        self.model.set_bounds(self.x[1], ub=1.0)
+        self.ub[1] = 1.0
+        self.assert_optimal()
+
+    def test_add_const(self):
+        expr = Expression()
+        for var in self.x[:6]:
+            expr.add_term(1.0, var)
+        self.model.add_const(expr, Sense.LE, 5.0)
+        self.A = np.vstack((self.A, np.r_[np.ones(6), np.zeros(6)]))
+        self.b = np.r_[self.b, 5.0]
+        self.assert_optimal()
+
+    def test_add_cut(self):
+        expr = Expression()
+        for var in self.x[6:]:
+            expr.add_term(1.0, var)
+        self.model.add_cut(expr, Sense.LE, 4.0)
+        self.A = np.vstack((self.A, np.r_[np.zeros(6), np.ones(6)]))
+        self.b = np.r_[self.b, 4.0]
+        self.assert_optimal()
+
+    def test_remove_const(self):
+        self.model.remove_const(self.consts[3])
+        self.A = np.delete(self.A, 3, axis=0)
+        self.b = np.delete(self.b, 3)
+        self.assert_optimal()
+
+    def test_add_var(self):
+        var = self.model.add_var(ub=6.0)
+        self.model.set_obj_coeff(var, 8.0)
+        expr = Expression()
+        expr.add_term(2.0, var)
+        self.model.add_const(expr, Sense.LE, 3.0)
+        self.A = np.vstack((np.hstack((self.A, np.zeros((8, 1)))), np.r_[np.zeros(12), 2.0]))
+        self.b = np.r_[self.b, 3.0]
+        self.c = np.r_[self.c, 8.0]
+        self.ub = np.r_[self.ub, 6.0]
+        self.assert_optimal()
+
+
+if __name__ == '__main__':
+    unittest.main()
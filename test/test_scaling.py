@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import SolverParam
+from lp.model import Model
+from test.helper import SolverTestCase, create_scaled_lp, solve_model
+
+
+class ScalingTest(SolverTestCase):
+    """Badly scaled LPs are checked against HiGHS, and scaled solves against unscaled ones."""
+
+    def test_badly_scaled(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX,
+                          SolverParam.Algorithm.INTERIOR_POINT):
+            with self.subTest(algorithm=algorithm.name), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm):
+                for seed in range(10):
+                    problem = create_scaled_lp(seed)
+                    self.assert_optimal(solve_model(problem), problem)
+
+    def test_unscaled_solution(self):
+        for seed in range(10):
+            problem = create_scaled_lp(seed)
+            model = solve_model(problem)
+            with mock.patch.object(Model.SOLVER_PARAM, 'SCALING', False):
+                unscaled = solve_model(problem)
+            self.assertAlmostEqual(model.result.obj_val, unscaled.result.obj_val, places=2)
+            # the duals are those of the unscaled rows
+            y = model.get_duals()
+            d = problem.c - problem.A.T.dot(y)
+            np.testing.assert_allclose(problem.b.dot(y) + np.minimum(d, 0.0).dot(problem.ub),
+                                       problem.c.dot(model.get_values()), rtol=1e-6)
+            np.testing.assert_allclose(y, unscaled.get_duals(), rtol=1e-6, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
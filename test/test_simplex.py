@@ -0,0 +1,63 @@
+import sys
+import unittest
+from unittest import mock
+
+from lp.entity import AlgorithmStatus, Expression, ObjectiveType, Sense, SolverParam
+from lp.model import Model
+from test.helper import SolverTestCase, create_lp, solve_model
+
+
+class SimplexTest(SolverTestCase):
+    """The primal and dual Simplex algorithms with and without presolve are checked against HiGHS."""
+
+    def assert_lps(self):
+        for seed in range(20):
+            problem = create_lp(seed)
+            model = solve_model(problem)
+            self.assert_optimal(model, problem)
+
+    def test_algorithms(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            for presolve in (True, False):
+                with self.subTest(algorithm=algorithm.name, presolve=presolve), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                        mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', presolve):
+                    self.assert_lps()
+
+    def test_infeasible(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm):
+                model = Model()
+                x = model.add_var(ub=4.0)
+                y = model.add_var(ub=4.0)
+                expr = Expression()
+                expr.add_term(1.0, x)
+                expr.add_term(2.0, y)
+                model.add_const(expr, Sense.GE, 13.0)
+                model.set_objective(expr, ObjectiveType.MIN)
+                model.solve()
+                self.assertEqual(model.result.status, AlgorithmStatus.INFEASIBLE)
+
+    def test_unbounded(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm):
+                model = Model()
+                x = model.add_var(ub=sys.float_info.max)
+                y = model.add_var(ub=sys.float_info.max)
+                expr = Expression()
+                expr.add_term(1.0, x)
+                expr.add_term(-2.0, y)
+                model.add_const(expr, Sense.LE, 3.0)
+                objective = Expression()
+                objective.add_term(1.0, x)
+                objective.add_term(1.0, y)
+                model.set_objective(objective, ObjectiveType.MAX)
+                model.solve()
+                self.assertEqual(model.result.status, AlgorithmStatus.UNBOUNDED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+from lp.entity import ObjectiveType, SolverParam
+from lp.model import Model
+from lp.statistics import COUNTERS, TIMERS
+from test.helper import create_lp, create_model
+
+
+class StatisticsTest(unittest.TestCase):
+    """The iteration events and the statistics of a solve match the Simplex iterations it does."""
+
+    def solve(self, seed, algorithm, callback=None):
+        model = create_model(create_lp(seed))
+        with mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+            model.solve(callback)
+        return model
+
+    def test_callback(self):
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            for seed in range(10):
+                with self.subTest(algorithm=algorithm.name, seed=seed):
+                    events = []
+                    model = self.solve(seed, algorithm, events.append)
+                    self.assertEqual(len(events), model.result.iterations)
+                    self.assertEqual([event.iteration for event in events],
+                                     list(range(1, len(events) + 1)))
+                    phases = [event.phase for event in events]
+                    self.assertEqual(phases, sorted(phases))
+                    if algorithm == SolverParam.Algorithm.DUAL_SIMPLEX:
+                        self.assertTrue(all(phase == 2 for phase in phases))
+                    # the pivots lead from the starting basis of logical columns to the final one
+                    is_basic = {}
+                    for event in events:
+                        self.assertEqual(event.algorithm, algorithm)
+                        self.assertFalse(is_basic.get(event.entering_var, False))
+                        if event.leaving_var >= 0:
+                            self.assertTrue(is_basic.get(event.leaving_var,
+                                                         event.leaving_var >= model.n_cols))
+                            is_basic[event.leaving_var] = False
+                            is_basic[event.entering_var] = True
+                    basic_cols = {j for j in model.basis.tolist() if j < model.n_cols}
+                    self.assertEqual(basic_cols,
+                                     {j for j, basic in is_basic.items()
+                                      if basic and j < model.n_cols})
+
+    def test_statistics(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'STATISTICS', True):
+            for seed in range(10):
+                model = self.solve(seed, SolverParam.Algorithm.PRIMAL_SIMPLEX)
+                statistics = model.result.statistics
+                self.assertEqual(set(statistics['timers']), set(TIMERS))
+                self.assertEqual(set(statistics['counters']), set(COUNTERS))
+                counters = statistics['counters']
+                self.assertEqual(counters['iterations'], model.result.iterations)
+                self.assertLessEqual(counters['bound_flips'] + counters['degenerate_pivots'],
+                                     counters['iterations'])
+                self.assertGreaterEqual(counters['factorizations'], 1)
+                timers = statistics['timers']
+                self.assertTrue(all(seconds >= 0.0 for seconds in timers.values()))
+                self.assertGreater(timers['factorization'], 0.0)
+                # the timers are exclusive, so they add up to no more than the total
+                self.assertLessEqual(sum(timers.values()) - timers['total'], timers['total'])
+
+    def test_disabled(self):
+        events = []
+        model = self.solve(0, SolverParam.Algorithm.PRIMAL_SIMPLEX, events.append)
+        n_events = len(events)
+        self.assertGreater(n_events, 0)
+        self.assertIsNone(model.statistics)
+        self.assertIsNone(model.result.statistics)
+        # the callback of a solve is not kept for the next one
+        model.set_objective(None, ObjectiveType.MAX)
+        model.solve()
+        self.assertGreater(model.result.iterations, 0)
+        self.assertEqual(len(events), n_events)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from lp.entity import Node, SolverParam
+from lp.tree import NodeQueue
+
+
+class NodeQueueTest(unittest.TestCase):
+    """Open nodes are selected in the order of each branching algorithm."""
+
+    def setUp(self):
+        root = Node(lp_bound=0.0)
+        a = Node(root, lp_bound=5.0, estimate=9.0)
+        b = Node(root, lp_bound=3.0, estimate=12.0)
+        c = Node(a, lp_bound=7.0, estimate=8.0)
+        d = Node(a, lp_bound=6.0, estimate=10.0)
+        self.nodes = {'a': a, 'b': b, 'c': c, 'd': d}
+
+    def create_queue(self, strategy):
+        queue = NodeQueue(strategy)
+        for name in 'abcd':
+            queue.push(self.nodes[name])
+        return queue
+
+    def pop_all(self, queue):
+        names = {id(node): name for name, node in self.nodes.items()}
+        order = ''
+        while len(queue) > 0:
+            order += names[id(queue.pop())]
+        return order
+
+    def test_selection_order(self):
+        for strategy, order in ((SolverParam.BranchingAlgorithm.DFS, 'dcba'),
+                                (SolverParam.BranchingAlgorithm.BFS, 'abcd'),
+                                (SolverParam.BranchingAlgorithm.BEST_BOUND, 'badc'),
+                                (SolverParam.BranchingAlgorithm.BEST_ESTIMATE, 'cadb'),
+                                (SolverParam.BranchingAlgorithm.HYBRID, 'dcba')):
+            with self.subTest(strategy=strategy.name):
+                self.assertEqual(self.pop_all(self.create_queue(strategy)), order)
+
+    def test_hybrid_after_incumbent(self):
+        queue = self.create_queue(SolverParam.BranchingAlgorithm.HYBRID)
+        # an incumbent switches the open nodes to best bound, and frees those it cuts off
+        self.assertEqual(queue.prune(6.5), 1)
+        self.assertTrue(self.nodes['c'].is_pruned)
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(self.pop_all(queue), 'bad')
+
+    def test_best_bound(self):
+        queue = self.create_queue(SolverParam.BranchingAlgorithm.DFS)
+        self.assertEqual(queue.get_best_bound(), 3.0)
+        queue.pop()
+        queue.pop()
+        # the popped nodes are d and c, so b keeps the best bound
+        self.assertEqual(queue.get_best_bound(), 3.0)
+        queue.pop()
+        self.assertEqual(queue.get_best_bound(), 5.0)
+        queue.pop()
+        self.assertEqual(queue.get_best_bound(), float('inf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
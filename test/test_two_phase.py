@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from lp.entity import AlgorithmStatus, BasisStatus, Sense, SolverParam, VarType
+from lp.model import Model
+from lp.solver import InitialBasicSolutionGenerator
+from test.helper import Problem, SolverTestCase, create_lp, create_model, solve_model
+
+
+def create_redundant_lp():
+    """Returns an LP whose third equality row is the sum of the first two."""
+    A = np.array([[1.0, 2.0, 0.0, 1.0],
+                  [0.0, 1.0, 3.0, -1.0],
+                  [1.0, 3.0, 3.0, 0.0],
+                  [2.0, 0.0, 1.0, 1.0]])
+    return Problem(A, np.array([4.0, 3.0, 7.0, 6.0]), np.array([Sense.EQ] * 3 + [Sense.LE]),
+                   np.array([1.0, -1.0, 2.0, -3.0]), np.zeros(4), np.full(4, 10.0),
+                   np.full(4, VarType.CONTINUOUS))
+
+
+class TwoPhaseTest(SolverTestCase):
+    """Phase I finds a feasible basis from the artificial columns and phase II optimizes from it."""
+
+    def test_starting_basis(self):
+        for seed in range(20):
+            model = create_model(create_lp(seed))
+            model.prepare_coefficient_matrices()
+            self.assertTrue(InitialBasicSolutionGenerator(model).generate())
+            # the starting basis is primal feasible, with the artificial columns at their values
+            x_b = model.x[model.basis]
+            self.assertTrue(np.all(x_b >= model.lb[model.basis] - 1e-9))
+            self.assertTrue(np.all(x_b <= model.ub[model.basis] + 1e-9))
+            artificial_cols = model.get_artificial_cols()
+            self.assertTrue(np.all(model.var_status[artificial_cols] == BasisStatus.BASIC))
+            self.assertTrue(np.all(model.c[artificial_cols] == 0.0))
+
+    def test_phases(self):
+        with mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+            for seed in range(20):
+                events = []
+                problem = create_lp(seed)
+                model = create_model(problem)
+                model.solve(events.append)
+                self.assert_optimal(model, problem)
+                phases = [event.phase for event in events]
+                self.assertEqual(phases, sorted(phases))
+                # the artificial columns are at zero once phase I is over
+                self.assertTrue(np.allclose(model.x[model.get_artificial_cols()], 0.0))
+                if model.n_artificial == 0:
+                    self.assertNotIn(1, phases)
+
+    def test_redundant_rows(self):
+        problem = create_redundant_lp()
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            with self.subTest(algorithm=algorithm.name), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+                model = solve_model(problem)
+                self.assert_optimal(model, problem)
+                # an artificial column left in the redundant row is fixed at zero
+                artificial_cols = model.get_artificial_cols()
+                self.assertTrue(np.allclose(model.x[artificial_cols], 0.0))
+                self.assertTrue(np.all(model.ub[artificial_cols] == 0.0))
+
+    def test_infeasible(self):
+        # the first two rows ask for x + y = 4 and x + y >= 5
+        problem = Problem(np.array([[1.0, 1.0], [1.0, 1.0], [1.0, -1.0]]),
+                          np.array([4.0, 5.0, 1.0]), np.array([Sense.EQ, Sense.GE, Sense.LE]),
+                          np.array([1.0, 1.0]),
+                          np.zeros(2), np.full(2, 10.0), np.full(2, VarType.CONTINUOUS))
+        for algorithm in (SolverParam.Algorithm.PRIMAL_SIMPLEX,
+                          SolverParam.Algorithm.DUAL_SIMPLEX):
+            with self.subTest(algorithm=algorithm.name), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'ALGORITHM', algorithm), \
+                    mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+                model = solve_model(problem)
+                self.assertEqual(model.result.status, AlgorithmStatus.INFEASIBLE)
+
+    def test_large_costs(self):
+        # costs far beyond the old artificial cost of 1e6 do not change the phase I verdict
+        problem = create_lp(3)
+        problem = problem._replace(c=problem.c * 1e8)
+        with mock.patch.object(Model.SOLVER_PARAM, 'PRESOLVE', False):
+            self.assert_optimal(solve_model(problem), problem)
+
+
+if __name__ == '__main__':
+    unittest.main()